@@ -27,6 +27,79 @@ class Settings(BaseSettings):
     SCENARIO_NEUTRAL_GROWTH: float = 0.05
     SCENARIO_PESSIMISTIC_GROWTH: float = -0.10
     
+    MAX_ANALISES_LOTE: int = 5000
+    
+    # Fila de gravação (write-behind) das análises
+    FILA_GRAVACAO_TAMANHO_MAXIMO: int = 10000
+    FILA_GRAVACAO_TAMANHO_LOTE: int = 500
+    FILA_GRAVACAO_INTERVALO_MS: float = 50
+    FILA_GRAVACAO_TIMEOUT_S: float = 2.0
+    FILA_GRAVACAO_ESPERA_INICIAL_S: float = 0.5  # Banco fora do ar: espera antes de tentar o lote de novo
+    FILA_GRAVACAO_ESPERA_MAXIMA_S: float = 30  # Teto do backoff exponencial
+    
+    # Cache de resultados de /api/analise
+    CACHE_RESULTADOS_ATIVO: bool = True
+    CACHE_RESULTADOS_TTL_S: float = 3600
+    CACHE_RESULTADOS_MAX_BYTES: int = 64 * 1024 * 1024
+    
+    # Streaming NDJSON (/api/analise/ndjson)
+    NDJSON_LINHAS_POR_BLOCO: int = 200
+    NDJSON_MAX_BYTES_LINHA: int = 1024 * 1024
+    
+    # Sessão de análise progressiva ("memoria" ou "redis" para vários workers)
+    SESSAO_ARMAZEM: str = "memoria"
+    SESSAO_TTL_S: float = 2 * 3600
+    SESSAO_MAX_ITENS: int = 10000
+    REDIS_URL: str = "redis://localhost:6379/0"
+    
+    # Histórico paginado (/api/historico)
+    HISTORICO_LIMITE_PADRAO: int = 50
+    HISTORICO_LIMITE_MAXIMO: int = 500
+    
+    # Pool de conexões do banco (por worker, em cada engine)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_PRE_PING: bool = True  # Detecta conexões derrubadas pelo Postgres
+    DB_POOL_RECYCLE_S: int = 1800  # Renova conexões antes do timeout de ociosidade
+    DB_POOL_TIMEOUT_S: float = 30  # Espera máxima por uma conexão livre
+    DB_STATEMENT_TIMEOUT_MS: int = 30000  # Só Postgres; 0 = sem limite
+    
+    # Aquecimento no startup: intervalo entre tentativas se o banco não responder
+    AQUECIMENTO_INTERVALO_S: float = 5
+    # Coletor de lixo: limiar da geração 0 (padrão do Python: 700). Lotes criam centenas
+    # de milhares de objetos de vida curta; 0 = mantém o padrão
+    GC_LIMIAR_GERACAO0: int = 10000
+    
+    # Simulação Monte Carlo do fluxo de caixa
+    MONTE_CARLO_CAMINHOS: int = 10000
+    MONTE_CARLO_SEMENTE: int = 20250101  # Fixa: mesma entrada, mesma resposta (cache)
+    MONTE_CARLO_NA_ANALISE: bool = True  # Permite a simulação no /api/analise (nível 3) se pedida em incluir_monte_carlo
+    
+    # Busca de meta (/api/analise/meta): metas por chamada
+    BUSCA_META_MAX_METAS: int = 50
+    
+    # Ranking setorial (percentil de cada KPI entre empresas do mesmo setor)
+    RANKING_SETOR_ATIVO: bool = True
+    RANKING_MINIMO_AMOSTRAS: int = 30  # Abaixo disso o percentil não é mostrado
+    RANKING_SNAPSHOT_INTERVALO_S: float = 60  # Grava/recarrega o snapshot no banco
+    
+    # Perfis de setor (prazos, benchmarks, estratégias) - recarregados se o arquivo mudar
+    PERFIS_SETOR_ARQUIVO: str = ""  # Vazio = app/data/perfis_setor.json
+    PERFIS_SETOR_INTERVALO_S: float = 30
+    
+    # Plano de ação com IA (plano_acao_generator)
+    LLM_API_URL: str = "https://api.anthropic.com"  # Aponte para um stub local nos testes de carga
+    LLM_MODELO: str = "claude-3-5-sonnet-20241022"
+    LLM_ORCAMENTO_S: float = 20  # Tempo máximo por plano (espera de vaga + chamada); estourou = fallback
+    LLM_CONEXAO_TIMEOUT_S: float = 3
+    LLM_MAX_CONCORRENTES: int = 8  # Chamadas simultâneas por worker (= conexões no pool)
+    LLM_DISJUNTOR_FALHAS: int = 5  # Falhas (ou lentidões) seguidas que abrem o disjuntor
+    LLM_DISJUNTOR_LENTO_S: float = 10  # Resposta mais lenta que isso conta como falha
+    LLM_DISJUNTOR_ABERTO_S: float = 30  # Tempo só com fallback antes de testar a API de novo
+
+    # Orçamento de tempo para importar app.main (tests/test_tempo_importacao.py)
+    IMPORTACAO_ORCAMENTO_MS: float = 2000
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -0,0 +1,28 @@
+"""
+Serialização JSON rápida (orjson)
+
+Usada onde o JSON é gerado a partir de dados internos já confiáveis:
+coluna dados_financeiros (json_serializer das engines do SQLAlchemy),
+cache de resultados e respostas que não passam pelo jsonable_encoder.
+
+Diferente do json padrão, NaN/Infinity viram null (JSON válido para o
+PostgreSQL) e o texto sai compacto e em UTF-8.
+"""
+from typing import Any
+
+import orjson
+
+
+def para_json(dados: Any) -> bytes:
+    """Serializa para JSON (bytes UTF-8)"""
+    return orjson.dumps(dados, option=orjson.OPT_NON_STR_KEYS)
+
+
+def para_json_str(dados: Any) -> str:
+    """Serializa para JSON (str) - formato exigido pelo json_serializer do SQLAlchemy"""
+    return orjson.dumps(dados, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+def de_json(texto: Any) -> Any:
+    """Desserializa JSON (str ou bytes)"""
+    return orjson.loads(texto)
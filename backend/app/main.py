@@ -1,23 +1,63 @@
+from contextlib import asynccontextmanager
+import asyncio
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 import os
 
 # ===== BANCO DE DADOS - NOVO =====
-from app.models.database import engine, Base
-from app.models.analysis_record import AnalysisRecord
-
-# Criar tabelas no banco
-Base.metadata.create_all(bind=engine)
+# Tabelas e índices são criados no aquecimento (lifespan), não no import
+from app.models.database import estatisticas_pool
 # =================================
 
 # Importar a rota de análise
 from app.routes.analise import router as analise_router
+from app.services.fila_gravacao import fila_gravacao
+from app.services.ranking_setorial import ranking_setorial
+from app.services.perfis_setor import perfis_setor
+from app.services.plano_acao_generator import cliente_llm
+from app.services.sessao_analise import sessoes_analise
+from app.services.aquecimento import aquecer, aquecer_ate_conseguir, estado_aquecimento
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Startup: gravador em segundo plano + aquecimento (schema, pool, análise de exemplo)
+    + snapshot periódico do ranking setorial + recarga dos perfis de setor
+    Shutdown: grava o que ainda estiver na fila e o snapshot do ranking,
+    fecha os pools de conexões da IA e das sessões
+    """
+    await fila_gravacao.iniciar()
+    await ranking_setorial.iniciar()
+    await perfis_setor.iniciar()
+    
+    tarefa_aquecimento = None
+    try:
+        await aquecer(app)
+    except Exception as e:
+        # Sobe mesmo assim (o /health responde), mas fica fora do /ready até aquecer
+        print(f"⚠️ Aquecimento falhou no startup, tentando em segundo plano: {e}")
+        tarefa_aquecimento = asyncio.create_task(aquecer_ate_conseguir(app))
+    
+    yield
+    
+    if tarefa_aquecimento is not None:
+        tarefa_aquecimento.cancel()
+    await fila_gravacao.encerrar()
+    await ranking_setorial.encerrar()
+    await perfis_setor.encerrar()
+    await cliente_llm.encerrar()
+    await sessoes_analise.encerrar()
+
 
 # Inicializar aplicação
 app = FastAPI(
     title="Leme - API de Análise Financeira",
     description="API para análise financeira de pequenas e microempresas",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configurar CORS para permitir requisições do frontend
@@ -43,5 +83,29 @@ async def health_check():
     """Verificar saúde da API"""
     return {"status": "healthy"}
 
+@app.get("/ready")
+async def readiness_check():
+    """Pronto para tráfego só depois do aquecimento (503 enquanto isso)"""
+    if not estado_aquecimento.pronto:
+        return JSONResponse(
+            status_code=503,
+            content={
+                "status": "aquecendo",
+                "tentativas": estado_aquecimento.tentativas,
+                "erro": estado_aquecimento.ultimo_erro
+            }
+        )
+    return {"status": "ready", "aquecimento_s": estado_aquecimento.duracao_s}
+
+@app.get("/metricas/banco")
+async def metricas_banco():
+    """Pool de conexões: em uso, overflow, timeouts e tempo de espera por conexão"""
+    return estatisticas_pool()
+
+@app.get("/metricas/ia")
+async def metricas_ia():
+    """Chamadas à IA: estado do disjuntor, falhas, orçamentos estourados e chamadas em andamento"""
+    return cliente_llm.estatisticas()
+
 # Incluir rotas de análise
 app.include_router(analise_router, prefix="/api", tags=["Análise Financeira"])
\ No newline at end of file
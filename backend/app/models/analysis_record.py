@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Float, JSON, Index, ForeignKey
+from sqlalchemy.orm import deferred, relationship
 from datetime import datetime
 from app.models.database import Base
 
@@ -13,7 +14,8 @@ class AnalysisRecord(Base):
     empresa = Column(String, nullable=True)
     
     # Dados financeiros que o cliente preencheu (tudo em JSON)
-    dados_financeiros = Column(JSON, nullable=False)
+    # Carregado só quando acessado (ou com undefer): listagens não precisam dele
+    dados_financeiros = deferred(Column(JSON, nullable=False))
     
     # Informações extras
     setor = Column(String, nullable=True)
@@ -22,5 +24,48 @@ class AnalysisRecord(Base):
     # Data de criação automática
     created_at = Column(DateTime, default=datetime.utcnow)
     
+    # KPIs principais já calculados (gravados junto, na mesma transação)
+    resumo = relationship("ResumoAnalise", uselist=False, back_populates="analise", cascade="all, delete-orphan")
+    
+    # Histórico paginado por email (mais recentes primeiro, id desempata)
+    __table_args__ = (
+        Index("ix_analises_email_created_at_id", email, created_at.desc(), id.desc()),
+    )
+    
     def __repr__(self):
-        return f"<Análise #{self.id} - {self.email} - {self.empresa}>"
\ No newline at end of file
+        return f"<Análise #{self.id} - {self.email} - {self.empresa}>"
+
+
+class ResumoAnalise(Base):
+    """
+    KPIs principais de uma análise (uma linha por análise)
+    
+    Evolução e comparações do histórico leem só esta tabela, sem abrir
+    dados_financeiros nem recalcular a análise. email e created_at são
+    cópias da análise, para o índice cobrir a consulta por período.
+    """
+    __tablename__ = "resumos_analises"
+    
+    analise_id = Column(Integer, ForeignKey("analises.id", ondelete="CASCADE"), primary_key=True)
+    email = Column(String, nullable=False)
+    setor = Column(String, nullable=True)
+    created_at = Column(DateTime, nullable=False)
+    
+    # KPIs (None quando o nível necessário não foi preenchido)
+    margem_bruta = Column(Float, nullable=True)  # %
+    resultado_operacional = Column(Float, nullable=True)  # R$/mês
+    folego_caixa = Column(Float, nullable=True)  # dias
+    liquidez_imediata = Column(Float, nullable=True)
+    ciclo_financeiro = Column(Float, nullable=True)  # dias (nível 2)
+    alavancagem = Column(Float, nullable=True)  # (nível 2)
+    roa = Column(Float, nullable=True)  # % ao ano (nível 3)
+    roe = Column(Float, nullable=True)  # % ao ano (nível 3)
+    
+    # VERSAO_CALCULO usada: o backfill recalcula resumos de versões antigas
+    versao_calculo = Column(String, nullable=False)
+    
+    analise = relationship("AnalysisRecord", back_populates="resumo")
+    
+    __table_args__ = (
+        Index("ix_resumos_email_created_at", email, created_at.desc(), analise_id.desc()),
+    )
\ No newline at end of file
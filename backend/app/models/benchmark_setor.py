@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, String, DateTime, Float
+from datetime import datetime
+from app.models.database import Base
+
+
+class BenchmarkSetor(Base):
+    """
+    Estatísticas de um indicador em um setor, calculadas das análises gravadas
+    
+    Cada execução de scripts/gerar_benchmarks publica uma versão nova
+    (todas as linhas de uma vez); os serviços usam a maior versão.
+    """
+    __tablename__ = "benchmarks_setor"
+    
+    versao = Column(Integer, primary_key=True)
+    setor = Column(String, primary_key=True)
+    indicador = Column(String, primary_key=True)  # margem_bruta, dso, dpo, ciclo_financeiro, liquidez_imediata
+    
+    amostras = Column(Integer, nullable=False)
+    p25 = Column(Float, nullable=False)
+    mediana = Column(Float, nullable=False)
+    p75 = Column(Float, nullable=False)
+    
+    publicado_em = Column(DateTime, default=datetime.utcnow)
@@ -1,7 +1,14 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, exc
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
 import os
+import threading
+import time
+
+from app.core.config import settings
+from app.core.serializacao import para_json_str, de_json
 
 # Pega a URL do banco
 DATABASE_URL = os.getenv("DATABASE_URL")
@@ -13,15 +20,148 @@ else:
     # Railway usa postgres://, mas SQLAlchemy precisa de postgresql://
     DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://")
 
+
+def _url_async(url: str) -> str:
+    """
+    Converte a URL síncrona para o driver async equivalente
+    sqlite -> aiosqlite (local) | postgresql -> asyncpg (produção)
+    """
+    if url.startswith("sqlite:"):
+        return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    if url.startswith("postgresql:"):
+        return url.replace("postgresql:", "postgresql+asyncpg:", 1)
+    return url  # Já tem driver explícito
+
+
+# URL async (pode ser sobrescrita, ex: para outro driver)
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or _url_async(DATABASE_URL)
+
+# Colunas JSON (dados_financeiros) serializadas com orjson
+OPCOES_JSON = {"json_serializer": para_json_str, "json_deserializer": de_json}
+
+
+class MetricasPool:
+    """Contadores de um pool de conexões, para dimensionar size/overflow por deploy"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.espera_total_s = 0.0
+        self.espera_maxima_s = 0.0
+
+    def registrar(self, espera_s: float, timeout: bool = False):
+        with self._lock:
+            if timeout:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.espera_total_s += espera_s
+            self.espera_maxima_s = max(self.espera_maxima_s, espera_s)
+
+    def estatisticas(self, pool) -> dict:
+        """Estado atual do pool + contadores acumulados"""
+        dados = {"pool": type(pool).__name__}
+        if isinstance(pool, QueuePool):
+            dados.update({
+                "tamanho": pool.size(),
+                "em_uso": pool.checkedout(),
+                "ociosas": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0)
+            })
+        with self._lock:
+            pedidos = self.checkouts + self.timeouts
+            dados.update({
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "espera_media_ms": round(self.espera_total_s / pedidos * 1000, 3) if pedidos else 0.0,
+                "espera_maxima_ms": round(self.espera_maxima_s * 1000, 3)
+            })
+        return dados
+
+
+class _PoolMonitorado:
+    """
+    Mede quanto tempo cada checkout levou para conseguir uma conexão
+
+    Inclui a espera por uma conexão livre e, quando o pool abre uma nova
+    (overflow), o tempo de conectar.
+    """
+    metricas: MetricasPool
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            conexao = super()._do_get()
+        except exc.TimeoutError:
+            self.metricas.registrar(time.perf_counter() - inicio, timeout=True)
+            raise
+        self.metricas.registrar(time.perf_counter() - inicio)
+        return conexao
+
+
+def _pool_monitorado(classe_pool, metricas: MetricasPool):
+    # Classe própria por engine: o SQLAlchemy recria o pool com self.__class__
+    return type(f"{classe_pool.__name__}Monitorado", (_PoolMonitorado, classe_pool), {"metricas": metricas})
+
+
+def _opcoes_pool(url: str, classe_pool) -> dict:
+    """Parâmetros do pool e da conexão vindos de Settings"""
+    opcoes = {
+        "poolclass": classe_pool,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE_S
+    }
+    if issubclass(classe_pool, QueuePool):
+        opcoes.update({
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_timeout": settings.DB_POOL_TIMEOUT_S
+        })
+
+    if url.startswith("sqlite"):
+        # Para SQLite, precisa do check_same_thread=False
+        opcoes["connect_args"] = {"check_same_thread": False}
+    elif settings.DB_STATEMENT_TIMEOUT_MS:
+        # Postgres: derruba consultas presas em vez de segurar a conexão
+        timeout = str(settings.DB_STATEMENT_TIMEOUT_MS)
+        if "+asyncpg" in url:
+            opcoes["connect_args"] = {"server_settings": {"statement_timeout": timeout}}
+        else:
+            opcoes["connect_args"] = {"options": f"-c statement_timeout={timeout}"}
+
+    return opcoes
+
+
+metricas_pool = {"sync": MetricasPool(), "async": MetricasPool()}
+
 # Criar engine
-# Para SQLite, precisa do check_same_thread=False
-if DATABASE_URL.startswith("sqlite"):
-    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
-else:
-    engine = create_engine(DATABASE_URL)
+engine = create_engine(
+    DATABASE_URL,
+    **_opcoes_pool(DATABASE_URL, _pool_monitorado(QueuePool, metricas_pool["sync"])),
+    **OPCOES_JSON
+)
+
+# Engine async - usada pelas rotas para não bloquear o event loop
+# (aiosqlite abre uma conexão por uso: NullPool, como no padrão do SQLAlchemy)
+_pool_async = NullPool if ASYNC_DATABASE_URL.startswith("sqlite") else AsyncAdaptedQueuePool
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    **_opcoes_pool(ASYNC_DATABASE_URL, _pool_monitorado(_pool_async, metricas_pool["async"])),
+    **OPCOES_JSON
+)
+
+
+def estatisticas_pool() -> dict:
+    """Métricas dos pools das duas engines (sync e async)"""
+    return {
+        "sync": metricas_pool["sync"].estatisticas(engine.pool),
+        "async": metricas_pool["async"].estatisticas(async_engine.pool)
+    }
 
 # Criar sessões
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
 # Base para modelos
 Base = declarative_base()
@@ -32,4 +172,10 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+# Função para pegar sessão async (rotas async def)
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
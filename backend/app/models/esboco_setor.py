@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON
+from datetime import datetime
+from app.models.database import Base
+
+
+class EsbocoSetor(Base):
+    """
+    Snapshot do esboço de quantis de um KPI em um setor (ranking setorial)
+    
+    Os workers somam aqui, de tempos em tempos, o que receberam desde o
+    último snapshot, e carregam a soma no startup (sobem já "quentes").
+    """
+    __tablename__ = "esbocos_setor"
+    
+    setor = Column(String, primary_key=True)
+    kpi = Column(String, primary_key=True)
+    
+    total = Column(Integer, nullable=False, default=0)
+    contagens = Column(JSON, nullable=False)  # {índice do bucket: contagem}, só buckets não vazios
+    
+    atualizado_em = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -104,6 +104,9 @@ class AnaliseRequest(BaseModel):
     nivel1: DadosNivel1
     nivel2: Optional[DadosNivel2] = None
     nivel3: Optional[DadosNivel3] = None
+    token_sessao: Optional[str] = None  # Devolvido pela primeira resposta
+    incluir_monte_carlo: bool = False  # Simulação Monte Carlo no nível 3 (10k caminhos: só quando pedida)
+    plano_com_ia: bool = False  # Plano 30-60-90 gerado pela IA (nível 3); se ela falhar, fica o plano por regras
 
 
 # ============= DADOS DE SAÍDA =============
@@ -164,10 +167,125 @@ class DiagnosticoEstrategia(BaseModel):
     plano_30_60_90: Dict[str, List[AcaoPlano]]  # {"30_dias": [...], "60_dias": [...], "90_dias": [...]}
 
 
+class FaixasPercentis(BaseModel):
+    """Percentis por mês de uma variável simulada"""
+    p5: List[float]
+    p25: List[float]
+    p50: List[float]
+    p75: List[float]
+    p95: List[float]
+
+
+class SimulacaoMonteCarlo(BaseModel):
+    """Simulação Monte Carlo do fluxo de caixa (só no Nível 3)"""
+    caminhos: int  # Quantidade de caminhos sorteados
+    meses: List[int]  # [1, 2, ..., 6]
+    caixa: FaixasPercentis
+    resultado_operacional: FaixasPercentis
+    probabilidade_caixa_negativo: List[float]  # Por mês, acumulada (0 a 1)
+    premissas: Dict[str, float]  # Distribuições usadas para o setor
+
+
+class PosicaoSetor(BaseModel):
+    """Posição de um KPI entre as empresas do mesmo setor"""
+    valor: float
+    percentil: Optional[float] = None  # % das empresas do setor com valor menor (None = poucas amostras)
+    amostras: int  # Empresas do setor na base
+
+
 class AnaliseResponse(BaseModel):
     """Resposta completa da análise"""
     nivel1: ResultadoNivel
     nivel2: Optional[ResultadoNivel] = None
     nivel3: Optional[ResultadoNivel] = None
     diagnostico_estrategia: Optional[DiagnosticoEstrategia] = None
+    simulacao_monte_carlo: Optional[SimulacaoMonteCarlo] = None
+    ranking_setor: Optional[Dict[str, PosicaoSetor]] = None  # Por KPI (margem_bruta, folego_caixa, ...)
     status_validacao: Dict[str, Any]
+
+
+class BarraTornado(BaseModel):
+    """Efeito de reduzir/aumentar uma variável em um KPI"""
+    variavel: str  # "receita", "custo", "despesas_fixas", "dso", "dpo", "estoque"
+    rotulo: str
+    valor_reducao: Optional[float] = None  # KPI com a variável reduzida em X%
+    valor_aumento: Optional[float] = None  # KPI com a variável aumentada em X%
+    impacto_reducao: Optional[float] = None  # Diferença para o valor base
+    impacto_aumento: Optional[float] = None
+    amplitude: float  # |valor_aumento - valor_reducao|, ordena o tornado
+
+
+class TornadoKPI(BaseModel):
+    """Gráfico de tornado de um KPI"""
+    kpi: str
+    nome: str
+    formato: str  # "moeda", "dias"
+    valor_base: Optional[float] = None
+    barras: List[BarraTornado]  # Da maior para a menor amplitude
+
+
+class SensibilidadeResponse(BaseModel):
+    """Resposta da análise de sensibilidade"""
+    variacao_percentual: float
+    kpis: List[TornadoKPI]
+    assumptions: List[str]  # Campos estimados (ex: Nível 2 não enviado)
+
+
+class AnaliseSessaoResponse(AnaliseResponse):
+    """Resposta de /analise com o token da sessão de análise progressiva"""
+    token_sessao: str
+
+
+# ============= BUSCA DE META =============
+
+class MetaKPI(BaseModel):
+    """Meta de um KPI e a variável que pode ser alterada para atingi-la"""
+    kpi: str = Field(..., description="Ex: folego_caixa, ciclo_financeiro, resultado_operacional")
+    alvo: float = Field(..., description="Valor desejado do KPI")
+    variavel: str = Field(..., description="Ex: receita, despesas_fixas, dso, dpo, estoque")
+
+
+class BuscaMetaRequest(BaseModel):
+    """Várias empresas e várias metas: cada meta é resolvida para cada empresa"""
+    empresas: List[AnaliseRequest] = Field(..., min_items=1)
+    metas: List[MetaKPI] = Field(..., min_items=1)
+
+
+class ResultadoMeta(BaseModel):
+    """Valor necessário da variável para uma empresa atingir uma meta"""
+    indice_empresa: int  # Posição na lista de empresas
+    kpi: str
+    variavel: str
+    alvo: float
+    kpi_atual: Optional[float] = None
+    valor_atual: Optional[float] = None
+    valor_necessario: Optional[float] = None  # None se a meta for inalcançável
+    variacao_percentual: Optional[float] = None  # Em relação ao valor atual
+    alcancavel: bool
+    metodo: str  # "formula" (inversa fechada) ou "bissecao"
+    motivo: Optional[str] = None
+
+
+class BuscaMetaResponse(BaseModel):
+    """Resposta da busca de meta (ordenada por empresa, depois por meta)"""
+    total: int
+    alcancaveis: int
+    resultados: List[ResultadoMeta]
+
+
+# ============= PROCESSAMENTO EM LOTE =============
+
+class ItemLoteResultado(BaseModel):
+    """Resultado de um item do lote (sucesso ou erro)"""
+    indice: int  # Posição do item na lista enviada
+    sucesso: bool
+    resultado: Optional[AnaliseResponse] = None
+    erro: Optional[str] = None
+
+
+class AnaliseLoteResponse(BaseModel):
+    """Resposta do processamento em lote"""
+    total: int
+    sucessos: int
+    falhas: int
+    resultados: List[ItemLoteResultado]
@@ -1,21 +1,43 @@
 """
 Rotas de Análise Financeira
 """
-from fastapi import APIRouter, HTTPException, Depends
-from typing import Dict, Any
-from datetime import datetime
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime, timezone
+import base64
+import json
+import zlib
+
+from app.core.config import settings
+from app.core.serializacao import para_json, de_json
 
 # ===== IMPORTS DO BANCO - NOVO =====
-from sqlalchemy.orm import Session
-from app.models.database import get_db
-from app.models.analysis_record import AnalysisRecord
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import undefer
+from app.models.database import get_async_db
+from app.models.analysis_record import AnalysisRecord, ResumoAnalise
+from app.services.fila_gravacao import fila_gravacao
 # ====================================
 
 from app.models.schemas import (
     AnaliseRequest, 
     AnaliseResponse, 
+    AnaliseSessaoResponse,
+    AnaliseLoteResponse,
+    ItemLoteResultado,
+    SetorEnum,
     ResultadoNivel,
     DiagnosticoEstrategia,
+    AcaoPlano,
+    SimulacaoMonteCarlo,
+    PosicaoSetor,
+    SensibilidadeResponse,
+    BuscaMetaRequest,
+    BuscaMetaResponse,
     KPI,
     GraficoBarras,
     GraficoLinha,
@@ -63,284 +85,1050 @@ from app.services.mensagens import (
     gerar_mensagem_nivel3,
     gerar_diagnostico_final,
     gerar_oportunidades,
-    gerar_plano_30_60_90
+    gerar_plano_30_60_90,
+    gerar_plano_30_60_90_ia_async
 )
 from app.services.plano_acao_personalizado import gerar_plano_personalizado
+from app.services.cache_resultados import cache_resultados
+from app.services.sessao_analise import sessoes_analise, assinatura_nivel
+from app.services.monte_carlo import simular_empresa
+from app.services.sensibilidade import analisar_sensibilidade
+from app.services.busca_meta import montar_colunas, resolver_meta
+from app.services.resumo_kpis import calcular_resumo, criar_resumo
+from app.services.ranking_setorial import ranking_setorial
+from app.services.benchmarks_populacao import benchmarks_populacao, campos_estimados
 
 router = APIRouter()
 
 
-@router.post("/analise", response_model=AnaliseResponse)
-async def processar_analise(request: AnaliseRequest, db: Session = Depends(get_db)):  # ✅ ADICIONEI db
+@router.post("/analise", response_model=AnaliseSessaoResponse)
+async def processar_analise(request: AnaliseRequest):
     """
     Endpoint principal de análise financeira
     
-    Recebe dados dos níveis preenchidos e retorna análise completa
+    Recebe dados dos níveis preenchidos e retorna análise completa.
+    Requisições com os mesmos números (ignorando email/empresa) são
+    respondidas a partir do cache de resultados.
+    
+    A resposta traz um token_sessao: reenviado junto com o próximo nível,
+    os níveis anteriores que não mudaram são reaproveitados da sessão.
+    
+    Com incluir_monte_carlo (e nível 3), a resposta traz também a simulação
+    Monte Carlo do caixa; a simulação completa fica em /simulacao/monte-carlo.
+    
+    Com plano_com_ia (e nível 3), o plano 30-60-90 vem da IA; se ela não
+    responder dentro do orçamento (ou o disjuntor estiver aberto), fica o
+    plano por regras.
     """
     try:
-        # Extrair dados
-        meta = request.meta.dict()
-        setor = meta["setor"]
-        nivel_maximo = meta["nivel_maximo_preenchido"]
+        chave = cache_resultados.chave(request)
+        em_cache = cache_resultados.obter(chave)
         
-        # ===== EXTRAIR EMAIL/EMPRESA - NOVO =====
-        email = meta.get("email")
-        empresa = meta.get("empresa")
-        # ========================================
+        sessao = await sessoes_analise.obter(request.token_sessao)
+        token = request.token_sessao if sessao is not None else sessoes_analise.novo_token()
+        sessao = sessao or {}
         
-        # Armazenar assumptions globais
-        all_assumptions = []
+        if em_cache is not None:
+            # Acerto: os níveis desta requisição vêm do cache e entram na sessão
+            corpo, dados_niveis, niveis_sessao = em_cache
+            sessao.update(niveis_sessao)
+        else:
+            resposta, dados_niveis = executar_analise(request, sessao, incluir_ranking=False)
+            corpo = resposta.model_dump_json(exclude={"ranking_setor"}).encode()
+            niveis_sessao = {nivel: sessao[nivel] for nivel in niveis_reaproveitaveis(request)}
+            cache_resultados.guardar(chave, corpo, dados_niveis, niveis_sessao)
         
-        # ========== PROCESSAR NÍVEL 1 ==========
-        dados_n1 = request.nivel1.dict()
-        dados_n1, assumptions_n1 = aplicar_defaults_nivel1(dados_n1, setor)
-        all_assumptions.extend(assumptions_n1)
+        # Plano da IA fica fora do cache (a resposta dela varia de uma chamada para outra)
+        if request.plano_com_ia:
+            corpo = await aplicar_plano_ia(corpo, dados_niveis)
         
-        # Cálculos Nível 1
-        disponibilidades = dados_n1["caixa"] + dados_n1["conta_corrente"]
+        # Sempre grava: o token devolvido aponta para uma sessão com os níveis atuais
+        await sessoes_analise.guardar(token, sessao)
         
-        kpis_n1 = {
-            "receita_bruta": dados_n1["receita_bruta_mensal"],
-            "despesas_fixas": dados_n1["despesas_fixas_mensais"],
-            "margem_bruta": calcular_margem_bruta(
-                dados_n1["receita_bruta_mensal"],
-                dados_n1["custo_vendas_mensal"]
-            ),
-            "resultado_operacional": calcular_resultado_operacional(
-                dados_n1["receita_bruta_mensal"],
-                dados_n1["custo_vendas_mensal"],
-                dados_n1["despesas_fixas_mensais"]
-            ),
-            "ponto_equilibrio": calcular_ponto_equilibrio(
-                dados_n1["despesas_fixas_mensais"],
-                dados_n1["receita_bruta_mensal"],
-                dados_n1["custo_vendas_mensal"]
-            ),
-            "liquidez_imediata": calcular_liquidez_imediata(
-                disponibilidades,
-                dados_n1["contas_a_pagar_30d"]
-            ),
-            "folego_caixa": calcular_folego_caixa(
-                disponibilidades,
-                dados_n1["contas_a_receber_30d"],
-                dados_n1["contas_a_pagar_30d"],
-                dados_n1["despesas_fixas_mensais"]
-            )
+        # ===== SALVAR NO BANCO (write-behind) =====
+        analysis_record = criar_registro(request, dados_niveis)
+        if analysis_record is not None:
+            try:
+                await fila_gravacao.enfileirar(analysis_record)
+            except Exception as e:
+                print(f"⚠️ Erro ao salvar no banco: {e}")
+                # Não falha a análise se não conseguir salvar
+        # ==========================================
+        
+        # Corpo já serializado (mesmo formato no acerto e na falta de cache); o ranking
+        # é sempre o atual, não o do momento em que o corpo entrou no cache
+        ranking = posicoes_no_setor(request.meta.setor, dados_niveis)
+        corpo = anexar_campos(corpo, {
+            "ranking_setor": {kpi: posicao.model_dump() for kpi, posicao in ranking.items()} if ranking is not None else None,
+            "token_sessao": token
+        })
+        return Response(content=corpo, media_type="application/json")
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao processar análise: {str(e)}")
+
+
+async def aplicar_plano_ia(corpo: bytes, dados_niveis: Dict) -> bytes:
+    """
+    Troca o plano por regras do corpo já serializado pelo plano da IA
+    
+    Sem diagnóstico (nível < 3) ou sem resposta válida da IA, devolve o corpo como está.
+    """
+    resposta = de_json(corpo)
+    estrategia = resposta.get("diagnostico_estrategia")
+    if estrategia is None:
+        return corpo
+    
+    dados_n1, dados_n2 = dados_niveis["nivel1"], dados_niveis["nivel2"]
+    kpis_n1 = calcular_kpis_nivel1(dados_n1)
+    kpis = {
+        "nivel1": kpis_n1,
+        "nivel2": calcular_kpis_nivel2(dados_n1, dados_n2, kpis_n1) if dados_n2 else None
+    }
+    plano = await gerar_plano_30_60_90_ia_async(kpis)
+    if plano is None:
+        return corpo
+    
+    try:
+        estrategia["plano_30_60_90"] = {
+            periodo: [AcaoPlano(**acao).model_dump() for acao in plano[periodo]]
+            for periodo in ("30_dias", "60_dias", "90_dias")
         }
+    except (TypeError, ValidationError) as e:
+        print(f"Plano da IA fora do formato, mantendo plano por regras: {e}")
+        return corpo
+    return para_json(resposta)
+
+
+def anexar_campos(corpo: bytes, campos: Dict[str, Any]) -> bytes:
+    """
+    Inclui campos no JSON já serializado de AnaliseResponse
+    
+    O cache guarda o corpo sem ranking_setor (muda a cada análise gravada)
+    e sem token (muda por cliente); com os dois, o resultado é o mesmo
+    JSON de AnaliseSessaoResponse.
+    """
+    extras = b"".join(b"," + json.dumps(nome).encode() + b":" + para_json(valor) for nome, valor in campos.items())
+    return corpo[:-1] + extras + b"}"
+
+
+@router.get("/analise/cache")
+async def estatisticas_cache():
+    """
+    Contadores do cache de resultados (acertos, faltas, tamanho)
+    """
+    return cache_resultados.estatisticas()
+
+
+@router.post("/analise/lote", response_model=AnaliseLoteResponse)
+async def processar_analise_lote(itens: List[Dict[str, Any]]):
+    """
+    Processa várias análises em uma única chamada
+    
+    Cada item tem o mesmo formato de /analise. Erros de validação ou de
+    cálculo ficam no resultado do próprio item e não interrompem o lote.
+    Os registros vão para a fila de gravação, que grava em lote.
+    """
+    if len(itens) > settings.MAX_ANALISES_LOTE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Lote excede o limite de {settings.MAX_ANALISES_LOTE} análises"
+        )
+    
+    # O pipeline é CPU puro: roda fora do event loop para não travar outras requisições
+    resultados, registros = await run_in_threadpool(executar_lote, itens)
+    
+    if registros:
+        try:
+            await fila_gravacao.enfileirar_varios(registros)
+        except Exception as e:
+            print(f"⚠️ Erro ao salvar lote no banco: {e}")
+    
+    sucessos = sum(1 for r in resultados if r.sucesso)
+    resposta = AnaliseLoteResponse.model_construct(
+        total=len(resultados),
+        sucessos=sucessos,
+        falhas=len(resultados) - sucessos,
+        resultados=resultados
+    )
+    
+    # Serializa direto: evita a revalidação + jsonable_encoder do FastAPI
+    return Response(content=resposta.model_dump_json(), media_type="application/json")
+
+
+class RespostaNDJSON(StreamingResponse):
+    """
+    StreamingResponse que não escuta desconexão em paralelo
+    
+    A StreamingResponse padrão consome receive() para detectar desconexão,
+    o que disputa as mensagens do corpo com request.stream(). Aqui o corpo
+    ainda está sendo lido enquanto a resposta é enviada, e a própria leitura
+    já detecta a desconexão do cliente.
+    """
+    media_type = "application/x-ndjson"
+    
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+@router.post("/analise/ndjson", response_class=RespostaNDJSON)
+async def processar_analise_ndjson(request: Request):
+    """
+    Processa uma base inteira de empresas em streaming (NDJSON)
+    
+    O corpo tem um AnaliseRequest em JSON por linha (aceita
+    Content-Encoding: gzip). A resposta devolve um resultado por linha,
+    no formato de ItemLoteResultado, à medida que são calculados.
+    A memória do servidor fica constante, qualquer que seja o tamanho da entrada.
+    """
+    compactado = request.headers.get("content-encoding", "").lower() == "gzip"
+    
+    return RespostaNDJSON(_gerar_resultados_ndjson(request, compactado))
+
+
+async def _gerar_resultados_ndjson(request: Request, compactado: bool):
+    """Lê o corpo em blocos de linhas, processa no threadpool e devolve NDJSON"""
+    bloco = []
+    
+    try:
+        async for indice, linha in _ler_linhas_ndjson(request, compactado):
+            bloco.append((indice, linha))
+            if len(bloco) >= settings.NDJSON_LINHAS_POR_BLOCO:
+                async for saida in _processar_bloco_ndjson(bloco):
+                    yield saida
+                bloco = []
+    except (ValueError, zlib.error) as e:
+        # O status 200 já foi enviado: processa o que foi lido e avisa na última linha
+        erro = str(e)
+    else:
+        erro = None
+    
+    if bloco:
+        async for saida in _processar_bloco_ndjson(bloco):
+            yield saida
+    
+    if erro:
+        yield json.dumps({"sucesso": False, "erro": erro}).encode() + b"\n"
+
+
+async def _processar_bloco_ndjson(bloco: List[Tuple[int, bytes]]):
+    """Processa um bloco de linhas e enfileira os registros (a fila aplica backpressure)"""
+    resultados, registros = await run_in_threadpool(executar_linhas_ndjson, bloco)
+    
+    if registros:
+        try:
+            await fila_gravacao.enfileirar_varios(registros)
+        except Exception as e:
+            print(f"⚠️ Erro ao salvar análises do stream no banco: {e}")
+    
+    yield b"".join(resultado.model_dump_json().encode() + b"\n" for resultado in resultados)
+
+
+async def _ler_linhas_ndjson(request: Request, compactado: bool):
+    """
+    Lê o corpo da requisição linha a linha, descompactando gzip sob demanda
+    
+    Yields:
+        (índice da linha, conteúdo) - linhas em branco são ignoradas
+    """
+    pendente = b""
+    indice = 0
+    
+    async for dados in _ler_corpo(request, compactado):
+        *linhas, pendente = (pendente + dados).split(b"\n")
         
-        # Montar resultado Nível 1
-        resultado_n1 = montar_resultado_nivel1(kpis_n1, dados_n1, all_assumptions)
+        for linha in linhas:
+            if linha.strip():
+                yield indice, linha
+                indice += 1
         
-        # Inicializar resposta
-        response_data = {
-            "nivel1": resultado_n1,
-            "nivel2": None,
-            "nivel3": None,
-            "diagnostico_estrategia": None,
-            "status_validacao": {
-                "assumptions": all_assumptions,
-                "avisos": validar_coerencia({"nivel1": dados_n1})
-            }
-        }
+        if len(pendente) > settings.NDJSON_MAX_BYTES_LINHA:
+            raise ValueError(
+                f"Linha NDJSON excede o tamanho máximo ({settings.NDJSON_MAX_BYTES_LINHA} bytes) - leitura interrompida"
+            )
+    
+    if pendente.strip():
+        yield indice, pendente
+
+
+async def _ler_corpo(request: Request, compactado: bool):
+    """Pedaços do corpo; com gzip, descompacta em partes limitadas para não estourar a memória"""
+    if not compactado:
+        async for pedaco in request.stream():
+            yield pedaco
+        return
+    
+    descompactador = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    limite = settings.NDJSON_MAX_BYTES_LINHA
+    
+    async for pedaco in request.stream():
+        yield descompactador.decompress(pedaco, limite)
+        while descompactador.unconsumed_tail:
+            yield descompactador.decompress(descompactador.unconsumed_tail, limite)
+    
+    yield descompactador.flush()
+
+
+def executar_linhas_ndjson(linhas: List[Tuple[int, bytes]]) -> Tuple[List[ItemLoteResultado], List[AnalysisRecord]]:
+    """
+    Decodifica e executa o pipeline para um bloco de linhas NDJSON
+    
+    Returns:
+        (resultados por linha, registros a salvar)
+    """
+    resultados = []
+    registros = []
+    
+    for indice, linha in linhas:
+        try:
+            item = json.loads(linha)
+        except ValueError as e:
+            resultados.append(ItemLoteResultado(indice=indice, sucesso=False, erro=f"JSON inválido: {e}"))
+            continue
+        
+        if not isinstance(item, dict):
+            resultados.append(ItemLoteResultado(indice=indice, sucesso=False, erro="Cada linha deve ser um objeto JSON"))
+            continue
+        
+        resultado, registro = processar_item(indice, item)
+        resultados.append(resultado)
+        if registro is not None:
+            registros.append(registro)
+    
+    return resultados, registros
+
+
+def executar_lote(itens: List[Dict[str, Any]]) -> Tuple[List[ItemLoteResultado], List[AnalysisRecord]]:
+    """
+    Valida e executa o pipeline para cada item do lote
+    
+    Returns:
+        (resultados por item, registros a salvar)
+    """
+    resultados = []
+    registros = []
+    
+    for indice, item in enumerate(itens):
+        resultado, registro = processar_item(indice, item)
+        resultados.append(resultado)
+        if registro is not None:
+            registros.append(registro)
+    
+    return resultados, registros
+
+
+def processar_item(indice: int, item: Dict[str, Any]) -> Tuple[ItemLoteResultado, Optional[AnalysisRecord]]:
+    """
+    Valida e executa o pipeline para um item de lote/stream
+    
+    Erros viram um ItemLoteResultado com sucesso=False (nunca levanta exceção).
+    
+    Returns:
+        (resultado do item, registro a salvar ou None)
+    """
+    try:
+        request = AnaliseRequest(**item)
+    except ValidationError as e:
+        campos = "; ".join(
+            f"{'.'.join(str(parte) for parte in erro['loc'])}: {erro['msg']}"
+            for erro in e.errors()
+        )
+        return ItemLoteResultado(
+            indice=indice,
+            sucesso=False,
+            erro=f"Dados inválidos - {campos}"
+        ), None
+    
+    try:
+        resposta, dados_niveis = executar_analise(request)
+        registro = criar_registro(request, dados_niveis)
+    except Exception as e:
+        return ItemLoteResultado(
+            indice=indice,
+            sucesso=False,
+            erro=f"Erro ao processar análise: {str(e)}"
+        ), None
+    
+    return ItemLoteResultado(indice=indice, sucesso=True, resultado=resposta), registro
+
+
+def criar_registro(request: AnaliseRequest, dados_niveis: Dict) -> Optional[AnalysisRecord]:
+    """
+    Monta o registro para o banco (None quando não há email)
+    
+    Args:
+        request: requisição original (fornece email, empresa e meta)
+        dados_niveis: dados dos níveis com defaults aplicados, vindos de executar_analise
+    """
+    meta = request.meta.model_dump()
+    
+    # ===== EXTRAIR EMAIL/EMPRESA - NOVO =====
+    email = meta.get("email")
+    empresa = meta.get("empresa")
+    # ========================================
+    
+    if not email:
+        return None
+    
+    # Preparar dados completos para salvar (campos estimados ficam fora dos benchmarks)
+    dados_completos = {**dados_niveis, "meta": meta, "estimados": campos_estimados(request)}
+    
+    registro = AnalysisRecord(
+        email=email,
+        empresa=empresa or "Não informado",
+        setor=meta["setor"],
+        periodo_referencia=datetime.now().strftime("%Y-%m"),
+        dados_financeiros=dados_completos,
+        created_at=datetime.utcnow()
+    )
+    # Gravado em cascata com o registro (mesma transação)
+    registro.resumo = criar_resumo(registro)
+    return registro
+
+
+def executar_analise(
+    request: AnaliseRequest,
+    sessao: Optional[Dict] = None,
+    incluir_ranking: bool = True
+) -> Tuple[AnaliseResponse, Dict]:
+    """
+    Executa o pipeline completo de análise (níveis 1 a 3 + diagnóstico)
+    
+    Não acessa o banco nem usa email/empresa: o resultado depende só dos números.
+    
+    Args:
+        request: Requisição validada
+        sessao: Dados da sessão de análise (opcional). Níveis 1 e 2 com a
+            mesma assinatura são reaproveitados, e os calculados agora
+            são gravados nela.
+        incluir_ranking: Calcula ranking_setor (o /analise calcula fora
+            do cache, porque os esboços do setor mudam a cada gravação)
+    
+    Returns:
+        (resposta da análise, dados dos níveis com defaults aplicados)
+    """
+    # Extrair dados
+    meta = request.meta.model_dump()
+    setor = meta["setor"]
+    nivel_maximo = meta["nivel_maximo_preenchido"]
+    
+    # Armazenar assumptions globais
+    all_assumptions = []
+    
+    # ========== PROCESSAR NÍVEL 1 ==========
+    entrada_n1 = request.nivel1.model_dump()
+    assinatura_n1 = assinatura_nivel(setor, entrada_n1) if sessao is not None else None
+    salvo_n1 = nivel_da_sessao(sessao, "nivel1", assinatura_n1)
+    
+    if salvo_n1:
+        dados_n1 = salvo_n1["dados"]
+        assumptions_n1 = salvo_n1["assumptions"]
+        kpis_n1 = salvo_n1["kpis"]
+        resultado_n1 = ResultadoNivel.model_validate(salvo_n1["resultado"])
+    else:
+        dados_n1, assumptions_n1 = aplicar_defaults_nivel1(entrada_n1, setor)
+        kpis_n1 = calcular_kpis_nivel1(dados_n1)
         
-        # ========== PROCESSAR NÍVEL 2 (se aplicável) ==========
-        # Inicializar variáveis para evitar erro quando usuário pula o nível 2
-        kpis_n2 = None
-        dados_n2 = {}
-        dados_n3 = {}  
+        # Montar resultado Nível 1
+        resultado_n1 = montar_resultado_nivel1(kpis_n1, dados_n1, assumptions_n1)
+        guardar_nivel_na_sessao(sessao, "nivel1", assinatura_n1, dados_n1, assumptions_n1, kpis_n1, resultado_n1)
+    
+    all_assumptions.extend(assumptions_n1)
+    disponibilidades = dados_n1["caixa"] + dados_n1["conta_corrente"]
+    
+    # Inicializar resposta
+    response_data = {
+        "nivel1": resultado_n1,
+        "nivel2": None,
+        "nivel3": None,
+        "diagnostico_estrategia": None,
+        "simulacao_monte_carlo": None,
+        "ranking_setor": None,
+        "status_validacao": {
+            "assumptions": all_assumptions,
+            "avisos": validar_coerencia({"nivel1": dados_n1})
+        }
+    }
+    
+    # ========== PROCESSAR NÍVEL 2 (se aplicável) ==========
+    # Inicializar variáveis para evitar erro quando usuário pula o nível 2
+    kpis_n2 = None
+    dados_n2 = {}
+    dados_n3 = {}  
+    
+    if nivel_maximo >= 2 and request.nivel2:
+        entrada_n2 = request.nivel2.model_dump()
+        assinatura_n2 = assinatura_nivel(setor, entrada_n2, anterior=assinatura_n1) if sessao is not None else None
+        salvo_n2 = nivel_da_sessao(sessao, "nivel2", assinatura_n2)
         
-        if nivel_maximo >= 2 and request.nivel2:
-            dados_n2 = request.nivel2.dict()
-            dados_n2, assumptions_n2 = aplicar_defaults_nivel2(dados_n2, setor)
+        if salvo_n2:
+            dados_n2 = salvo_n2["dados"]
+            all_assumptions.extend(salvo_n2["assumptions"])
+            kpis_n2 = salvo_n2["kpis"]
+            response_data["nivel2"] = ResultadoNivel.model_validate(salvo_n2["resultado"])
+        else:
+            dados_n2, assumptions_n2 = aplicar_defaults_nivel2(entrada_n2, setor)
             all_assumptions.extend(assumptions_n2)
-            
-            # Cálculos Nível 2
-            dio = calcular_dio(dados_n2["estoque_custo"], dados_n1["custo_vendas_mensal"])
-            ciclo_op = calcular_ciclo_operacional(dio, dados_n2["prazo_medio_recebimento_dias"])
-            ciclo_fin = calcular_ciclo_financeiro(ciclo_op, dados_n2["prazo_medio_pagamento_dias"])
-            
-            kpis_n2 = {
-                **kpis_n1,  # Inclui KPIs do nível 1
-                "dso": dados_n2["prazo_medio_recebimento_dias"],
-                "dpo": dados_n2["prazo_medio_pagamento_dias"],
-                "dio": dio,
-                "ciclo_operacional": ciclo_op,
-                "ciclo_financeiro": ciclo_fin,
-                "ncg_estimada": calcular_ncg_estimada(
-                    dados_n2["estoque_custo"],
-                    dados_n1["contas_a_receber_30d"],
-                    dados_n1["contas_a_pagar_30d"]
-                ),
-                "alavancagem": calcular_alavancagem(
-                    dados_n2["dividas_totais"],
-                    dados_n1["receita_bruta_mensal"]
-                ),
-                "cobertura_juros": calcular_cobertura_juros(
-                    kpis_n1["resultado_operacional"],
-                    dados_n2["despesas_financeiras_mensais"]
-                ),
-                "produtividade": calcular_produtividade(
-                    dados_n1["receita_bruta_mensal"],
-                    dados_n2["numero_funcionarios"]
-                ) if dados_n2["numero_funcionarios"] else None,
-                "simulacao_reducao_dso": simular_reducao_dso(
-                    dados_n1["receita_bruta_mensal"], 10
-                ),
-                "simulacao_aumento_dpo": simular_aumento_dpo(
-                    dados_n1["custo_vendas_mensal"], 7
-                )
-            }
+            kpis_n2 = calcular_kpis_nivel2(dados_n1, dados_n2, kpis_n1)
             
             response_data["nivel2"] = montar_resultado_nivel2(kpis_n2, all_assumptions)
-        
-        # ========== PROCESSAR NÍVEL 3 (se aplicável) ==========
-        if nivel_maximo >= 3 and request.nivel3:
-            dados_n3 = request.nivel3.dict()
-            dados_n3, assumptions_n3 = aplicar_defaults_nivel3(dados_n3)
-            all_assumptions.extend(assumptions_n3)
-            
-            # Cálculos Nível 3
-            tendencia = calcular_tendencia_receita(dados_n3["receita_ultimos_3_meses"])
-            
-            # Preparar dados para projeção
-            projecoes = projetar_cenarios(
-                receita_base=dados_n1["receita_bruta_mensal"],
-                custo_base=dados_n1["custo_vendas_mensal"],
-                despesas_fixas=dados_n1["despesas_fixas_mensais"],
-                despesas_variaveis_percentual=dados_n3["despesas_variaveis_percentual_receita"],
-                impostos_mensais=dados_n2.get("impostos_mensais", 0),
-                despesas_financeiras=dados_n2.get("despesas_financeiras_mensais", 0),
-                dso_atual=dados_n2.get("prazo_medio_recebimento_dias", 30),
-                dpo_atual=dados_n2.get("prazo_medio_pagamento_dias", 30),
-                caixa_inicial=disponibilidades,
-                meta_margem_bruta=dados_n3["meta_margem_bruta_percentual"],
-                num_meses=6
+            guardar_nivel_na_sessao(
+                sessao, "nivel2", assinatura_n2, dados_n2, assumptions_n2, kpis_n2, response_data["nivel2"]
             )
-            
-            # Calcular ROA, ROE, Payback
-            ativos_totais = dados_n3["imobilizado"]
-            if request.nivel2:
-                ativos_totais += kpis_n2.get("ncg_estimada", 0)
-            
-            # Determinar base de KPIs (corrigido o erro de sintaxe)
-            kpis_base = kpis_n2 if request.nivel2 else kpis_n1
-            
-            kpis_n3 = {
-                **kpis_base,  # Agora funciona sem erro de sintaxe
-                "tendencia": tendencia["tendencia"],
-                "variacao_media": tendencia["variacao_percentual_media"],
-                "projecoes": projecoes,
-                "roa": calcular_roa(kpis_n1["resultado_operacional"], ativos_totais) if ativos_totais > 0 else None,
-                "roe": calcular_roe(
-                    kpis_n1["resultado_operacional"],
-                    dados_n2.get("despesas_financeiras_mensais", 0) if request.nivel2 else 0,
-                    dados_n2.get("impostos_mensais", 0) if request.nivel2 else 0,
-                    dados_n3["patrimonio_liquido"]
-                ) if dados_n3["patrimonio_liquido"] > 0 else None,
-                "payback_capex": calcular_payback_capex(
-                    dados_n3["capex_planejado_prox_6m"],
-                    kpis_n1["resultado_operacional"] * 12
-                ) if dados_n3["capex_planejado_prox_6m"] and dados_n3["capex_planejado_prox_6m"] > 0 else None
-            }
-            
-            response_data["nivel3"] = montar_resultado_nivel3(kpis_n3, tendencia, all_assumptions)
+    
+    # ========== PROCESSAR NÍVEL 3 (se aplicável) ==========
+    if nivel_maximo >= 3 and request.nivel3:
+        dados_n3 = request.nivel3.model_dump()
+        dados_n3, assumptions_n3 = aplicar_defaults_nivel3(dados_n3)
+        all_assumptions.extend(assumptions_n3)
         
-        # ========== GERAR DIAGNÓSTICO FINAL ==========
-        if nivel_maximo >= 2:  # Só gera diagnóstico se tiver pelo menos nível 2
-            kpis_diagnostico = kpis_n3 if nivel_maximo >= 3 else kpis_n2
-            
-            diagnostico = gerar_diagnostico_final(kpis_diagnostico)
-            
-            receita_base = dados_n1["receita_bruta_mensal"]
-            oportunidades = gerar_oportunidades(kpis_diagnostico, receita_base)
-            
-            kpis_completos = {
-                "nivel1": kpis_n1,
-                "nivel2": kpis_n2 if nivel_maximo >= 2 else None,
-                "nivel3": kpis_n3 if nivel_maximo >= 3 else None
-            }
-            plano_90d = gerar_plano_personalizado(kpis_completos, meta)
-            
-            response_data["diagnostico_estrategia"] = DiagnosticoEstrategia(
-                diagnostico=diagnostico,
-                oportunidades=oportunidades,
-                plano_30_60_90=plano_90d
-            )
+        # Cálculos Nível 3
+        tendencia = calcular_tendencia_receita(dados_n3["receita_ultimos_3_meses"])
+        
+        # Preparar dados para projeção
+        projecoes = projetar_cenarios(
+            receita_base=dados_n1["receita_bruta_mensal"],
+            custo_base=dados_n1["custo_vendas_mensal"],
+            despesas_fixas=dados_n1["despesas_fixas_mensais"],
+            despesas_variaveis_percentual=dados_n3["despesas_variaveis_percentual_receita"],
+            impostos_mensais=dados_n2.get("impostos_mensais", 0),
+            despesas_financeiras=dados_n2.get("despesas_financeiras_mensais", 0),
+            dso_atual=dados_n2.get("prazo_medio_recebimento_dias", 30),
+            dpo_atual=dados_n2.get("prazo_medio_pagamento_dias", 30),
+            caixa_inicial=disponibilidades,
+            meta_margem_bruta=dados_n3["meta_margem_bruta_percentual"],
+            num_meses=6
+        )
         
-        # Atualizar validação final
-        todos_dados = {"nivel1": dados_n1}
+        # Calcular ROA, ROE, Payback
+        ativos_totais = dados_n3["imobilizado"]
         if request.nivel2:
-            todos_dados["nivel2"] = dados_n2
-        if request.nivel3:
-            todos_dados["nivel3"] = dados_n3
+            ativos_totais += kpis_n2.get("ncg_estimada", 0)
         
-        response_data["status_validacao"]["avisos"] = validar_coerencia(todos_dados)
-        response_data["status_validacao"]["assumptions"] = all_assumptions
+        # Determinar base de KPIs (corrigido o erro de sintaxe)
+        kpis_base = kpis_n2 if request.nivel2 else kpis_n1
         
-        # ===== SALVAR NO BANCO - NOVO =====
-        if email:
-            try:
-                # Preparar dados completos para salvar
-                dados_completos = {
-                    "nivel1": dados_n1,
-                    "nivel2": dados_n2 if request.nivel2 else None,
-                    "nivel3": dados_n3 if request.nivel3 else None,
-                    "meta": meta
-                }
-                
-                analysis_record = AnalysisRecord(
-                    email=email,
-                    empresa=empresa or "Não informado",
-                    setor=setor,
-                    periodo_referencia=datetime.now().strftime("%Y-%m"),
-                    dados_financeiros=dados_completos
-                )
-                db.add(analysis_record)
-                db.commit()
-                db.refresh(analysis_record)
-                print(f"✅ Análise salva no banco! ID: {analysis_record.id} - Email: {email}")
-            except Exception as e:
-                print(f"⚠️ Erro ao salvar no banco: {e}")
-                # Não falha a análise se não conseguir salvar
-        # ======================================
+        kpis_n3 = {
+            **kpis_base,  # Agora funciona sem erro de sintaxe
+            "tendencia": tendencia["tendencia"],
+            "variacao_media": tendencia["variacao_percentual_media"],
+            "projecoes": projecoes,
+            "roa": calcular_roa(kpis_n1["resultado_operacional"], ativos_totais) if ativos_totais > 0 else None,
+            "roe": calcular_roe(
+                kpis_n1["resultado_operacional"],
+                dados_n2.get("despesas_financeiras_mensais", 0) if request.nivel2 else 0,
+                dados_n2.get("impostos_mensais", 0) if request.nivel2 else 0,
+                dados_n3["patrimonio_liquido"]
+            ) if dados_n3["patrimonio_liquido"] > 0 else None,
+            "payback_capex": calcular_payback_capex(
+                dados_n3["capex_planejado_prox_6m"],
+                kpis_n1["resultado_operacional"] * 12
+            ) if dados_n3["capex_planejado_prox_6m"] and dados_n3["capex_planejado_prox_6m"] > 0 else None
+        }
         
-        return AnaliseResponse(**response_data)
+        response_data["nivel3"] = montar_resultado_nivel3(kpis_n3, tendencia, all_assumptions)
+        
+        # Faixas de caixa e risco de caixa negativo (complementa os 3 cenários).
+        # Só quando a requisição pede: no lote e no NDJSON custaria mais que a análise
+        if request.incluir_monte_carlo and settings.MONTE_CARLO_NA_ANALISE:
+            response_data["simulacao_monte_carlo"] = SimulacaoMonteCarlo(
+                **simular_empresa(dados_n1, dados_n2, dados_n3, setor)
+            )
     
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Erro ao processar análise: {str(e)}")
+    # ========== GERAR DIAGNÓSTICO FINAL ==========
+    if nivel_maximo >= 2:  # Só gera diagnóstico se tiver pelo menos nível 2
+        kpis_diagnostico = kpis_n3 if nivel_maximo >= 3 else kpis_n2
+        
+        diagnostico = gerar_diagnostico_final(kpis_diagnostico)
+        
+        receita_base = dados_n1["receita_bruta_mensal"]
+        oportunidades = gerar_oportunidades(kpis_diagnostico, receita_base)
+        
+        kpis_completos = {
+            "nivel1": kpis_n1,
+            "nivel2": kpis_n2 if nivel_maximo >= 2 else None,
+            "nivel3": kpis_n3 if nivel_maximo >= 3 else None
+        }
+        plano_90d = gerar_plano_personalizado(kpis_completos, meta)
+        
+        response_data["diagnostico_estrategia"] = DiagnosticoEstrategia(
+            diagnostico=diagnostico,
+            oportunidades=oportunidades,
+            plano_30_60_90=plano_90d
+        )
+    
+    # Atualizar validação final
+    todos_dados = {"nivel1": dados_n1}
+    if request.nivel2:
+        todos_dados["nivel2"] = dados_n2
+    if request.nivel3:
+        todos_dados["nivel3"] = dados_n3
+    
+    response_data["status_validacao"]["avisos"] = validar_coerencia(todos_dados)
+    response_data["status_validacao"]["assumptions"] = all_assumptions
+    
+    # Dados usados no registro do banco
+    dados_niveis = {
+        "nivel1": dados_n1,
+        "nivel2": dados_n2 if request.nivel2 else None,
+        "nivel3": dados_n3 if request.nivel3 else None
+    }
+    
+    if incluir_ranking:
+        response_data["ranking_setor"] = posicoes_no_setor(setor, dados_niveis)
+    
+    # Partes já validadas/montadas internamente: não revalida
+    return AnaliseResponse.model_construct(**response_data), dados_niveis
+
+
+@router.post("/simulacao/monte-carlo", response_model=SimulacaoMonteCarlo)
+async def simulacao_monte_carlo(
+    request: AnaliseRequest,
+    caminhos: int = Query(settings.MONTE_CARLO_CAMINHOS, ge=1000, le=100_000),
+    meses: int = Query(6, ge=1, le=24)
+):
+    """
+    Simulação Monte Carlo do fluxo de caixa de uma empresa
+    
+    Usa os níveis enviados (com os mesmos defaults da análise). Sem nível 3,
+    as despesas variáveis entram como zero; sem nível 2, impostos e despesas
+    financeiras também.
+    
+    Retorna percentis (p5 a p95) de caixa e resultado operacional por mês
+    e a probabilidade de o caixa ficar negativo até cada mês.
+    """
+    setor = request.meta.setor.value
+    dados_n1, _ = aplicar_defaults_nivel1(request.nivel1.model_dump(), setor)
+    dados_n2 = aplicar_defaults_nivel2(request.nivel2.model_dump(), setor)[0] if request.nivel2 else {}
+    dados_n3 = aplicar_defaults_nivel3(request.nivel3.model_dump())[0] if request.nivel3 else {}
+    
+    # CPU pura (dezenas de ms): fora do event loop
+    return await run_in_threadpool(
+        simular_empresa, dados_n1, dados_n2, dados_n3, setor, caminhos, meses
+    )
+
+
+@router.post("/analise/sensibilidade", response_model=SensibilidadeResponse)
+async def analise_sensibilidade(
+    request: AnaliseRequest,
+    variacao: float = Query(10, gt=0, le=100, description="Perturbação de cada variável, em %")
+):
+    """
+    Análise de sensibilidade (gráfico de tornado)
+    
+    Reduz e aumenta em `variacao`% cada entrada (receita, custo, despesas
+    fixas, DSO, DPO e estoque) e mostra o efeito em resultado operacional,
+    fôlego de caixa e ciclo financeiro. Todos os cenários são calculados
+    em uma única passada vetorizada.
+    
+    Sem Nível 2, prazos e estoque usam os defaults do setor.
+    """
+    setor = request.meta.setor.value
+    dados_n1, assumptions = aplicar_defaults_nivel1(request.nivel1.model_dump(), setor)
+    entrada_n2 = request.nivel2.model_dump() if request.nivel2 else {}
+    dados_n2, assumptions_n2 = aplicar_defaults_nivel2(entrada_n2, setor)
+    
+    return {
+        **analisar_sensibilidade(dados_n1, dados_n2, variacao),
+        "assumptions": assumptions + assumptions_n2
+    }
+
+
+@router.post("/analise/meta", response_model=BuscaMetaResponse)
+async def busca_meta(request: BuscaMetaRequest):
+    """
+    Busca de meta (goal-seek) sobre os KPIs dos níveis 1 e 2
+    
+    Para cada empresa e cada meta ({kpi, alvo, variavel}), calcula quanto
+    a variável precisa valer para o KPI chegar ao alvo, mantendo o resto.
+    Ex: {"kpi": "folego_caixa", "alvo": 60, "variavel": "disponibilidades"}.
+    Metas impossíveis voltam com alcancavel=false e o motivo.
+    """
+    if len(request.empresas) > settings.MAX_ANALISES_LOTE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Lote excede o limite de {settings.MAX_ANALISES_LOTE} empresas"
+        )
+    if len(request.metas) > settings.BUSCA_META_MAX_METAS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Limite de {settings.BUSCA_META_MAX_METAS} metas por chamada"
+        )
+    
+    try:
+        resultados = await run_in_threadpool(executar_busca_meta, request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return {
+        "total": len(resultados),
+        "alcancaveis": sum(1 for r in resultados if r["alcancavel"]),
+        "resultados": resultados
+    }
+
+
+def executar_busca_meta(request: BuscaMetaRequest) -> List[Dict]:
+    """Aplica os defaults, resolve cada meta para todas as empresas e ordena por empresa"""
+    empresas = []
+    for empresa in request.empresas:
+        setor = empresa.meta.setor.value
+        dados_n1, _ = aplicar_defaults_nivel1(empresa.nivel1.model_dump(), setor)
+        entrada_n2 = empresa.nivel2.model_dump() if empresa.nivel2 else {}
+        dados_n2, _ = aplicar_defaults_nivel2(entrada_n2, setor)
+        empresas.append({"nivel1": dados_n1, "nivel2": dados_n2})
+    
+    colunas = montar_colunas(empresas)
+    por_meta = [resolver_meta(colunas, meta.kpi, meta.variavel, meta.alvo) for meta in request.metas]
+    
+    return [
+        {"indice_empresa": indice, **resultados[indice]}
+        for indice in range(len(empresas))
+        for resultados in por_meta
+    ]
+
+
+@router.get("/ranking/{setor}")
+async def ranking_do_setor(setor: SetorEnum):
+    """
+    Distribuição dos KPIs entre as empresas do setor (p10, p25, mediana, p75, p90)
+    
+    Calculada dos esboços de quantis do ranking setorial (erro de ~1% no valor).
+    """
+    return {"setor": setor.value, "kpis": ranking_setorial.quantis(setor)}
+
+
+@router.get("/benchmarks/{setor}")
+async def benchmarks_do_setor(setor: SetorEnum):
+    """
+    Benchmarks publicados do setor (amostras, p25, mediana, p75 por indicador)
+    
+    Gerados em lote por scripts/gerar_benchmarks.py a partir das análises gravadas.
+    """
+    return {
+        "setor": setor.value,
+        "versao": benchmarks_populacao.versao,
+        "indicadores": benchmarks_populacao.do_setor(setor)
+    }
 
 
 # ===== NOVO ENDPOINT: HISTÓRICO =====
+# Colunas leves usadas nas listagens do histórico
+COLUNAS_LISTAGEM = (
+    AnalysisRecord.id,
+    AnalysisRecord.empresa,
+    AnalysisRecord.setor,
+    AnalysisRecord.periodo_referencia,
+    AnalysisRecord.created_at
+)
+
+
 @router.get("/historico/{email}")
-async def obter_historico(email: str, db: Session = Depends(get_db)):
+async def obter_historico(
+    email: str,
+    after: Optional[str] = Query(None, description="Cursor devolvido em proximo_cursor da página anterior"),
+    limit: int = Query(settings.HISTORICO_LIMITE_PADRAO, ge=1, le=settings.HISTORICO_LIMITE_MAXIMO),
+    data_inicio: Optional[datetime] = Query(None, description="Só análises criadas a partir desta data"),
+    data_fim: Optional[datetime] = Query(None, description="Só análises criadas antes desta data"),
+    db: AsyncSession = Depends(get_async_db)
+):
     """
-    Retorna histórico de análises de um email
+    Retorna histórico de análises de um email, paginado
+    
+    Mais recentes primeiro. A paginação é por cursor (keyset) sobre o
+    índice (email, created_at, id): cada página custa o mesmo, não importa
+    quantas análises o email tenha. Para a próxima página, envie o
+    proximo_cursor recebido em after (null = não há mais páginas).
+    
+    total_analises (todas as análises do email dentro do período) só vem
+    na primeira página, contado no índice; nas seguintes (com after) vem
+    null, para que elas continuem com custo constante.
     """
+    filtros = [AnalysisRecord.email == email]
+    if data_inicio:
+        filtros.append(AnalysisRecord.created_at >= para_utc(data_inicio))
+    if data_fim:
+        filtros.append(AnalysisRecord.created_at < para_utc(data_fim))
+    
+    # Só as colunas da listagem: dados_financeiros (o JSON grande) fica no banco
+    consulta = (
+        select(*COLUNAS_LISTAGEM)
+        .where(*filtros)
+        .order_by(AnalysisRecord.created_at.desc(), AnalysisRecord.id.desc())
+        .limit(limit + 1)  # Um a mais para saber se existe próxima página
+    )
+    
+    if after:
+        criado_em, id_analise = decodificar_cursor(after)
+        consulta = consulta.where(
+            tuple_(AnalysisRecord.created_at, AnalysisRecord.id) < tuple_(criado_em, id_analise)
+        )
+    
     try:
-        analises = db.query(AnalysisRecord)\
-            .filter(AnalysisRecord.email == email)\
-            .order_by(AnalysisRecord.created_at.desc())\
-            .all()
-        
-        return {
-            "email": email,
-            "total_analises": len(analises),
-            "analises": [
-                {
-                    "id": a.id,
-                    "empresa": a.empresa,
-                    "setor": a.setor,
-                    "periodo": a.periodo_referencia,
-                    "data": a.created_at.isoformat()
-                }
-                for a in analises
-            ]
-        }
+        resultado = await db.execute(consulta)
+        analises = resultado.all()
+        total = None
+        if not after:
+            total = await db.scalar(select(func.count()).select_from(AnalysisRecord).where(*filtros))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao buscar histórico: {str(e)}")
+    
+    tem_mais = len(analises) > limit
+    analises = analises[:limit]
+    
+    return {
+        "email": email,
+        "total_analises": total,
+        "analises": [
+            {
+                "id": a.id,
+                "empresa": a.empresa,
+                "setor": a.setor,
+                "periodo": a.periodo_referencia,
+                "data": a.created_at.isoformat()
+            }
+            for a in analises
+        ],
+        "proximo_cursor": codificar_cursor(analises[-1]) if tem_mais else None
+    }
+
+
+# KPIs devolvidos na evolução (colunas de ResumoAnalise)
+COLUNAS_EVOLUCAO = (
+    ResumoAnalise.analise_id,
+    ResumoAnalise.created_at,
+    ResumoAnalise.margem_bruta,
+    ResumoAnalise.resultado_operacional,
+    ResumoAnalise.folego_caixa,
+    ResumoAnalise.liquidez_imediata,
+    ResumoAnalise.ciclo_financeiro,
+    ResumoAnalise.alavancagem,
+    ResumoAnalise.roa,
+    ResumoAnalise.roe
+)
+
+
+@router.get("/historico/{email}/evolucao")
+async def obter_evolucao(
+    email: str,
+    data_inicio: Optional[datetime] = Query(None, description="Só análises criadas a partir desta data"),
+    data_fim: Optional[datetime] = Query(None, description="Só análises criadas antes desta data"),
+    limit: int = Query(settings.HISTORICO_LIMITE_MAXIMO, ge=1, le=settings.HISTORICO_LIMITE_MAXIMO),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Evolução dos KPIs principais de um email (para gráficos e comparações)
+    
+    Lê só a tabela de resumos pelo índice (email, created_at): nenhuma
+    análise é recalculada e dados_financeiros não é carregado.
+    Retorna as `limit` análises mais recentes do período, em ordem cronológica.
+    """
+    consulta = (
+        select(*COLUNAS_EVOLUCAO)
+        .where(ResumoAnalise.email == email)
+        .order_by(ResumoAnalise.created_at.desc(), ResumoAnalise.analise_id.desc())
+        .limit(limit)
+    )
+    if data_inicio:
+        consulta = consulta.where(ResumoAnalise.created_at >= para_utc(data_inicio))
+    if data_fim:
+        consulta = consulta.where(ResumoAnalise.created_at < para_utc(data_fim))
+    
+    try:
+        resultado = await db.execute(consulta)
+        linhas = resultado.all()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao buscar evolução: {str(e)}")
+    
+    return {
+        "email": email,
+        "pontos": [
+            {
+                "id": linha.analise_id,
+                "data": linha.created_at.isoformat(),
+                **{coluna.key: getattr(linha, coluna.key) for coluna in COLUNAS_EVOLUCAO[2:]}
+            }
+            for linha in reversed(linhas)
+        ]
+    }
+
+
+@router.get("/historico/{email}/{id_analise}")
+async def obter_analise_historico(email: str, id_analise: int, db: AsyncSession = Depends(get_async_db)):
+    """
+    Retorna uma análise do histórico com os dados financeiros completos
+    """
+    try:
+        resultado = await db.execute(
+            select(AnalysisRecord)
+            .options(undefer(AnalysisRecord.dados_financeiros))
+            .where(AnalysisRecord.id == id_analise, AnalysisRecord.email == email)
+        )
+        analise = resultado.scalar_one_or_none()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao buscar análise: {str(e)}")
+    
+    if analise is None:
+        raise HTTPException(status_code=404, detail="Análise não encontrada")
+    
+    return {
+        "id": analise.id,
+        "empresa": analise.empresa,
+        "setor": analise.setor,
+        "periodo": analise.periodo_referencia,
+        "data": analise.created_at.isoformat(),
+        "dados_financeiros": analise.dados_financeiros
+    }
+
+
+def codificar_cursor(analise) -> str:
+    """Cursor opaco com a posição (created_at, id) da última análise da página"""
+    posicao = json.dumps([analise.created_at.isoformat(), analise.id])
+    return base64.urlsafe_b64encode(posicao.encode()).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Posição (created_at, id) de um cursor; cursor inválido vira 400"""
+    try:
+        preenchimento = "=" * (-len(cursor) % 4)
+        criado_em, id_analise = json.loads(base64.urlsafe_b64decode(cursor + preenchimento))
+        return datetime.fromisoformat(criado_em), int(id_analise)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Cursor de paginação inválido")
+
+
+def para_utc(data: datetime) -> datetime:
+    """created_at é gravado em UTC sem fuso: converte datas com fuso para o mesmo formato"""
+    if data.tzinfo is None:
+        return data
+    return data.astimezone(timezone.utc).replace(tzinfo=None)
 # =====================================
 
 
+def calcular_kpis_nivel1(dados_n1: Dict) -> Dict:
+    """KPIs do Nível 1 (dados já com defaults)"""
+    disponibilidades = dados_n1["caixa"] + dados_n1["conta_corrente"]
+    
+    return {
+        "receita_bruta": dados_n1["receita_bruta_mensal"],
+        "despesas_fixas": dados_n1["despesas_fixas_mensais"],
+        "margem_bruta": calcular_margem_bruta(
+            dados_n1["receita_bruta_mensal"],
+            dados_n1["custo_vendas_mensal"]
+        ),
+        "resultado_operacional": calcular_resultado_operacional(
+            dados_n1["receita_bruta_mensal"],
+            dados_n1["custo_vendas_mensal"],
+            dados_n1["despesas_fixas_mensais"]
+        ),
+        "ponto_equilibrio": calcular_ponto_equilibrio(
+            dados_n1["despesas_fixas_mensais"],
+            dados_n1["receita_bruta_mensal"],
+            dados_n1["custo_vendas_mensal"]
+        ),
+        "liquidez_imediata": calcular_liquidez_imediata(
+            disponibilidades,
+            dados_n1["contas_a_pagar_30d"]
+        ),
+        "folego_caixa": calcular_folego_caixa(
+            disponibilidades,
+            dados_n1["contas_a_receber_30d"],
+            dados_n1["contas_a_pagar_30d"],
+            dados_n1["despesas_fixas_mensais"]
+        )
+    }
+
+
+def calcular_kpis_nivel2(dados_n1: Dict, dados_n2: Dict, kpis_n1: Dict) -> Dict:
+    """KPIs do Nível 2 (inclui os do Nível 1)"""
+    dio = calcular_dio(dados_n2["estoque_custo"], dados_n1["custo_vendas_mensal"])
+    ciclo_op = calcular_ciclo_operacional(dio, dados_n2["prazo_medio_recebimento_dias"])
+    ciclo_fin = calcular_ciclo_financeiro(ciclo_op, dados_n2["prazo_medio_pagamento_dias"])
+    
+    return {
+        **kpis_n1,  # Inclui KPIs do nível 1
+        "dso": dados_n2["prazo_medio_recebimento_dias"],
+        "dpo": dados_n2["prazo_medio_pagamento_dias"],
+        "dio": dio,
+        "ciclo_operacional": ciclo_op,
+        "ciclo_financeiro": ciclo_fin,
+        "ncg_estimada": calcular_ncg_estimada(
+            dados_n2["estoque_custo"],
+            dados_n1["contas_a_receber_30d"],
+            dados_n1["contas_a_pagar_30d"]
+        ),
+        "alavancagem": calcular_alavancagem(
+            dados_n2["dividas_totais"],
+            dados_n1["receita_bruta_mensal"]
+        ),
+        "cobertura_juros": calcular_cobertura_juros(
+            kpis_n1["resultado_operacional"],
+            dados_n2["despesas_financeiras_mensais"]
+        ),
+        "produtividade": calcular_produtividade(
+            dados_n1["receita_bruta_mensal"],
+            dados_n2["numero_funcionarios"]
+        ) if dados_n2["numero_funcionarios"] else None,
+        "simulacao_reducao_dso": simular_reducao_dso(
+            dados_n1["receita_bruta_mensal"], 10
+        ),
+        "simulacao_aumento_dpo": simular_aumento_dpo(
+            dados_n1["custo_vendas_mensal"], 7
+        )
+    }
+
+
+def posicoes_no_setor(setor, dados_niveis: Dict) -> Optional[Dict[str, PosicaoSetor]]:
+    """Percentil de cada KPI entre as empresas do setor (esboços em memória, O(1) por KPI)"""
+    if not settings.RANKING_SETOR_ATIVO:
+        return None
+    return {
+        kpi: PosicaoSetor(**posicao)
+        for kpi, posicao in ranking_setorial.posicoes(setor, calcular_resumo(dados_niveis)).items()
+    }
+
+
+def niveis_reaproveitaveis(request: AnaliseRequest) -> List[str]:
+    """Níveis da requisição que executar_analise grava na sessão"""
+    if request.meta.nivel_maximo_preenchido >= 2 and request.nivel2:
+        return ["nivel1", "nivel2"]
+    return ["nivel1"]
+
+
+def nivel_da_sessao(sessao: Optional[Dict], nivel: str, assinatura: str) -> Optional[Dict]:
+    """Nível salvo na sessão, se os dados de entrada não mudaram"""
+    if not sessao:
+        return None
+    
+    salvo = sessao.get(nivel)
+    if salvo is None or salvo["assinatura"] != assinatura:
+        return None
+    return salvo
+
+
+def guardar_nivel_na_sessao(
+    sessao: Optional[Dict],
+    nivel: str,
+    assinatura: str,
+    dados: Dict,
+    assumptions: List[str],
+    kpis: Dict,
+    resultado: ResultadoNivel
+):
+    """Grava na sessão o que foi calculado para um nível"""
+    if sessao is None:
+        return
+    
+    sessao[nivel] = {
+        "assinatura": assinatura,
+        "dados": dados,
+        "assumptions": assumptions,
+        "kpis": kpis,
+        "resultado": resultado.model_dump(mode="json")
+    }
+
+
 def montar_resultado_nivel1(kpis: Dict, dados: Dict, assumptions: list) -> ResultadoNivel:
     """Monta o resultado formatado do Nível 1"""
     
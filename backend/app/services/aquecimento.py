@@ -0,0 +1,152 @@
+"""
+Aquecimento - Prepara o worker antes de receber tráfego
+
+Roda no lifespan da API: cria o schema, abre conexões do pool, carrega o
+snapshot do ranking setorial e os benchmarks da população e
+executa uma análise completa de exemplo (níveis 1 a 3), para que imports tardios,
+validadores do Pydantic e caches internos já estejam prontos na primeira
+requisição real. Por fim, congela no coletor de lixo o que o startup
+carregou. O /ready só responde OK depois que isso deu certo.
+"""
+import asyncio
+import gc
+import time
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.models.database import async_engine, Base
+from app.models.analysis_record import AnalysisRecord, ResumoAnalise
+from app.models.schemas import AnaliseRequest
+from app.services.ranking_setorial import ranking_setorial
+from app.services.benchmarks_populacao import benchmarks_populacao
+
+
+# Empresa fictícia com os três níveis preenchidos (passa por todo o pipeline)
+REQUISICAO_EXEMPLO = {
+    "meta": {
+        "setor": "comercio_veiculos",
+        "estado": "SP",
+        "mes": 1,
+        "ano": 2025,
+        "nivel_maximo_preenchido": 3
+    },
+    "nivel1": {
+        "receita_bruta_mensal": 100000,
+        "custo_vendas_mensal": 60000,
+        "despesas_fixas_mensais": 25000,
+        "caixa": 5000,
+        "conta_corrente": 40000,
+        "contas_a_receber_30d": 30000,
+        "contas_a_pagar_30d": 35000
+    },
+    "nivel2": {
+        "prazo_medio_recebimento_dias": 45,
+        "prazo_medio_pagamento_dias": 30,
+        "estoque_custo": 50000,
+        "dividas_totais": 80000,
+        "despesas_financeiras_mensais": 2000,
+        "impostos_mensais": 8000,
+        "numero_funcionarios": 12
+    },
+    "nivel3": {
+        "receita_ultimos_3_meses": [90000, 95000, 100000],
+        "despesas_variaveis_percentual_receita": 5,
+        "capex_planejado_prox_6m": 20000,
+        "imobilizado": 150000,
+        "patrimonio_liquido": 120000,
+        "meta_margem_bruta_percentual": 45
+    }
+}
+
+
+class EstadoAquecimento:
+    """Situação do aquecimento, consultada pelo /ready"""
+
+    def __init__(self):
+        self.pronto = False
+        self.tentativas = 0
+        self.ultimo_erro = None
+        self.duracao_s = None
+
+
+estado_aquecimento = EstadoAquecimento()
+
+
+async def preparar_banco():
+    """Cria tabelas e índices que faltarem (sem travar o event loop)"""
+    async with async_engine.begin() as conexao:
+        await conexao.run_sync(Base.metadata.create_all)
+        # create_all não mexe em tabelas que já existem: garante os índices novos
+        for tabela in (AnalysisRecord.__table__, ResumoAnalise.__table__):
+            for indice in tabela.indexes:
+                await conexao.run_sync(indice.create, checkfirst=True)
+
+
+async def abrir_conexoes(quantidade: int = settings.DB_POOL_SIZE):
+    """Abre `quantidade` conexões ao mesmo tempo, para o pool já começar cheio"""
+    async def conectar():
+        async with async_engine.connect() as conexao:
+            await conexao.execute(text("SELECT 1"))
+
+    await asyncio.gather(*(conectar() for _ in range(quantidade)))
+
+
+def executar_analise_exemplo():
+    """Uma análise completa, com validação e serialização (fora do event loop)"""
+    # Import aqui: as rotas importam este módulo indiretamente pelo main
+    from app.routes.analise import executar_analise
+
+    resposta, _ = executar_analise(AnaliseRequest(**REQUISICAO_EXEMPLO))
+    resposta.model_dump_json()
+
+
+def ajustar_coletor_de_lixo():
+    """
+    Congela os objetos do startup e aumenta o limiar da geração 0
+
+    Um lote de 1000 análises cria centenas de milhares de objetos de vida
+    curta: com o limiar padrão o coletor roda dezenas de vezes por lote e
+    as coletas completas percorrem também módulos, schemas e tabelas, que
+    vivem até o fim do processo. Congelados, eles saem das coletas.
+    """
+    gc.collect()
+    gc.freeze()
+    if settings.GC_LIMIAR_GERACAO0 > 0:
+        _, geracao1, geracao2 = gc.get_threshold()
+        gc.set_threshold(settings.GC_LIMIAR_GERACAO0, geracao1, geracao2)
+
+
+async def aquecer(app):
+    """Executa todas as etapas do aquecimento; levanta exceção se alguma falhar"""
+    inicio = time.perf_counter()
+    estado_aquecimento.tentativas += 1
+
+    await preparar_banco()
+    await abrir_conexoes()
+    await ranking_setorial.carregar()
+    await benchmarks_populacao.carregar()
+    await run_in_threadpool(executar_analise_exemplo)
+    app.openapi()  # Schema do /docs gerado uma vez aqui, não na primeira visita
+    ajustar_coletor_de_lixo()
+
+    estado_aquecimento.duracao_s = round(time.perf_counter() - inicio, 3)
+    estado_aquecimento.ultimo_erro = None
+    estado_aquecimento.pronto = True
+    print(f"✅ Aquecimento concluído em {estado_aquecimento.duracao_s}s")
+
+
+async def aquecer_ate_conseguir(app):
+    """
+    Tenta aquecer até dar certo (ex: banco ainda subindo no deploy)
+
+    Enquanto não conseguir, o /ready continua respondendo 503.
+    """
+    while not estado_aquecimento.pronto:
+        try:
+            await aquecer(app)
+        except Exception as e:
+            estado_aquecimento.ultimo_erro = str(e)
+            print(f"⚠️ Aquecimento falhou (tentativa {estado_aquecimento.tentativas}): {e}")
+            await asyncio.sleep(settings.AQUECIMENTO_INTERVALO_S)
@@ -0,0 +1,184 @@
+"""
+Benchmarks da População - Estatísticas por setor calculadas das análises reais
+
+Substitui, quando há amostras suficientes, as referências digitadas à mão
+(prazos e referências do plano nos perfis de setor) pela mediana e
+quartis das empresas do próprio setor.
+
+- scripts/gerar_benchmarks.py percorre a tabela analises em streaming,
+  agrega com esboços de quantis (memória fixa) e publica uma versão nova
+  na tabela benchmarks_setor.
+- No startup, o aquecimento carrega a versão mais recente; os serviços
+  consultam a tabela em memória.
+
+Valores que foram estimados pelos defaults (e não informados pelo cliente)
+não entram nas estatísticas: senão o benchmark só repetiria o próprio default.
+"""
+from typing import Dict, List, Optional
+
+from sqlalchemy import delete, func, select
+
+from app.models.benchmark_setor import BenchmarkSetor
+from app.models.database import AsyncSessionLocal
+from app.services.perfis_setor import perfis_setor
+from app.services.ranking_setorial import EsbocoQuantis, chave_setor
+
+
+INDICADORES = ("margem_bruta", "dso", "dpo", "ciclo_financeiro", "liquidez_imediata")
+
+# Versões antigas mantidas na tabela (para comparar/voltar atrás)
+VERSOES_MANTIDAS = 5
+
+# Default de custo do Nível 1 (validador): 65% da receita
+PROPORCAO_CUSTO_PADRAO = 0.65
+
+
+# ============= EXTRAÇÃO (UMA ANÁLISE) =============
+
+def campos_estimados(request) -> Dict[str, List[str]]:
+    """Campos dos níveis 1 e 2 que o cliente deixou em branco (receberão default)"""
+    estimados = {}
+    for nivel in ("nivel1", "nivel2"):
+        dados = getattr(request, nivel)
+        if dados is not None:
+            estimados[nivel] = [campo for campo, valor in dados if valor is None]
+    return estimados
+
+
+def _foi_estimado(dados_financeiros: Dict, nivel: str, campo: str, igual_ao_default: bool) -> bool:
+    """
+    O campo veio do default?
+
+    Registros novos guardam a lista de campos estimados; nos antigos, um
+    valor idêntico ao default é tratado como estimado.
+    """
+    estimados = dados_financeiros.get("estimados")
+    if estimados is not None:
+        return campo in estimados.get(nivel, [])
+    return igual_ao_default
+
+
+def extrair_indicadores(setor: str, dados_financeiros: Dict) -> Dict[str, float]:
+    """Indicadores de uma análise gravada que podem entrar no benchmark do setor"""
+    indicadores = {}
+    n1 = dados_financeiros.get("nivel1") or {}
+    n2 = dados_financeiros.get("nivel2") or {}
+
+    receita = n1.get("receita_bruta_mensal") or 0
+    custo = n1.get("custo_vendas_mensal")
+    if receita > 0 and custo is not None and not _foi_estimado(
+        dados_financeiros, "nivel1", "custo_vendas_mensal", custo == receita * PROPORCAO_CUSTO_PADRAO
+    ):
+        indicadores["margem_bruta"] = (receita - custo) / receita * 100
+
+    # Sem contas a pagar a liquidez é "infinita" (999.99): não é referência
+    a_pagar = n1.get("contas_a_pagar_30d") or 0
+    if a_pagar > 0 and not _foi_estimado(dados_financeiros, "nivel1", "contas_a_pagar_30d", False):
+        indicadores["liquidez_imediata"] = (n1["caixa"] + n1["conta_corrente"]) / a_pagar
+
+    if n2:
+        padrao = perfis_setor.perfil(setor).prazos
+        dso = n2.get("prazo_medio_recebimento_dias")
+        dpo = n2.get("prazo_medio_pagamento_dias")
+        dso_real = dso is not None and not _foi_estimado(
+            dados_financeiros, "nivel2", "prazo_medio_recebimento_dias", dso == padrao["dso"]
+        )
+        dpo_real = dpo is not None and not _foi_estimado(
+            dados_financeiros, "nivel2", "prazo_medio_pagamento_dias", dpo == padrao["dpo"]
+        )
+        if dso_real:
+            indicadores["dso"] = dso
+        if dpo_real:
+            indicadores["dpo"] = dpo
+        if dso_real and dpo_real and custo:
+            dio = (n2.get("estoque_custo") or 0) / custo * 30
+            indicadores["ciclo_financeiro"] = dio + dso - dpo
+
+    return indicadores
+
+
+# ============= AGREGAÇÃO (JOB EM LOTE) =============
+
+class AgregadorBenchmarks:
+    """Acumula indicadores por setor em esboços de quantis (memória fixa)"""
+
+    def __init__(self):
+        self.esbocos: Dict[tuple, EsbocoQuantis] = {}
+        self.analises = 0
+
+    def adicionar(self, setor: str, dados_financeiros: Dict):
+        self.analises += 1
+        for indicador, valor in extrair_indicadores(setor, dados_financeiros).items():
+            self.esbocos.setdefault((setor, indicador), EsbocoQuantis()).adicionar(valor)
+
+    def estatisticas(self, minimo_amostras: int) -> List[Dict]:
+        """Linhas a publicar (setores com pelo menos minimo_amostras valores do indicador)"""
+        return [
+            {
+                "setor": setor,
+                "indicador": indicador,
+                "amostras": esboco.total,
+                "p25": round(esboco.quantil(0.25), 2),
+                "mediana": round(esboco.quantil(0.5), 2),
+                "p75": round(esboco.quantil(0.75), 2),
+            }
+            for (setor, indicador), esboco in sorted(self.esbocos.items())
+            if esboco.total >= minimo_amostras
+        ]
+
+
+def publicar(db, estatisticas: List[Dict]) -> int:
+    """Grava as estatísticas como uma versão nova (sessão síncrona) e devolve o número dela"""
+    versao = (db.scalar(select(func.max(BenchmarkSetor.versao))) or 0) + 1
+    db.add_all([BenchmarkSetor(versao=versao, **linha) for linha in estatisticas])
+    db.execute(delete(BenchmarkSetor).where(BenchmarkSetor.versao <= versao - VERSOES_MANTIDAS))
+    db.commit()
+    return versao
+
+
+# ============= CONSULTA (SERVIÇOS) =============
+
+class BenchmarksPopulacao:
+    """Versão publicada mais recente, em memória"""
+
+    def __init__(self, session_factory=AsyncSessionLocal):
+        self.session_factory = session_factory
+        self.versao: Optional[int] = None
+        self._tabela: Dict[str, Dict[str, Dict]] = {}
+
+    async def carregar(self):
+        """Carrega a versão mais recente (chamado no aquecimento)"""
+        async with self.session_factory() as db:
+            versao = await db.scalar(select(func.max(BenchmarkSetor.versao)))
+            if versao is None:
+                return
+            linhas = (await db.execute(
+                select(BenchmarkSetor).where(BenchmarkSetor.versao == versao)
+            )).scalars().all()
+
+        tabela = {}
+        for linha in linhas:
+            tabela.setdefault(linha.setor, {})[linha.indicador] = {
+                "amostras": linha.amostras, "p25": linha.p25, "mediana": linha.mediana, "p75": linha.p75
+            }
+        self._tabela, self.versao = tabela, versao
+        print(f"✅ Benchmarks da população carregados (versão {versao}, {len(tabela)} setores)")
+
+    def do_setor(self, setor: str) -> Dict[str, Dict]:
+        """{indicador: {amostras, p25, mediana, p75}} do setor ({} se não publicado)"""
+        return self._tabela.get(chave_setor(setor), {})
+
+    def mediana(self, setor: str, indicador: str) -> Optional[float]:
+        estatistica = self.do_setor(setor).get(indicador)
+        return estatistica["mediana"] if estatistica else None
+
+    def prazos(self, setor: str) -> Optional[Dict[str, int]]:
+        """DSO/DPO medianos do setor, em dias (None se algum não foi publicado)"""
+        dso, dpo = self.mediana(setor, "dso"), self.mediana(setor, "dpo")
+        if dso is None or dpo is None:
+            return None
+        return {"dso": round(dso), "dpo": round(dpo)}
+
+
+# Instância única (por worker)
+benchmarks_populacao = BenchmarksPopulacao()
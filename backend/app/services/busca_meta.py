@@ -0,0 +1,299 @@
+"""
+Busca de Meta (goal-seek)
+
+Responde perguntas como "quanto preciso vender para ter resultado de
+R$ 20 mil?" ou "qual DSO deixa meu ciclo financeiro abaixo de 10 dias?":
+dado um KPI, um valor alvo e a variável que o cliente pode mexer,
+calcula o valor necessário dessa variável (todo o resto fica igual).
+
+- Onde a fórmula de financial_calc tem inversa simples (resultado,
+  ponto de equilíbrio, fôlego, ciclo, margem, liquidez, cobertura),
+  usa a inversa (INVERSAS).
+- Nos demais pares (KPI, variável), usa bisseção vetorizada sobre as
+  fórmulas de financial_calc_vetorizado, a partir de um trecho com troca
+  de sinal achado numa varredura do intervalo.
+
+Todas as empresas são resolvidas juntas, em colunas. Toda solução é
+conferida recalculando o KPI; se não bate com o alvo, ou se a variável
+precisaria ficar negativa, a meta é marcada como inalcançável.
+"""
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from app.services.financial_calc_vetorizado import (
+    para_array,
+    _dividir,
+    calcular_kpis_nivel2,
+)
+
+
+# Variáveis que o cliente pode mexer: chave -> (campo de entrada, rótulo)
+# "receita" mantém a proporção custo/receita (vender mais também custa mais).
+# "disponibilidades" é caixa + conta corrente.
+VARIAVEIS_META = {
+    "receita": ("receita_bruta_mensal", "Receita"),
+    "custo": ("custo_vendas_mensal", "Custo das vendas"),
+    "despesas_fixas": ("despesas_fixas_mensais", "Despesas fixas"),
+    "disponibilidades": ("disponibilidades", "Caixa + conta corrente"),
+    "contas_a_receber": ("contas_a_receber_30d", "Contas a receber (30 dias)"),
+    "contas_a_pagar": ("contas_a_pagar_30d", "Contas a pagar (30 dias)"),
+    "dso": ("prazo_medio_recebimento_dias", "Prazo de recebimento (DSO)"),
+    "dpo": ("prazo_medio_pagamento_dias", "Prazo de pagamento (DPO)"),
+    "estoque": ("estoque_custo", "Estoque"),
+    "dividas": ("dividas_totais", "Dívidas totais"),
+    "despesas_financeiras": ("despesas_financeiras_mensais", "Despesas financeiras"),
+}
+
+# KPIs que aceitam meta (chaves de calcular_kpis_nivel2)
+KPIS_META = {
+    "margem_bruta": "Margem Bruta",
+    "resultado_operacional": "Resultado Operacional",
+    "ponto_equilibrio": "Ponto de Equilíbrio",
+    "liquidez_imediata": "Liquidez Imediata",
+    "folego_caixa": "Fôlego de Caixa",
+    "ciclo_operacional": "Ciclo Operacional",
+    "ciclo_financeiro": "Ciclo Financeiro",
+    "ncg_estimada": "NCG Estimada",
+    "alavancagem": "Alavancagem",
+    "cobertura_juros": "Cobertura de Juros",
+}
+
+CAMPOS_NIVEL1 = (
+    "receita_bruta_mensal", "custo_vendas_mensal", "despesas_fixas_mensais",
+    "contas_a_receber_30d", "contas_a_pagar_30d",
+)
+CAMPOS_NIVEL2 = (
+    "prazo_medio_recebimento_dias", "prazo_medio_pagamento_dias", "estoque_custo",
+    "dividas_totais", "despesas_financeiras_mensais",
+)
+
+# Bisseção: limite superior do intervalo de busca, grade da varredura inicial
+# (frações do limite: zero e de 1e-12 a 1 em escala geométrica) e número de passos
+PRAZO_MAXIMO_DIAS = 720.0
+FATOR_LIMITE_MOEDA = 100.0
+FRACOES_VARREDURA = np.concatenate(([0.0], np.geomspace(1e-12, 1.0, 96)))
+ITERACOES_BISSECAO = 80
+
+
+def montar_colunas(empresas: List[Dict]) -> Dict[str, np.ndarray]:
+    """
+    Colunas de entrada (uma linha por empresa) a partir dos dados com defaults
+
+    Args:
+        empresas: [{"nivel1": {...}, "nivel2": {...}}] com defaults aplicados
+    """
+    colunas = {
+        campo: para_array([float(e["nivel1"].get(campo) or 0) for e in empresas])
+        for campo in CAMPOS_NIVEL1
+    }
+    colunas.update({
+        campo: para_array([float(e["nivel2"].get(campo) or 0) for e in empresas])
+        for campo in CAMPOS_NIVEL2
+    })
+    colunas["disponibilidades"] = para_array([
+        float(e["nivel1"]["caixa"] + e["nivel1"]["conta_corrente"]) for e in empresas
+    ])
+    # Sem funcionários a produtividade fica NaN (não entra nas metas)
+    colunas["numero_funcionarios"] = para_array([
+        e["nivel2"].get("numero_funcionarios") or np.nan for e in empresas
+    ])
+    return colunas
+
+
+def calcular_kpis(colunas: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """KPIs dos níveis 1 e 2 para as colunas (disponibilidades no lugar de caixa + conta)"""
+    dados_n1 = {**colunas, "caixa": colunas["disponibilidades"], "conta_corrente": 0.0}
+    return calcular_kpis_nivel2(dados_n1, colunas)
+
+
+def aplicar_variavel(colunas: Dict[str, np.ndarray], variavel: str, valor: np.ndarray) -> Dict[str, np.ndarray]:
+    """Cópia das colunas com a variável trocada por `valor`"""
+    campo = VARIAVEIS_META[variavel][0]
+    novas = {**colunas, campo: valor}
+
+    if variavel == "receita":
+        receita = colunas["receita_bruta_mensal"]
+        proporcao_custo = np.where(receita > 0, _dividir(colunas["custo_vendas_mensal"], receita), np.nan)
+        novas["custo_vendas_mensal"] = np.where(
+            receita > 0, valor * proporcao_custo, colunas["custo_vendas_mensal"]
+        )
+
+    return novas
+
+
+# ============= INVERSAS FECHADAS =============
+# Cada função recebe as colunas e o alvo e devolve o valor necessário da variável
+
+def _receita_para_resultado(c, alvo):
+    # R - R × (C/R) - DF = alvo  =>  R = (alvo + DF) / (1 - C/R)
+    margem_contribuicao = 1 - _dividir(c["custo_vendas_mensal"], c["receita_bruta_mensal"])
+    return np.where(margem_contribuicao > 0, _dividir(alvo + c["despesas_fixas_mensais"], margem_contribuicao), np.nan)
+
+
+def _folego_necessario(c, alvo):
+    """Caixa líquido necessário para `alvo` dias de fôlego"""
+    return alvo * c["despesas_fixas_mensais"] / 30
+
+
+def _dio(c):
+    return np.where(
+        (c["custo_vendas_mensal"] > 0) & (c["estoque_custo"] > 0),
+        _dividir(c["estoque_custo"], c["custo_vendas_mensal"]) * 30,
+        0.0
+    )
+
+
+INVERSAS: Dict[tuple, Callable] = {
+    ("resultado_operacional", "receita"): _receita_para_resultado,
+    ("resultado_operacional", "custo"):
+        lambda c, alvo: c["receita_bruta_mensal"] - c["despesas_fixas_mensais"] - alvo,
+    ("resultado_operacional", "despesas_fixas"):
+        lambda c, alvo: c["receita_bruta_mensal"] - c["custo_vendas_mensal"] - alvo,
+    # PE = DF / (1 - C/R)  =>  DF = PE × (1 - C/R)
+    ("ponto_equilibrio", "despesas_fixas"):
+        lambda c, alvo: alvo * (1 - _dividir(c["custo_vendas_mensal"], c["receita_bruta_mensal"])),
+    ("margem_bruta", "custo"):
+        lambda c, alvo: c["receita_bruta_mensal"] * (1 - alvo / 100),
+    # Fôlego = (Disp + AR - AP) / (DF / 30)
+    ("folego_caixa", "disponibilidades"):
+        lambda c, alvo: _folego_necessario(c, alvo) - c["contas_a_receber_30d"] + c["contas_a_pagar_30d"],
+    ("folego_caixa", "contas_a_receber"):
+        lambda c, alvo: _folego_necessario(c, alvo) - c["disponibilidades"] + c["contas_a_pagar_30d"],
+    ("folego_caixa", "contas_a_pagar"):
+        lambda c, alvo: c["disponibilidades"] + c["contas_a_receber_30d"] - _folego_necessario(c, alvo),
+    ("folego_caixa", "despesas_fixas"):
+        lambda c, alvo: _dividir(
+            30 * (c["disponibilidades"] + c["contas_a_receber_30d"] - c["contas_a_pagar_30d"]), alvo
+        ),
+    # Ciclo financeiro = DIO + DSO - DPO
+    ("ciclo_financeiro", "dso"):
+        lambda c, alvo: alvo - _dio(c) + c["prazo_medio_pagamento_dias"],
+    ("ciclo_financeiro", "dpo"):
+        lambda c, alvo: _dio(c) + c["prazo_medio_recebimento_dias"] - alvo,
+    ("ciclo_financeiro", "estoque"):
+        lambda c, alvo: (alvo - c["prazo_medio_recebimento_dias"] + c["prazo_medio_pagamento_dias"])
+        * c["custo_vendas_mensal"] / 30,
+    ("ciclo_operacional", "dso"):
+        lambda c, alvo: alvo - _dio(c),
+    # Liquidez = Disp / AP
+    ("liquidez_imediata", "disponibilidades"):
+        lambda c, alvo: alvo * c["contas_a_pagar_30d"],
+    ("liquidez_imediata", "contas_a_pagar"):
+        lambda c, alvo: _dividir(c["disponibilidades"], alvo),
+    # Cobertura = Resultado / Despesas financeiras
+    ("cobertura_juros", "despesas_financeiras"):
+        lambda c, alvo: _dividir(
+            c["receita_bruta_mensal"] - c["custo_vendas_mensal"] - c["despesas_fixas_mensais"], alvo
+        ),
+}
+
+
+# ============= BISSEÇÃO VETORIZADA =============
+
+def _limite_superior(colunas: Dict[str, np.ndarray], variavel: str) -> np.ndarray:
+    """Fim do intervalo de busca: prazos até PRAZO_MAXIMO_DIAS, valores até 100× a escala da empresa"""
+    if variavel in ("dso", "dpo"):
+        return np.full_like(colunas["receita_bruta_mensal"], PRAZO_MAXIMO_DIAS)
+
+    campo = VARIAVEIS_META[variavel][0]
+    escala = np.maximum.reduce([
+        colunas[campo], colunas["receita_bruta_mensal"], colunas["despesas_fixas_mensais"],
+        np.ones_like(colunas[campo])
+    ])
+    return escala * FATOR_LIMITE_MOEDA
+
+
+def resolver_bissecao(colunas: Dict[str, np.ndarray], kpi: str, variavel: str, alvo: np.ndarray) -> np.ndarray:
+    """
+    Procura em [0, limite] o valor da variável que leva o KPI ao alvo
+
+    O KPI nem sempre é monótono ou definido no intervalo todo (ex: ciclo
+    financeiro × custo, ponto de equilíbrio × custo): primeiro varre uma
+    grade geométrica do intervalo e escolhe, por empresa, o trecho com
+    troca de sinal mais próximo do valor atual; depois faz a bisseção
+    nesse trecho. Todas as empresas avançam juntas; sem troca de sinal em
+    nenhum trecho, devolve NaN (meta fora do alcance).
+    """
+    def desvio(valor):
+        return calcular_kpis(aplicar_variavel(colunas, variavel, valor))[kpi] - alvo
+
+    grade = _limite_superior(colunas, variavel) * FRACOES_VARREDURA[:, None]  # (pontos, empresas)
+    desvios = np.array([desvio(pontos) for pontos in grade])
+    troca = (
+        np.isfinite(desvios[:-1]) & np.isfinite(desvios[1:])
+        & (np.sign(desvios[:-1]) * np.sign(desvios[1:]) <= 0)
+    )
+    atual = colunas[VARIAVEIS_META[variavel][0]]
+    distancia = np.where(troca, np.abs((grade[:-1] + grade[1:]) / 2 - atual), np.inf)
+    trecho = np.argmin(distancia, axis=0)
+    com_raiz = troca.any(axis=0)
+
+    empresas = np.arange(grade.shape[1])
+    inferior = grade[trecho, empresas]
+    superior = grade[trecho + 1, empresas]
+    desvio_inferior = desvios[trecho, empresas]
+
+    for _ in range(ITERACOES_BISSECAO):
+        meio = (inferior + superior) / 2
+        desvio_meio = desvio(meio)
+        mesmo_lado = np.sign(desvio_meio) == np.sign(desvio_inferior)
+        inferior = np.where(mesmo_lado, meio, inferior)
+        desvio_inferior = np.where(mesmo_lado, desvio_meio, desvio_inferior)
+        superior = np.where(mesmo_lado, superior, meio)
+
+    return np.where(com_raiz, (inferior + superior) / 2, np.nan)
+
+
+# ============= API =============
+
+def _numero(valor) -> Optional[float]:
+    valor = float(valor)
+    return round(valor, 2) if np.isfinite(valor) else None
+
+
+def resolver_meta(colunas: Dict[str, np.ndarray], kpi: str, variavel: str, alvo: float) -> List[Dict]:
+    """
+    Resolve uma meta para todas as empresas das colunas
+
+    Returns:
+        Um dict por empresa (mesma ordem das colunas)
+    """
+    if kpi not in KPIS_META:
+        raise ValueError(f"KPI '{kpi}' não aceita meta. Opções: {', '.join(KPIS_META)}")
+    if variavel not in VARIAVEIS_META:
+        raise ValueError(f"Variável '{variavel}' inválida. Opções: {', '.join(VARIAVEIS_META)}")
+
+    alvos = np.full_like(colunas["receita_bruta_mensal"], float(alvo))
+    inversa = INVERSAS.get((kpi, variavel))
+    metodo = "formula" if inversa else "bissecao"
+    necessario = inversa(colunas, alvos) if inversa else resolver_bissecao(colunas, kpi, variavel, alvos)
+
+    # Confere recalculando o KPI com o valor encontrado
+    valido = np.isfinite(necessario) & (necessario >= 0)
+    candidato = np.where(valido, necessario, 0.0)
+    obtido = calcular_kpis(aplicar_variavel(colunas, variavel, candidato))[kpi]
+    tolerancia = np.maximum(0.01, np.abs(alvos) * 1e-6)
+    alcancavel = valido & (np.abs(obtido - alvos) <= tolerancia)
+
+    atual = colunas[VARIAVEIS_META[variavel][0]]
+    kpi_atual = calcular_kpis(colunas)[kpi]
+    rotulo = VARIAVEIS_META[variavel][1]
+
+    resultados = []
+    for i in range(len(atual)):
+        ok = bool(alcancavel[i])
+        resultados.append({
+            "kpi": kpi,
+            "variavel": variavel,
+            "alvo": float(alvo),
+            "kpi_atual": _numero(kpi_atual[i]),
+            "valor_atual": _numero(atual[i]),
+            "valor_necessario": _numero(necessario[i]) if ok else None,
+            "variacao_percentual": _numero((necessario[i] / atual[i] - 1) * 100) if ok and atual[i] else None,
+            "alcancavel": ok,
+            "metodo": metodo,
+            "motivo": None if ok else
+                f"{KPIS_META[kpi]} não chega a {alvo:g} alterando apenas {rotulo.lower()}",
+        })
+    return resultados
@@ -0,0 +1,164 @@
+"""
+Cache de Resultados - Reaproveita análises de requisições idênticas
+
+A chave é um hash do AnaliseRequest normalizado, sem email e empresa
+(não mudam os números). O valor é a resposta já serializada, mais os
+dados dos níveis usados para montar o registro do banco e os níveis da
+sessão de análise (para a sessão continuar valendo num acerto).
+
+Eviction por LRU, TTL e limite de tamanho em bytes. O cache é limpo
+quando a versão dos cálculos ou dos benchmarks muda.
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.core.serializacao import para_json, de_json
+from app.models.schemas import AnaliseRequest
+from app.services.financial_calc import VERSAO_CALCULO
+from app.services.perfis_setor import perfis_setor
+from app.services.benchmarks_populacao import benchmarks_populacao
+
+
+# Campos que identificam o cliente/sessão e não entram na chave
+CAMPOS_IGNORADOS = {"meta": {"email", "empresa"}, "token_sessao": True, "plano_com_ia": True}
+
+
+def versao_atual() -> str:
+    """Versão combinada de cálculos + perfis de setor + benchmarks (muda = cache inválido)"""
+    return f"{VERSAO_CALCULO}/{perfis_setor.versao}/{benchmarks_populacao.versao}"
+
+
+class CacheResultados:
+    """Cache LRU com TTL e limite em bytes para respostas de /api/analise"""
+
+    def __init__(
+        self,
+        max_bytes: int = settings.CACHE_RESULTADOS_MAX_BYTES,
+        ttl_s: float = settings.CACHE_RESULTADOS_TTL_S,
+        ativo: bool = settings.CACHE_RESULTADOS_ATIVO
+    ):
+        self.max_bytes = max_bytes
+        self.ttl = ttl_s
+        self.ativo = ativo
+
+        # chave -> (expira_em, corpo, dados_json)
+        self._itens: "OrderedDict[str, Tuple[float, bytes, bytes]]" = OrderedDict()
+        self._bytes = 0
+        self._versao = versao_atual()
+        # O lote roda no threadpool, então o acesso precisa de lock
+        self._lock = threading.Lock()
+
+        self.acertos = 0
+        self.faltas = 0
+        self.expirados = 0
+        self.removidos = 0
+
+    @staticmethod
+    def chave(request: AnaliseRequest) -> str:
+        """
+        Hash canônico do request normalizado (sem email/empresa)
+        """
+        dados = request.model_dump(mode="json", exclude=CAMPOS_IGNORADOS)
+        canonico = json.dumps(dados, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(canonico.encode()).hexdigest()
+
+    def obter(self, chave: str) -> Optional[Tuple[bytes, Dict, Dict]]:
+        """
+        Busca uma resposta no cache
+
+        Returns:
+            (corpo JSON da resposta, dados dos níveis, níveis da sessão) ou None
+        """
+        if not self.ativo:
+            return None
+
+        with self._lock:
+            self._verificar_versao()
+
+            item = self._itens.get(chave)
+            if item is None:
+                self.faltas += 1
+                return None
+
+            expira_em, corpo, dados_json = item
+            if expira_em < time.monotonic():
+                self._remover(chave)
+                self.expirados += 1
+                self.faltas += 1
+                return None
+
+            self._itens.move_to_end(chave)
+            self.acertos += 1
+
+        # Cópia nova dos dados a cada acerto (o registro do banco é mutável)
+        dados_niveis, niveis_sessao = de_json(dados_json)
+        return corpo, dados_niveis, niveis_sessao
+
+    def guardar(self, chave: str, corpo: bytes, dados_niveis: Dict, niveis_sessao: Dict):
+        """Guarda uma resposta serializada, os dados dos níveis e os níveis da sessão"""
+        if not self.ativo:
+            return
+
+        dados_json = para_json([dados_niveis, niveis_sessao])
+        tamanho = len(chave) + len(corpo) + len(dados_json)
+        if tamanho > self.max_bytes:
+            return
+
+        with self._lock:
+            self._verificar_versao()
+
+            if chave in self._itens:
+                self._remover(chave)
+
+            self._itens[chave] = (time.monotonic() + self.ttl, corpo, dados_json)
+            self._bytes += tamanho
+
+            # LRU: remove os menos usados até caber no limite
+            while self._bytes > self.max_bytes:
+                mais_antiga = next(iter(self._itens))
+                self._remover(mais_antiga)
+                self.removidos += 1
+
+    def limpar(self):
+        """Esvazia o cache"""
+        with self._lock:
+            self._itens.clear()
+            self._bytes = 0
+
+    def estatisticas(self) -> Dict:
+        """Contadores para dimensionar o cache"""
+        consultas = self.acertos + self.faltas
+        return {
+            "ativo": self.ativo,
+            "versao": self._versao,
+            "itens": len(self._itens),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_s": self.ttl,
+            "acertos": self.acertos,
+            "faltas": self.faltas,
+            "taxa_acerto": round(self.acertos / consultas, 4) if consultas else 0.0,
+            "expirados": self.expirados,
+            "removidos_lru": self.removidos
+        }
+
+    def _remover(self, chave: str):
+        _, corpo, dados_json = self._itens.pop(chave)
+        self._bytes -= len(chave) + len(corpo) + len(dados_json)
+
+    def _verificar_versao(self):
+        """Invalida tudo se a versão dos cálculos/benchmarks mudou"""
+        versao = versao_atual()
+        if versao != self._versao:
+            self._itens.clear()
+            self._bytes = 0
+            self._versao = versao
+
+
+# Instância única usada pelas rotas
+cache_resultados = CacheResultados()
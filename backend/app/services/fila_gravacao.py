@@ -0,0 +1,240 @@
+"""
+Fila de Gravação - Persistência write-behind das análises
+
+As rotas só enfileiram os registros e respondem na hora. Uma tarefa em
+segundo plano grava em lote (por tamanho ou a cada poucos milissegundos)
+usando a sessão async, então a latência da análise não depende da
+latência do banco e um banco lento não trava o event loop.
+
+Se o banco cair, o lote em mãos é mantido e o gravador espera (backoff
+exponencial) antes de tentar de novo; enquanto isso a fila segura o que
+chegar, até o limite. Só erros de dados (registro inválido) levam à
+gravação um a um, para isolar o registro ruim.
+"""
+import asyncio
+from typing import Dict, List
+
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.core.config import settings
+from app.models.database import AsyncSessionLocal
+from app.services.ranking_setorial import ranking_setorial
+
+
+class FilaCheiaError(Exception):
+    """A fila continuou cheia além do tempo de espera permitido"""
+
+
+# Marcador de encerramento: o gravador esvazia a fila e termina
+_FIM = object()
+
+# Banco fora do ar ou sem conexão livre: o lote inteiro é tentado de novo depois
+ERROS_CONEXAO = (OperationalError, InterfaceError, PoolTimeoutError, OSError, asyncio.TimeoutError)
+
+
+def erro_de_conexao(erro: Exception) -> bool:
+    """True se a falha é do banco/conexão (e não dos registros)"""
+    if isinstance(erro, DBAPIError) and erro.connection_invalidated:
+        return True
+    return isinstance(erro, ERROS_CONEXAO)
+
+
+class FilaGravacao:
+    """Fila limitada de registros com gravação em lote em segundo plano"""
+
+    def __init__(
+        self,
+        session_factory=AsyncSessionLocal,
+        tamanho_maximo: int = settings.FILA_GRAVACAO_TAMANHO_MAXIMO,
+        tamanho_lote: int = settings.FILA_GRAVACAO_TAMANHO_LOTE,
+        intervalo_ms: float = settings.FILA_GRAVACAO_INTERVALO_MS,
+        timeout_enfileirar_s: float = settings.FILA_GRAVACAO_TIMEOUT_S,
+        espera_inicial_s: float = settings.FILA_GRAVACAO_ESPERA_INICIAL_S,
+        espera_maxima_s: float = settings.FILA_GRAVACAO_ESPERA_MAXIMA_S
+    ):
+        self.session_factory = session_factory
+        self.tamanho_maximo = tamanho_maximo
+        self.tamanho_lote = tamanho_lote
+        self.intervalo = intervalo_ms / 1000
+        self.timeout_enfileirar = timeout_enfileirar_s
+        self.espera_inicial = espera_inicial_s
+        self.espera_maxima = espera_maxima_s
+
+        # Criados em iniciar(), dentro do event loop que vai usá-los
+        self._fila = None
+        self._lote_cheio = None
+        self._tarefa = None
+        self._encerrando = None
+
+        self.gravados = 0
+        self.falhas = 0
+        self.lotes = 0
+        self.banco_indisponivel = 0
+
+    @property
+    def ativa(self) -> bool:
+        return self._tarefa is not None and not self._tarefa.done()
+
+    async def iniciar(self):
+        """Cria a fila e dispara o gravador (chamado no startup da API)"""
+        if self.ativa:
+            return
+        self._fila = asyncio.Queue(maxsize=self.tamanho_maximo)
+        self._lote_cheio = asyncio.Event()
+        self._encerrando = asyncio.Event()
+        self._tarefa = asyncio.create_task(self._executar())
+
+    async def encerrar(self):
+        """Grava tudo que ainda está na fila e para o gravador (shutdown da API)"""
+        if not self.ativa:
+            return
+        self._encerrando.set()
+        await self._fila.put(_FIM)
+        self._lote_cheio.set()
+        await self._tarefa
+        self._tarefa = None
+
+    async def enfileirar(self, registro):
+        """
+        Enfileira um registro para gravação
+
+        Se a fila estiver cheia, espera abrir espaço (backpressure) até
+        timeout_enfileirar e então levanta FilaCheiaError.
+        Sem gravador ativo, grava direto no banco.
+        """
+        if not self.ativa:
+            try:
+                await self._gravar_lote([registro])
+            except Exception as e:
+                print(f"⚠️ Banco indisponível, análise não salva: {e}")
+                self.falhas += 1
+            return
+
+        try:
+            await asyncio.wait_for(self._fila.put(registro), self.timeout_enfileirar)
+        except asyncio.TimeoutError:
+            raise FilaCheiaError(
+                f"Fila de gravação cheia ({self.tamanho_maximo} registros) - banco não está acompanhando"
+            )
+
+        if self._fila.qsize() >= self.tamanho_lote:
+            self._lote_cheio.set()
+
+    async def enfileirar_varios(self, registros: List):
+        """Enfileira vários registros (mesmas regras de enfileirar)"""
+        for registro in registros:
+            await self.enfileirar(registro)
+
+    def estatisticas(self) -> Dict[str, int]:
+        """Contadores da fila, para monitoramento"""
+        return {
+            "ativa": self.ativa,
+            "pendentes": self._fila.qsize() if self._fila is not None else 0,
+            "tamanho_maximo": self.tamanho_maximo,
+            "gravados": self.gravados,
+            "falhas": self.falhas,
+            "lotes": self.lotes,
+            "banco_indisponivel": self.banco_indisponivel
+        }
+
+    async def _executar(self):
+        """Loop do gravador: junta um lote e grava, até receber _FIM"""
+        encerrando = False
+
+        while not encerrando:
+            primeiro = await self._fila.get()
+            if primeiro is _FIM:
+                break
+            lote = [primeiro]
+
+            # Espera o lote encher ou o intervalo passar, o que vier primeiro
+            if self._fila.qsize() + 1 < self.tamanho_lote:
+                self._lote_cheio.clear()
+                try:
+                    await asyncio.wait_for(self._lote_cheio.wait(), self.intervalo)
+                except asyncio.TimeoutError:
+                    pass
+
+            while len(lote) < self.tamanho_lote:
+                try:
+                    item = self._fila.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if item is _FIM:
+                    encerrando = True
+                    break
+                lote.append(item)
+
+            await self._gravar_com_espera(lote)
+
+    async def _gravar_com_espera(self, lote: List):
+        """
+        Grava o lote; com o banco indisponível, segura o lote e tenta de
+        novo com backoff exponencial (no encerramento, desiste na primeira falha)
+        """
+        espera = self.espera_inicial
+        while True:
+            try:
+                await self._gravar_lote(lote)
+                return
+            except Exception as e:
+                self.banco_indisponivel += 1
+                if self._encerrando.is_set():
+                    print(f"⚠️ Banco indisponível no encerramento, {len(lote)} análise(s) não salva(s): {e}")
+                    self.falhas += len(lote)
+                    return
+                print(f"⚠️ Banco indisponível, lote de {len(lote)} aguardando {espera:.1f}s: {e}")
+                try:
+                    # O encerramento interrompe a espera
+                    await asyncio.wait_for(self._encerrando.wait(), espera)
+                except asyncio.TimeoutError:
+                    pass
+                espera = min(espera * 2, self.espera_maxima)
+
+    async def _gravar_lote(self, registros: List):
+        """
+        Grava um lote em uma transação; se falhar por erro de dados, tenta um a um
+
+        Erros de conexão/banco são repassados; o que ficar em `registros`
+        ainda não foi gravado e deve ser tentado de novo
+        """
+        try:
+            await self._inserir(registros)
+        except Exception as e:
+            if erro_de_conexao(e):
+                raise
+            print(f"⚠️ Erro ao salvar lote no banco ({len(registros)} registros): {e}")
+            if len(registros) > 1:
+                # Um registro ruim não deve derrubar o lote inteiro. Os já
+                # tratados saem da lista: se o banco cair no meio, só o resto volta
+                while registros:
+                    await self._gravar_lote([registros[0]])
+                    del registros[0]
+            else:
+                self.falhas += 1
+            return
+
+        self.gravados += len(registros)
+        self.lotes += 1
+        print(f"✅ {len(registros)} análise(s) salva(s) no banco")
+
+        # Já gravado: uma falha no ranking não pode fazer o lote ser gravado de novo
+        try:
+            ranking_setorial.adicionar_registros(registros)
+        except Exception as e:
+            print(f"⚠️ Erro ao atualizar o ranking setorial ({len(registros)} análises): {e}")
+
+    async def _inserir(self, registros: List):
+        """Insere os registros em uma única transação (sessão async)"""
+        async with self.session_factory() as db:
+            try:
+                db.add_all(registros)
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                raise
+
+
+# Instância única usada pelas rotas
+fila_gravacao = FilaGravacao()
@@ -4,6 +4,11 @@ Calculadora - Todas as fórmulas e cálculos financeiros
 from typing import Dict, List, Optional, Tuple
 import statistics
 
+from app.services.formatadores import formatar_numero_br
+
+# Versão das fórmulas - mude ao alterar qualquer cálculo (invalida o cache de resultados)
+VERSAO_CALCULO = "1.0"
+
 
 # ============= CÁLCULOS NÍVEL 1 =============
 from typing import Optional
@@ -539,8 +544,8 @@ def calcular_payback_capex(capex: float, incremento_lucro_anual: float) -> Optio
 # ============= FUNÇÕES AUXILIARES =============
 
 def formatar_moeda(valor: float) -> str:
-    """Formata valor para moeda brasileira"""
-    return f"R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+    """Formata valor para moeda brasileira (sinal depois do símbolo: R$ -1.000,00)"""
+    return "R$ " + formatar_numero_br(valor)
 
 
 def formatar_percentual(valor: float) -> str:
@@ -550,4 +555,4 @@ def formatar_percentual(valor: float) -> str:
 
 def formatar_numero(valor: float, casas_decimais: int = 2) -> str:
     """Formata número com separadores"""
-    return f"{valor:,.{casas_decimais}f}".replace(",", "X").replace(".", ",").replace("X", ".")
\ No newline at end of file
+    return formatar_numero_br(valor, casas_decimais)
\ No newline at end of file
@@ -0,0 +1,450 @@
+"""
+Calculadora Vetorizada - Versões NumPy das fórmulas de financial_calc
+
+Cada função recebe colunas de entrada (arrays, listas ou escalares) e
+devolve uma coluna de KPIs, calculando N empresas em uma única passada.
+
+Os casos especiais das funções escalares são mantidos exatamente:
+- sentinelas de valor "infinito" (999.99 / 999.0)
+- onde a versão escalar retorna None, aqui o resultado é NaN
+  (use np.isnan para obter a máscara)
+"""
+from typing import Dict, List
+
+import numpy as np
+
+
+# Sentinelas usadas pelas funções escalares
+LIQUIDEZ_INFINITA = 999.99
+FOLEGO_INFINITO = 999.0
+ALAVANCAGEM_INFINITA = 999.99
+
+
+def para_array(valores) -> np.ndarray:
+    """
+    Converte uma coluna em array float64 (None vira NaN)
+    """
+    return np.asarray(valores, dtype=np.float64)
+
+
+def _dividir(numerador: np.ndarray, denominador: np.ndarray) -> np.ndarray:
+    """Divisão elemento a elemento sem avisos (o chamador trata os zeros)"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return numerador / denominador
+
+
+# ============= CÁLCULOS NÍVEL 1 =============
+
+def calcular_margem_bruta(receita, custo) -> np.ndarray:
+    """
+    Margem Bruta = (Receita - Custo) / Receita
+
+    Returns:
+        Percentual (0-100); 0.0 quando a receita é zero
+    """
+    receita = para_array(receita)
+    custo = para_array(custo)
+    margem = _dividir(receita - custo, receita) * 100
+    return np.where(receita == 0, 0.0, margem)
+
+
+def calcular_resultado_operacional(receita, custo, despesas_fixas) -> np.ndarray:
+    """
+    Resultado Operacional = Receita - Custo - Despesas Fixas
+    """
+    return para_array(receita) - para_array(custo) - para_array(despesas_fixas)
+
+
+def calcular_ponto_equilibrio(despesas_fixas, receita, custo) -> np.ndarray:
+    """
+    Ponto de Equilíbrio = Despesas Fixas / (1 - (Custo/Receita))
+
+    Returns:
+        Valor em R$; NaN sem receita ou sem margem de contribuição
+    """
+    despesas_fixas = para_array(despesas_fixas)
+    receita = para_array(receita)
+    margem_contribuicao = 1 - _dividir(para_array(custo), receita)
+    ponto = _dividir(despesas_fixas, margem_contribuicao)
+    invalido = (receita == 0) | (margem_contribuicao <= 0)
+    return np.where(invalido, np.nan, ponto)
+
+
+def calcular_liquidez_imediata(disponibilidades, contas_a_pagar) -> np.ndarray:
+    """
+    Liquidez Imediata = Disponibilidades / Contas a Pagar
+
+    Returns:
+        Índice; 999.99 quando não há contas a pagar
+    """
+    contas_a_pagar = para_array(contas_a_pagar)
+    liquidez = _dividir(para_array(disponibilidades), contas_a_pagar)
+    return np.where(contas_a_pagar == 0, LIQUIDEZ_INFINITA, liquidez)
+
+
+def calcular_folego_caixa(disponibilidades, contas_a_receber, contas_a_pagar, despesas_fixas) -> np.ndarray:
+    """
+    Fôlego de Caixa = (Disponibilidades + A Receber - A Pagar) / (Despesas Fixas/30)
+
+    Returns:
+        Número de dias; 999.0 quando não há despesas fixas
+    """
+    caixa_liquido = para_array(disponibilidades) + para_array(contas_a_receber) - para_array(contas_a_pagar)
+    despesas_fixas = para_array(despesas_fixas)
+    folego = _dividir(caixa_liquido, despesas_fixas / 30)
+    return np.where(despesas_fixas == 0, FOLEGO_INFINITO, folego)
+
+
+# ============= CÁLCULOS NÍVEL 2 =============
+
+def calcular_dio(estoque, custo_mensal) -> np.ndarray:
+    """
+    DIO = (Estoque / Custo Mensal) * 30
+
+    Returns:
+        Dias; NaN quando estoque ou custo são zero
+    """
+    estoque = para_array(estoque)
+    custo_mensal = para_array(custo_mensal)
+    dio = _dividir(estoque, custo_mensal) * 30
+    return np.where((custo_mensal == 0) | (estoque == 0), np.nan, dio)
+
+
+def calcular_ciclo_operacional(dio, dso) -> np.ndarray:
+    """
+    Ciclo Operacional = DIO + DSO (DIO ausente conta como 0)
+    """
+    dio = para_array(dio)
+    return np.where(np.isnan(dio), 0.0, dio) + para_array(dso)
+
+
+def calcular_ciclo_financeiro(ciclo_operacional, dpo) -> np.ndarray:
+    """
+    Ciclo Financeiro = Ciclo Operacional - DPO
+    """
+    return para_array(ciclo_operacional) - para_array(dpo)
+
+
+def calcular_ncg_estimada(estoque, contas_a_receber, contas_a_pagar) -> np.ndarray:
+    """
+    NCG = Estoque + A Receber - A Pagar
+    """
+    return para_array(estoque) + para_array(contas_a_receber) - para_array(contas_a_pagar)
+
+
+def calcular_alavancagem(dividas_totais, receita) -> np.ndarray:
+    """
+    Alavancagem = Dívidas Totais / Receita
+
+    Returns:
+        Índice; 999.99 quando a receita é zero
+    """
+    receita = para_array(receita)
+    alavancagem = _dividir(para_array(dividas_totais), receita)
+    return np.where(receita == 0, ALAVANCAGEM_INFINITA, alavancagem)
+
+
+def calcular_cobertura_juros(resultado_operacional, despesas_financeiras) -> np.ndarray:
+    """
+    Cobertura de Juros = Resultado Operacional / Despesas Financeiras
+
+    Returns:
+        Índice; NaN quando não há despesas financeiras
+    """
+    despesas_financeiras = para_array(despesas_financeiras)
+    cobertura = _dividir(para_array(resultado_operacional), despesas_financeiras)
+    return np.where(despesas_financeiras == 0, np.nan, cobertura)
+
+
+def calcular_produtividade(receita, numero_funcionarios) -> np.ndarray:
+    """
+    Produtividade = Receita / Número de Funcionários
+
+    Returns:
+        R$ por funcionário; NaN sem funcionários
+    """
+    numero_funcionarios = para_array(numero_funcionarios)
+    produtividade = _dividir(para_array(receita), numero_funcionarios)
+    return np.where(numero_funcionarios == 0, np.nan, produtividade)
+
+
+def simular_reducao_dso(receita_mensal, delta_dias, inadimplencia=0.05) -> np.ndarray:
+    """
+    Capital liberado ao reduzir o DSO em delta_dias
+    """
+    receita_diaria = para_array(receita_mensal) / 30
+    return receita_diaria * para_array(delta_dias) * (1 - para_array(inadimplencia))
+
+
+def simular_aumento_dpo(custo_mensal, delta_dias) -> np.ndarray:
+    """
+    Capital liberado ao aumentar o DPO em delta_dias
+    """
+    custo_diario = para_array(custo_mensal) / 30
+    return custo_diario * para_array(delta_dias)
+
+
+# ============= CÁLCULOS NÍVEL 3 =============
+
+def calcular_roa(resultado_operacional_mensal, ativos_totais) -> np.ndarray:
+    """
+    ROA = Resultado Operacional Anualizado / Ativos Totais
+
+    Returns:
+        Percentual; NaN sem ativos
+    """
+    ativos_totais = para_array(ativos_totais)
+    resultado_anualizado = para_array(resultado_operacional_mensal) * 12
+    roa = _dividir(resultado_anualizado, ativos_totais) * 100
+    return np.where(ativos_totais == 0, np.nan, roa)
+
+
+def calcular_roe(resultado_operacional_mensal, despesas_financeiras, impostos, patrimonio_liquido) -> np.ndarray:
+    """
+    ROE = Resultado Líquido Anualizado / Patrimônio Líquido
+
+    Returns:
+        Percentual; NaN com patrimônio líquido zero
+    """
+    patrimonio_liquido = para_array(patrimonio_liquido)
+    resultado_liquido_mensal = (
+        para_array(resultado_operacional_mensal) - para_array(despesas_financeiras) - para_array(impostos)
+    )
+    roe = _dividir(resultado_liquido_mensal * 12, patrimonio_liquido) * 100
+    return np.where(patrimonio_liquido == 0, np.nan, roe)
+
+
+def calcular_payback_capex(capex, incremento_lucro_anual) -> np.ndarray:
+    """
+    Payback = CAPEX / Incremento de Lucro Anual
+
+    Returns:
+        Anos; NaN sem lucro incremental ou sem CAPEX
+    """
+    capex = para_array(capex)
+    incremento_lucro_anual = para_array(incremento_lucro_anual)
+    payback = _dividir(capex, incremento_lucro_anual)
+    return np.where((incremento_lucro_anual <= 0) | (capex == 0), np.nan, payback)
+
+
+# Cenários na mesma ordem de financial_calc.projetar_cenarios
+CENARIOS = ("otimista", "neutro", "pessimista")
+CRESCIMENTO_RECEITA_CENARIOS = np.array([0.08, 0.0, -0.10])
+DELTA_DSO_CENARIOS = np.array([-10.0, 0.0, 10.0])
+DELTA_DPO_CENARIOS = np.array([5.0, 0.0, -5.0])
+
+
+def projetar_cenarios(
+    receita_base,
+    custo_base,
+    despesas_fixas,
+    despesas_variaveis_percentual,
+    impostos_mensais,
+    despesas_financeiras,
+    caixa_inicial,
+    meta_margem_bruta,
+    num_meses: int = 6,
+    arredondar: bool = True
+) -> Dict[str, np.ndarray]:
+    """
+    Projeta os 3 cenários (Otimista, Neutro, Pessimista) para N empresas de uma vez
+
+    Mesmas regras de financial_calc.projetar_cenarios: crescimento de +8%/0%/-10%
+    ao mês, margem do pessimista caindo 2 p.p. (mínimo 5%) e efeito de DSO/DPO
+    aplicado só no primeiro mês. Como na versão escalar, o DSO/DPO atual não
+    altera a projeção e por isso não é parâmetro aqui.
+
+    Returns:
+        {
+            "receita", "custo", "margem_bruta", "resultado_operacional", "caixa":
+                arrays (empresa, cenário, mês) - cenários na ordem de CENARIOS
+        }
+    """
+    # Colunas (N, 1) para propagar sobre os 3 cenários
+    receita_base = para_array(receita_base).reshape(-1, 1)
+    custo_base = para_array(custo_base).reshape(-1, 1)
+    despesas_fixas = para_array(despesas_fixas).reshape(-1, 1)
+    percentual_variavel = para_array(despesas_variaveis_percentual).reshape(-1, 1) / 100
+    impostos_mensais = para_array(impostos_mensais).reshape(-1, 1)
+    despesas_financeiras = para_array(despesas_financeiras).reshape(-1, 1)
+    meta_margem_bruta = para_array(meta_margem_bruta).reshape(-1, 1)
+
+    n_empresas = receita_base.shape[0]
+    forma = (n_empresas, len(CENARIOS))
+
+    # Fator de margem por cenário: custo = receita * (1 - fator)
+    com_receita = receita_base > 0
+    fator_neutro = np.where(com_receita, _dividir(custo_base, receita_base), 0.65)
+    margem_atual = np.where(com_receita, _dividir(receita_base - custo_base, receita_base), 0.35)
+    fator_pessimista = np.maximum(0.05, margem_atual - 0.02)
+    fator_margem = np.hstack([meta_margem_bruta / 100, fator_neutro, fator_pessimista])
+
+    crescimento = 1 + CRESCIMENTO_RECEITA_CENARIOS
+    receita_proj = np.broadcast_to(receita_base, forma).copy()
+    caixa_proj = np.broadcast_to(para_array(caixa_inicial).reshape(-1, 1), forma).copy()
+
+    resultado = {
+        chave: np.empty(forma + (num_meses,))
+        for chave in ("receita", "custo", "margem_bruta", "resultado_operacional", "caixa")
+    }
+
+    # Loop só nos meses: cada passo calcula todas as empresas e cenários
+    for indice_mes in range(num_meses):
+        receita_proj = receita_proj * crescimento
+        custo_proj = receita_proj * (1 - fator_margem)
+        desp_variaveis = receita_proj * percentual_variavel
+
+        margem_bruta_proj = np.where(
+            receita_proj > 0,
+            _dividir(receita_proj - custo_proj, receita_proj) * 100,
+            0.0
+        )
+        resultado_op = receita_proj - custo_proj - despesas_fixas - desp_variaveis
+
+        caixa_proj = caixa_proj + resultado_op - impostos_mensais - despesas_financeiras
+
+        # Efeito dos prazos apenas no primeiro mês (oneoff)
+        if indice_mes == 0:
+            efeito_dso = simular_reducao_dso(receita_proj, DELTA_DSO_CENARIOS)
+            efeito_dpo = simular_aumento_dpo(custo_proj, DELTA_DPO_CENARIOS)
+            caixa_proj += efeito_dso + efeito_dpo
+
+        resultado["receita"][:, :, indice_mes] = receita_proj
+        resultado["custo"][:, :, indice_mes] = custo_proj
+        resultado["margem_bruta"][:, :, indice_mes] = margem_bruta_proj
+        resultado["resultado_operacional"][:, :, indice_mes] = resultado_op
+        resultado["caixa"][:, :, indice_mes] = caixa_proj
+
+    if arredondar:
+        for chave, valores in resultado.items():
+            np.round(valores, 2, out=valores)
+
+    return resultado
+
+
+def cenarios_para_listas(projecao: Dict[str, np.ndarray], indice_empresa: int) -> Dict[str, List[Dict]]:
+    """
+    Converte a projeção de uma empresa para o formato de financial_calc.projetar_cenarios
+    """
+    num_meses = projecao["receita"].shape[2]
+    return {
+        nome_cenario: [
+            {
+                "mes": mes + 1,
+                "receita": float(projecao["receita"][indice_empresa, i, mes]),
+                "custo": float(projecao["custo"][indice_empresa, i, mes]),
+                "margem_bruta": float(projecao["margem_bruta"][indice_empresa, i, mes]),
+                "resultado_operacional": float(projecao["resultado_operacional"][indice_empresa, i, mes]),
+                "caixa": float(projecao["caixa"][indice_empresa, i, mes])
+            }
+            for mes in range(num_meses)
+        ]
+        for i, nome_cenario in enumerate(CENARIOS)
+    }
+
+
+# ============= CLASSIFICAÇÕES =============
+
+def classificar_liquidez_imediata(liquidez) -> np.ndarray:
+    """Versão em coluna de financial_calc.classificar_liquidez_imediata"""
+    liquidez = para_array(liquidez)
+    return np.select([liquidez >= 1.0, liquidez >= 0.5], ["bom", "alerta"], "critico")
+
+
+def classificar_ciclo_financeiro(ciclo_financeiro) -> np.ndarray:
+    """Versão em coluna de financial_calc.classificar_ciclo_financeiro"""
+    ciclo_financeiro = para_array(ciclo_financeiro)
+    return np.select([ciclo_financeiro <= 10, ciclo_financeiro <= 30], ["verde", "amarelo"], "vermelho")
+
+
+def classificar_cobertura_juros(cobertura) -> np.ndarray:
+    """Versão em coluna de financial_calc.classificar_cobertura_juros (NaN = sem juros)"""
+    cobertura = para_array(cobertura)
+    return np.select(
+        [np.isnan(cobertura) | (cobertura >= 3.0), cobertura >= 1.5],
+        ["verde", "amarelo"],
+        "vermelho"
+    )
+
+
+# ============= KPIs POR NÍVEL (MESMAS CHAVES DE /api/analise) =============
+
+def calcular_kpis_nivel1(dados_n1: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Calcula os KPIs do Nível 1 para várias empresas
+
+    Args:
+        dados_n1: colunas do Nível 1 já com defaults aplicados
+            (mesmas chaves de DadosNivel1)
+
+    Returns:
+        Colunas com as mesmas chaves de kpis_n1 em processar_analise
+    """
+    receita = para_array(dados_n1["receita_bruta_mensal"])
+    custo = para_array(dados_n1["custo_vendas_mensal"])
+    despesas_fixas = para_array(dados_n1["despesas_fixas_mensais"])
+    a_receber = para_array(dados_n1["contas_a_receber_30d"])
+    a_pagar = para_array(dados_n1["contas_a_pagar_30d"])
+    disponibilidades = para_array(dados_n1["caixa"]) + para_array(dados_n1["conta_corrente"])
+
+    return {
+        "receita_bruta": receita,
+        "despesas_fixas": despesas_fixas,
+        "margem_bruta": calcular_margem_bruta(receita, custo),
+        "resultado_operacional": calcular_resultado_operacional(receita, custo, despesas_fixas),
+        "ponto_equilibrio": calcular_ponto_equilibrio(despesas_fixas, receita, custo),
+        "liquidez_imediata": calcular_liquidez_imediata(disponibilidades, a_pagar),
+        "folego_caixa": calcular_folego_caixa(disponibilidades, a_receber, a_pagar, despesas_fixas),
+    }
+
+
+def calcular_kpis_nivel2(
+    dados_n1: Dict[str, np.ndarray],
+    dados_n2: Dict[str, np.ndarray],
+    kpis_n1: Dict[str, np.ndarray] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Calcula os KPIs do Nível 2 (inclui os do Nível 1) para várias empresas
+
+    Args:
+        dados_n1: colunas do Nível 1 já com defaults aplicados
+        dados_n2: colunas do Nível 2 já com defaults aplicados
+        kpis_n1: resultado de calcular_kpis_nivel1, se já calculado
+    """
+    if kpis_n1 is None:
+        kpis_n1 = calcular_kpis_nivel1(dados_n1)
+
+    receita = kpis_n1["receita_bruta"]
+    custo = para_array(dados_n1["custo_vendas_mensal"])
+    estoque = para_array(dados_n2["estoque_custo"])
+    dso = para_array(dados_n2["prazo_medio_recebimento_dias"])
+    dpo = para_array(dados_n2["prazo_medio_pagamento_dias"])
+
+    dio = calcular_dio(estoque, custo)
+    ciclo_op = calcular_ciclo_operacional(dio, dso)
+
+    # Sem funcionários (None ou 0) a rota não calcula produtividade
+    funcionarios = para_array(dados_n2["numero_funcionarios"])
+    funcionarios = np.where(np.isnan(funcionarios), 0.0, funcionarios)
+
+    return {
+        **kpis_n1,
+        "dso": dso,
+        "dpo": dpo,
+        "dio": dio,
+        "ciclo_operacional": ciclo_op,
+        "ciclo_financeiro": calcular_ciclo_financeiro(ciclo_op, dpo),
+        "ncg_estimada": calcular_ncg_estimada(
+            estoque,
+            dados_n1["contas_a_receber_30d"],
+            dados_n1["contas_a_pagar_30d"]
+        ),
+        "alavancagem": calcular_alavancagem(dados_n2["dividas_totais"], receita),
+        "cobertura_juros": calcular_cobertura_juros(
+            kpis_n1["resultado_operacional"],
+            dados_n2["despesas_financeiras_mensais"]
+        ),
+        "produtividade": calcular_produtividade(receita, funcionarios),
+        "simulacao_reducao_dso": simular_reducao_dso(receita, 10),
+        "simulacao_aumento_dpo": simular_aumento_dpo(custo, 7),
+    }
@@ -1,6 +1,27 @@
 """
 Formatadores - Funções para formatar números no padrão brasileiro
+
+O agrupamento de milhares é feito pelo próprio format() do Python ("_"
+como separador provisório) e as trocas de separador por str.replace, em
+C: nada de montar a string caractere a caractere.
+
+- formatar_*_br: um valor (mensagens, plano de ação)
+- formatar_*s_br: uma coluna inteira de uma vez (exportações, lotes);
+  formata tudo, junta em um texto só, troca os separadores uma vez e
+  divide de volta
+
+A saída é a mesma, byte a byte, das versões anteriores (com laço de
+dígitos): tests/test_formatadores.py confere, benchmarks/benchmark_formatacao.py
+mede. Como antes, moeda não aceita inf/nan (agora ValueError; a versão
+anterior dava IndexError).
 """
+from typing import Iterable, List
+
+
+def _lista(valores: Iterable[float]) -> list:
+    """Lista de números Python (arrays do numpy viram lista de uma vez)"""
+    return valores.tolist() if hasattr(valores, "tolist") else list(valores)
+
 
 def formatar_moeda_br(valor: float) -> str:
     """
@@ -8,24 +29,14 @@ def formatar_moeda_br(valor: float) -> str:
     Ex: 10000.50 -> R$ 10.000,50
     """
     if valor < 0:
-        sinal = "-"
-        valor = abs(valor)
+        texto = format(-valor, "_.2f")
+        sinal = "-R$ "
     else:
-        sinal = ""
-    
-    # Separa parte inteira e decimal
-    partes = f"{valor:.2f}".split('.')
-    inteiro = partes[0]
-    decimal = partes[1]
-    
-    # Adiciona pontos nos milhares
-    inteiro_formatado = ""
-    for i, digito in enumerate(reversed(inteiro)):
-        if i > 0 and i % 3 == 0:
-            inteiro_formatado = "." + inteiro_formatado
-        inteiro_formatado = digito + inteiro_formatado
-    
-    return f"{sinal}R$ {inteiro_formatado},{decimal}"
+        texto = format(valor, "_.2f")
+        sinal = "R$ "
+    if texto[-3] != ".":
+        raise ValueError(f"Valor monetário inválido: {valor}")
+    return sinal + texto.replace(".", ",").replace("_", ".")
 
 
 def formatar_numero_br(valor: float, casas_decimais: int = 2) -> str:
@@ -33,29 +44,7 @@ def formatar_numero_br(valor: float, casas_decimais: int = 2) -> str:
     Formata número no padrão brasileiro
     Ex: 10000.5 -> 10.000,50
     """
-    if valor < 0:
-        sinal = "-"
-        valor = abs(valor)
-    else:
-        sinal = ""
-    
-    # Formata com casas decimais
-    formato = f"{{:.{casas_decimais}f}}"
-    partes = formato.format(valor).split('.')
-    inteiro = partes[0]
-    decimal = partes[1] if len(partes) > 1 else ""
-    
-    # Adiciona pontos nos milhares
-    inteiro_formatado = ""
-    for i, digito in enumerate(reversed(inteiro)):
-        if i > 0 and i % 3 == 0:
-            inteiro_formatado = "." + inteiro_formatado
-        inteiro_formatado = digito + inteiro_formatado
-    
-    if decimal:
-        return f"{sinal}{inteiro_formatado},{decimal}"
-    else:
-        return f"{sinal}{inteiro_formatado}"
+    return format(valor, f"_.{casas_decimais}f").replace(".", ",").replace("_", ".")
 
 
 def formatar_percentual_br(valor: float, casas_decimais: int = 1) -> str:
@@ -63,5 +52,40 @@ def formatar_percentual_br(valor: float, casas_decimais: int = 1) -> str:
     Formata percentual no padrão brasileiro
     Ex: 35.5 -> 35,5%
     """
-    numero = formatar_numero_br(valor, casas_decimais)
-    return f"{numero}%"
\ No newline at end of file
+    return format(valor, f"_.{casas_decimais}f").replace(".", ",").replace("_", ".") + "%"
+
+
+# ============= EM LOTE (COLUNAS) =============
+
+def formatar_numeros_br(valores: Iterable[float], casas_decimais: int = 2) -> List[str]:
+    """formatar_numero_br de cada valor (lista, tupla ou array do numpy)"""
+    valores = _lista(valores)
+    if not valores:
+        return []
+    formato = f"_.{casas_decimais}f"
+    texto = "\n".join([format(valor, formato) for valor in valores])
+    return texto.replace(".", ",").replace("_", ".").split("\n")
+
+
+def formatar_moedas_br(valores: Iterable[float]) -> List[str]:
+    """formatar_moeda_br de cada valor (lista, tupla ou array do numpy)"""
+    valores = _lista(valores)
+    if not valores:
+        return []
+    texto = "\n".join([
+        "-R$ " + format(-valor, "_.2f") if valor < 0 else "R$ " + format(valor, "_.2f")
+        for valor in valores
+    ])
+    if "n" in texto:  # inf/nan (o resto só tem dígitos, "R$", "-", "_" e ".")
+        raise ValueError("Valor monetário inválido: inf/nan na coluna")
+    return texto.replace(".", ",").replace("_", ".").split("\n")
+
+
+def formatar_percentuais_br(valores: Iterable[float], casas_decimais: int = 1) -> List[str]:
+    """formatar_percentual_br de cada valor (lista, tupla ou array do numpy)"""
+    valores = _lista(valores)
+    if not valores:
+        return []
+    formato = f"_.{casas_decimais}f"
+    texto = "%\n".join([format(valor, formato) for valor in valores]) + "%"
+    return texto.replace(".", ",").replace("_", ".").split("\n")
@@ -1,7 +1,7 @@
 """
 Mensagens - Gera mensagens automáticas personalizadas baseadas nos cálculos
 """
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 
 from app.services.formatadores import formatar_moeda_br, formatar_numero_br, formatar_percentual_br
@@ -269,43 +269,48 @@ def gerar_diagnostico_final(todos_kpis: Dict) -> List[str]:
     return diagnostico[:5]  # Máximo 5 frases
 
 
+# ============= OPORTUNIDADES =============
+
+# (chave do impacto em kpis_nivel2, descrição, ação); entra quando o impacto > 0
+OPORTUNIDADES_PRAZOS = (
+    ("simulacao_reducao_dso",
+     "Reduzir o prazo médio de recebimento (DSO) em 10 dias",
+     "Implementar cobrança proativa, oferecer descontos para pagamento antecipado"),
+    ("simulacao_aumento_dpo",
+     "Negociar aumento do prazo de pagamento (DPO) em 7 dias",
+     "Renegociar com fornecedores principais, consolidar compras"),
+)
+
+OPORTUNIDADE_MARGEM = {
+    "descricao": "Aumentar margem bruta em 1 ponto percentual",
+    "acao": "Revisar preços, negociar custos, eliminar produtos de baixa margem",
+}
+
+
 def gerar_oportunidades(kpis_nivel2: Dict, receita: float) -> List[Dict]:
     """
     Gera lista de oportunidades de melhoria com impacto estimado
     """
     oportunidades = []
     
-    # Oportunidade 1: Redução de DSO
-    simulacao_dso = kpis_nivel2.get("simulacao_reducao_dso", 0)
-    if simulacao_dso > 0:
-        impacto_percentual = (simulacao_dso / receita * 100) if receita > 0 else 0
-        oportunidades.append({
-            "descricao": "Reduzir o prazo médio de recebimento (DSO) em 10 dias",
-            "impacto_r": round(simulacao_dso, 2),
-            "impacto_percentual": round(impacto_percentual, 2),
-            "acao": "Implementar cobrança proativa, oferecer descontos para pagamento antecipado"
-        })
-    
-    # Oportunidade 2: Aumento de DPO
-    simulacao_dpo = kpis_nivel2.get("simulacao_aumento_dpo", 0)
-    if simulacao_dpo > 0:
-        impacto_percentual = (simulacao_dpo / receita * 100) if receita > 0 else 0
-        oportunidades.append({
-            "descricao": "Negociar aumento do prazo de pagamento (DPO) em 7 dias",
-            "impacto_r": round(simulacao_dpo, 2),
-            "impacto_percentual": round(impacto_percentual, 2),
-            "acao": "Renegociar com fornecedores principais, consolidar compras"
-        })
-    
-    # Oportunidade 3: Melhoria de margem
-    margem_atual = kpis_nivel2.get("margem_bruta", 0)
-    if margem_atual < 30:
-        ganho_1pp = receita * 0.01  # 1 ponto percentual
+    for chave, descricao, acao in OPORTUNIDADES_PRAZOS:
+        impacto = kpis_nivel2.get(chave, 0)
+        if impacto > 0:
+            impacto_percentual = (impacto / receita * 100) if receita > 0 else 0
+            oportunidades.append({
+                "descricao": descricao,
+                "impacto_r": round(impacto, 2),
+                "impacto_percentual": round(impacto_percentual, 2),
+                "acao": acao
+            })
+    
+    # Melhoria de margem: ganho de 1 ponto percentual
+    if kpis_nivel2.get("margem_bruta", 0) < 30:
         oportunidades.append({
-            "descricao": "Aumentar margem bruta em 1 ponto percentual",
-            "impacto_r": round(ganho_1pp, 2),
+            "descricao": OPORTUNIDADE_MARGEM["descricao"],
+            "impacto_r": round(receita * 0.01, 2),
             "impacto_percentual": 1.0,
-            "acao": "Revisar preços, negociar custos, eliminar produtos de baixa margem"
+            "acao": OPORTUNIDADE_MARGEM["acao"]
         })
     
     return oportunidades
@@ -353,49 +358,58 @@ def gerar_plano_30_60_90(kpis: Dict) -> Dict[str, List[str]]:
 # ✨ NOVA FUNÇÃO - PLANO ESTRUTURADO COM IA
 # ============================================
 
+def _entrada_plano_inteligente(kpis: Dict) -> Tuple[Dict, List[str], List[Dict]]:
+    """Indicadores, diagnóstico e oportunidades enviados à IA"""
+    # Preparar indicadores
+    nivel1 = kpis.get("nivel1", {})
+    nivel2 = kpis.get("nivel2", {})
+    nivel3 = kpis.get("nivel3", {})
+    
+    indicadores_dict = {
+        'margem_bruta': nivel1.get('margem_bruta', 0),
+        'liquidez_corrente': nivel1.get('liquidez_imediata', 0),
+        'folego_caixa': nivel1.get('folego_caixa', 0),
+        'prazo_medio_recebimento': nivel2.get('dso', 0) if nivel2 else 0,
+        'prazo_medio_pagamento': nivel2.get('dpo', 0) if nivel2 else 0,
+        'ciclo_caixa': nivel2.get('ciclo_financeiro', 0) if nivel2 else 0,
+    }
+    
+    # Gerar diagnóstico simples
+    diagnostico = []
+    margem = nivel1.get('margem_bruta', 0)
+    if margem < 20:
+        diagnostico.append(f"Margem bruta crítica de {margem:.1f}%")
+    elif margem < 30:
+        diagnostico.append(f"Margem bruta moderada de {margem:.1f}%")
+    else:
+        diagnostico.append(f"Margem bruta saudável de {margem:.1f}%")
+    
+    # Gerar oportunidades simples
+    oportunidades = []
+    if nivel2:
+        dso = nivel2.get('dso', 0)
+        if dso > 30:
+            oportunidades.append({
+                'descricao': f'Reduzir DSO de {dso:.0f} para 30 dias',
+                'impacto_r': 0,
+                'impacto_percentual': 0
+            })
+    
+    return indicadores_dict, diagnostico, oportunidades
+
+
 def gerar_plano_30_60_90_inteligente(kpis: Dict) -> Dict[str, List[Dict]]:
     """
     Gera plano de ação 30-60-90 dias ESTRUTURADO (com objetos, não strings)
     Usa IA quando possível, fallback para plano padrão estruturado
+
+    Bloqueante: em rotas async use gerar_plano_30_60_90_inteligente_async
     """
     try:
         # Tentar usar IA para gerar plano personalizado
         from app.services.plano_acao_generator import gerar_plano_acao_inteligente
         
-        # Preparar indicadores
-        nivel1 = kpis.get("nivel1", {})
-        nivel2 = kpis.get("nivel2", {})
-        nivel3 = kpis.get("nivel3", {})
-        
-        indicadores_dict = {
-            'margem_bruta': nivel1.get('margem_bruta', 0),
-            'liquidez_corrente': nivel1.get('liquidez_imediata', 0),
-            'folego_caixa': nivel1.get('folego_caixa', 0),
-            'prazo_medio_recebimento': nivel2.get('dso', 0) if nivel2 else 0,
-            'prazo_medio_pagamento': nivel2.get('dpo', 0) if nivel2 else 0,
-            'ciclo_caixa': nivel2.get('ciclo_financeiro', 0) if nivel2 else 0,
-        }
-        
-        # Gerar diagnóstico simples
-        diagnostico = []
-        margem = nivel1.get('margem_bruta', 0)
-        if margem < 20:
-            diagnostico.append(f"Margem bruta crítica de {margem:.1f}%")
-        elif margem < 30:
-            diagnostico.append(f"Margem bruta moderada de {margem:.1f}%")
-        else:
-            diagnostico.append(f"Margem bruta saudável de {margem:.1f}%")
-        
-        # Gerar oportunidades simples
-        oportunidades = []
-        if nivel2:
-            dso = nivel2.get('dso', 0)
-            if dso > 30:
-                oportunidades.append({
-                    'descricao': f'Reduzir DSO de {dso:.0f} para 30 dias',
-                    'impacto_r': 0,
-                    'impacto_percentual': 0
-                })
+        indicadores_dict, diagnostico, oportunidades = _entrada_plano_inteligente(kpis)
         
         # Chamar gerador inteligente
         plano = gerar_plano_acao_inteligente(
@@ -412,6 +426,37 @@ def gerar_plano_30_60_90_inteligente(kpis: Dict) -> Dict[str, List[Dict]]:
         return gerar_plano_fallback_estruturado(kpis)
 
 
+async def gerar_plano_30_60_90_inteligente_async(kpis: Dict) -> Dict[str, List[Dict]]:
+    """
+    Igual a gerar_plano_30_60_90_inteligente, sem bloquear o event loop
+
+    A chamada à IA tem orçamento de tempo, limite de concorrência e
+    disjuntor (app.services.plano_acao_generator.cliente_llm).
+    """
+    plano = await gerar_plano_30_60_90_ia_async(kpis)
+    return plano if plano is not None else gerar_plano_fallback_estruturado(kpis)
+
+
+async def gerar_plano_30_60_90_ia_async(kpis: Dict) -> Optional[Dict[str, List[Dict]]]:
+    """
+    Plano 30-60-90 da IA, ou None se ela não responder a tempo/corretamente
+    (a rota mantém o plano por regras que já montou)
+    """
+    try:
+        from app.services.plano_acao_generator import PlanoAcaoGenerator
+        
+        indicadores_dict, diagnostico, oportunidades = _entrada_plano_inteligente(kpis)
+        return await PlanoAcaoGenerator().gerar_plano_ia_async(
+            indicadores=indicadores_dict,
+            diagnostico=diagnostico,
+            oportunidades=oportunidades
+        )
+        
+    except Exception as e:
+        print(f"Erro ao gerar plano inteligente: {e}")
+        return None
+
+
 def gerar_plano_fallback_estruturado(kpis: Dict) -> Dict[str, List[Dict]]:
     """
     Plano padrão estruturado (objetos, não strings) - usado como fallback
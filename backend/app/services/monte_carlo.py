@@ -0,0 +1,216 @@
+"""
+Simulação Monte Carlo do Fluxo de Caixa
+
+Em vez de 3 cenários fixos (projetar_cenarios), sorteia milhares de
+caminhos mês a mês para cada empresa, com choques de crescimento da
+receita, de margem bruta e de prazos (DSO/DPO). As distribuições dependem
+do setor e vêm dos perfis de setor. O resultado são faixas de percentis
+de caixa e resultado operacional e a probabilidade de o caixa ficar
+negativo até cada mês.
+
+Mesma estrutura da projeção determinística: custo = receita × (1 - margem),
+despesas variáveis proporcionais à receita, impostos e despesas financeiras
+fixos, e efeito de DSO/DPO aplicado só no primeiro mês.
+
+Tudo é calculado em arrays (empresa, caminho, mês), sem loop por caminho.
+A semente é fixa por padrão: a mesma entrada gera sempre a mesma resposta
+(necessário para o cache de resultados).
+"""
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.perfis_setor import CAMPOS_MONTE_CARLO, perfis_setor
+from app.services.financial_calc_vetorizado import (
+    para_array,
+    _dividir,
+    simular_reducao_dso,
+    simular_aumento_dpo,
+)
+
+
+# Percentis devolvidos nas faixas
+PERCENTIS = (5, 25, 50, 75, 95)
+
+# Limites para os sorteios não gerarem valores absurdos
+CRESCIMENTO_MINIMO = -0.95
+MARGEM_MINIMA = -0.50
+MARGEM_MAXIMA = 0.95
+
+
+# Premissas por setor (mensais), na seção "monte_carlo" dos perfis de setor
+# (app/data/perfis_setor.json; setores sem ajuste herdam do "padrao"):
+#   crescimento_medio: média do crescimento da receita ao mês
+#   volatilidade_crescimento: desvio padrão do crescimento ao mês
+#   volatilidade_margem: desvio padrão da variação da margem bruta ao mês (acumula)
+#   choque_dso_dias / choque_dpo_dias: desvio padrão da mudança de prazo no 1º mês
+# Lidas uma vez por setor e versão dos perfis (recarga dos perfis = premissas novas)
+_parametros_por_setor: Dict[str, Dict[str, float]] = {}
+_versao_parametros = None
+
+
+def parametros_setor(setor: str) -> Dict[str, float]:
+    """Premissas da simulação para um setor (dict compartilhado: não alterar)"""
+    global _versao_parametros
+    if perfis_setor.versao != _versao_parametros:
+        _parametros_por_setor.clear()
+        _versao_parametros = perfis_setor.versao
+    parametros = _parametros_por_setor.get(setor)
+    if parametros is None:
+        parametros = _parametros_por_setor[setor] = dict(perfis_setor.perfil(setor).monte_carlo)
+    return parametros
+
+
+def _colunas_parametros(setores: Sequence[str]) -> Dict[str, np.ndarray]:
+    """Premissas em colunas (N, 1, 1), para propagar sobre caminhos e meses"""
+    parametros = [parametros_setor(setor) for setor in setores]
+    return {
+        chave: np.array([p[chave] for p in parametros]).reshape(-1, 1, 1)
+        for chave in CAMPOS_MONTE_CARLO
+    }
+
+
+def simular_fluxo_caixa(
+    receita_base,
+    custo_base,
+    despesas_fixas,
+    despesas_variaveis_percentual,
+    impostos_mensais,
+    despesas_financeiras,
+    caixa_inicial,
+    setores: Sequence[str],
+    num_caminhos: int = settings.MONTE_CARLO_CAMINHOS,
+    num_meses: int = 6,
+    semente: int = settings.MONTE_CARLO_SEMENTE
+) -> Dict[str, np.ndarray]:
+    """
+    Sorteia os caminhos de N empresas de uma vez
+
+    Args:
+        receita_base ... caixa_inicial: colunas por empresa (como em projetar_cenarios)
+        setores: setor de cada empresa (define as distribuições)
+        num_caminhos: caminhos sorteados por empresa
+        num_meses: horizonte da simulação
+        semente: semente do gerador (mesma semente = mesmos caminhos)
+
+    Returns:
+        {"caixa", "resultado_operacional": arrays (empresa, caminho, mês)}
+    """
+    receita_base = para_array(receita_base).reshape(-1, 1, 1)
+    custo_base = para_array(custo_base).reshape(-1, 1, 1)
+    despesas_fixas = para_array(despesas_fixas).reshape(-1, 1, 1)
+    percentual_variavel = para_array(despesas_variaveis_percentual).reshape(-1, 1, 1) / 100
+    saidas_fixas = (para_array(impostos_mensais) + para_array(despesas_financeiras)).reshape(-1, 1, 1)
+    caixa_inicial = para_array(caixa_inicial).reshape(-1, 1, 1)
+
+    n_empresas = receita_base.shape[0]
+    forma = (n_empresas, num_caminhos, num_meses)
+    parametros = _colunas_parametros(setores)
+    gerador = np.random.default_rng(semente)
+
+    # Receita: crescimento sorteado a cada mês, acumulado no caminho
+    crescimento = (
+        parametros["crescimento_medio"]
+        + parametros["volatilidade_crescimento"] * gerador.standard_normal(forma)
+    )
+    np.maximum(crescimento, CRESCIMENTO_MINIMO, out=crescimento)
+    receita = receita_base * np.cumprod(1 + crescimento, axis=2)
+
+    # Margem bruta: passeio aleatório a partir da margem atual
+    margem_atual = np.where(receita_base > 0, _dividir(receita_base - custo_base, receita_base), 0.35)
+    margem = margem_atual + np.cumsum(
+        parametros["volatilidade_margem"] * gerador.standard_normal(forma), axis=2
+    )
+    np.clip(margem, MARGEM_MINIMA, MARGEM_MAXIMA, out=margem)
+    custo = receita * (1 - margem)
+
+    resultado_operacional = receita - custo - despesas_fixas - receita * percentual_variavel
+
+    # Prazos: mudança sorteada no 1º mês (DSO maior prende caixa, DPO maior libera)
+    forma_prazos = (n_empresas, num_caminhos)
+    choque_dso = parametros["choque_dso_dias"][:, :, 0] * gerador.standard_normal(forma_prazos)
+    choque_dpo = parametros["choque_dpo_dias"][:, :, 0] * gerador.standard_normal(forma_prazos)
+    efeito_prazos = (
+        simular_reducao_dso(receita[:, :, 0], -choque_dso)
+        + simular_aumento_dpo(custo[:, :, 0], choque_dpo)
+    )
+
+    fluxo = resultado_operacional - saidas_fixas
+    fluxo[:, :, 0] += efeito_prazos
+    caixa = caixa_inicial + np.cumsum(fluxo, axis=2)
+
+    return {"caixa": caixa, "resultado_operacional": resultado_operacional}
+
+
+def resumir_simulacao(simulacao: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Reduz os caminhos a percentis e probabilidade de caixa negativo
+
+    Returns:
+        {
+            "caixa", "resultado_operacional": arrays (empresa, percentil, mês),
+            "probabilidade_caixa_negativo": array (empresa, mês) - chance de o
+                caixa ter ficado negativo em algum mês até aquele (0 a 1)
+        }
+    """
+    caixa = simulacao["caixa"]
+    negativo_ate_o_mes = np.logical_or.accumulate(caixa < 0, axis=2)
+
+    return {
+        "caixa": np.moveaxis(np.percentile(caixa, PERCENTIS, axis=1), 0, 1),
+        "resultado_operacional": np.moveaxis(
+            np.percentile(simulacao["resultado_operacional"], PERCENTIS, axis=1), 0, 1
+        ),
+        "probabilidade_caixa_negativo": negativo_ate_o_mes.mean(axis=1),
+    }
+
+
+def resumo_para_dict(resumo: Dict[str, np.ndarray], indice_empresa: int, setor: str, num_caminhos: int) -> Dict:
+    """Resumo de uma empresa no formato de SimulacaoMonteCarlo"""
+    num_meses = resumo["caixa"].shape[2]
+
+    def faixas(chave: str) -> Dict[str, List[float]]:
+        return {
+            f"p{percentil}": [round(float(v), 2) for v in resumo[chave][indice_empresa, i]]
+            for i, percentil in enumerate(PERCENTIS)
+        }
+
+    return {
+        "caminhos": num_caminhos,
+        "meses": list(range(1, num_meses + 1)),
+        "caixa": faixas("caixa"),
+        "resultado_operacional": faixas("resultado_operacional"),
+        "probabilidade_caixa_negativo": [
+            round(float(p), 4) for p in resumo["probabilidade_caixa_negativo"][indice_empresa]
+        ],
+        "premissas": dict(parametros_setor(setor)),
+    }
+
+
+def simular_empresa(
+    dados_n1: Dict,
+    dados_n2: Dict,
+    dados_n3: Dict,
+    setor: str,
+    num_caminhos: int = settings.MONTE_CARLO_CAMINHOS,
+    num_meses: int = 6
+) -> Dict:
+    """
+    Simulação de uma empresa a partir dos dados dos níveis (já com defaults)
+
+    Usa as mesmas entradas de projetar_cenarios em /api/analise.
+    """
+    simulacao = simular_fluxo_caixa(
+        receita_base=dados_n1["receita_bruta_mensal"],
+        custo_base=dados_n1["custo_vendas_mensal"],
+        despesas_fixas=dados_n1["despesas_fixas_mensais"],
+        despesas_variaveis_percentual=dados_n3.get("despesas_variaveis_percentual_receita") or 0,
+        impostos_mensais=dados_n2.get("impostos_mensais") or 0,
+        despesas_financeiras=dados_n2.get("despesas_financeiras_mensais") or 0,
+        caixa_inicial=dados_n1["caixa"] + dados_n1["conta_corrente"],
+        setores=[setor],
+        num_caminhos=num_caminhos,
+        num_meses=num_meses
+    )
+    return resumo_para_dict(resumir_simulacao(simulacao), 0, setor, num_caminhos)
@@ -0,0 +1,187 @@
+"""
+Perfis de Setor - Registro único do que o sistema sabe sobre cada setor
+
+Nome, prazos default (DSO/DPO), benchmarks de mercado, estratégias,
+referências do plano personalizado e premissas da simulação Monte Carlo
+ficam em um arquivo de dados
+(app/data/perfis_setor.json), compilado uma vez por processo em uma
+tabela imutável indexada por SetorEnum: cada requisição faz uma única
+consulta O(1).
+
+- Campos ausentes em um setor herdam da seção "padrao" do arquivo, que
+  também responde por setores desconhecidos.
+- O arquivo é verificado de PERFIS_SETOR_INTERVALO_S em
+  PERFIS_SETOR_INTERVALO_S; se mudou, a tabela nova é compilada inteira
+  e trocada de uma vez (quem está no meio de uma requisição continua com
+  a anterior). Arquivo inválido é recusado e a tabela atual continua.
+- A versão do arquivo entra na versão do cache de resultados.
+"""
+import asyncio
+import json
+import os
+from types import MappingProxyType
+from typing import Dict, Mapping, NamedTuple, Tuple
+
+from app.core.config import settings
+from app.models.schemas import SetorEnum
+
+
+ARQUIVO_PADRAO = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "perfis_setor.json")
+
+# Campos obrigatórios de cada seção (depois de herdar do "padrao")
+CAMPOS_PRAZOS = ("dso", "dpo")
+CAMPOS_BENCHMARKS = ("liquidez_corrente", "margem_liquida", "endividamento_geral", "ciclo_caixa", "giro_estoque")
+CAMPOS_REFERENCIAS_PLANO = ("margem_bruta", "pmr", "pmp", "ciclo_financeiro", "liquidez")
+CAMPOS_MONTE_CARLO = (
+    "crescimento_medio", "volatilidade_crescimento", "volatilidade_margem", "choque_dso_dias", "choque_dpo_dias"
+)
+
+
+class PerfilSetor(NamedTuple):
+    """Perfil compilado de um setor (imutável)"""
+    setor: str
+    nome: str
+    prazos: Mapping[str, int]
+    benchmarks: Mapping[str, float]
+    estrategias: Tuple[str, ...]
+    referencias_plano: Mapping[str, float]
+    monte_carlo: Mapping[str, float]
+
+
+class TabelaPerfis(NamedTuple):
+    """Versão + perfis: trocada inteira na recarga"""
+    versao: str
+    perfis: Mapping[str, PerfilSetor]
+    padrao: PerfilSetor
+    mtime: float
+
+
+def _secao(dados: Dict, padrao: Dict, nome: str, campos: Tuple[str, ...], setor: str) -> Mapping:
+    """Seção do setor sobre a do padrão, conferindo os campos obrigatórios"""
+    secao = {**padrao.get(nome, {}), **dados.get(nome, {})}
+    faltando = [campo for campo in campos if not isinstance(secao.get(campo), (int, float))]
+    if faltando:
+        raise ValueError(f"Perfil '{setor}': {nome} sem {', '.join(faltando)}")
+    return MappingProxyType(secao)
+
+
+def compilar_perfil(setor: str, dados: Dict, padrao: Dict) -> PerfilSetor:
+    """Perfil de um setor a partir do JSON (campos ausentes vêm do padrão)"""
+    estrategias = dados.get("estrategias", padrao.get("estrategias"))
+    if not estrategias:
+        raise ValueError(f"Perfil '{setor}': sem estratégias")
+    return PerfilSetor(
+        setor=setor,
+        nome=dados.get("nome") or padrao["nome"],
+        prazos=_secao(dados, padrao, "prazos", CAMPOS_PRAZOS, setor),
+        benchmarks=_secao(dados, padrao, "benchmarks", CAMPOS_BENCHMARKS, setor),
+        estrategias=tuple(estrategias),
+        referencias_plano=_secao(dados, padrao, "referencias_plano", CAMPOS_REFERENCIAS_PLANO, setor),
+        monte_carlo=_secao(dados, padrao, "monte_carlo", CAMPOS_MONTE_CARLO, setor),
+    )
+
+
+def compilar_tabela(conteudo: Dict, mtime: float = 0.0) -> TabelaPerfis:
+    """
+    Tabela completa a partir do JSON
+
+    Raises:
+        ValueError: versão ausente, setor do SetorEnum sem perfil ou campo obrigatório faltando
+    """
+    versao = conteudo.get("versao")
+    if not versao:
+        raise ValueError("Arquivo de perfis sem 'versao'")
+    padrao = conteudo.get("padrao", {})
+    setores = conteudo.get("setores", {})
+
+    faltando = [setor.value for setor in SetorEnum if setor.value not in setores]
+    if faltando:
+        raise ValueError(f"Setores sem perfil: {', '.join(faltando)}")
+
+    perfis = {setor: compilar_perfil(setor, dados, padrao) for setor, dados in setores.items()}
+    return TabelaPerfis(
+        versao=str(versao),
+        perfis=MappingProxyType(perfis),
+        padrao=compilar_perfil("padrao", padrao, padrao),
+        mtime=mtime,
+    )
+
+
+class RegistroPerfis:
+    """Tabela de perfis em uso no processo, com recarga a quente"""
+
+    def __init__(self, caminho: str = settings.PERFIS_SETOR_ARQUIVO or ARQUIVO_PADRAO,
+                 intervalo_s: float = settings.PERFIS_SETOR_INTERVALO_S):
+        self.caminho = caminho
+        self.intervalo = intervalo_s
+        self._tarefa = None
+        self.recargas = 0
+        self._tabela = self._ler()  # Arquivo inválido no startup = erro (não há tabela anterior)
+
+    def _ler(self) -> TabelaPerfis:
+        mtime = os.path.getmtime(self.caminho)
+        with open(self.caminho, encoding="utf-8") as arquivo:
+            return compilar_tabela(json.load(arquivo), mtime)
+
+    # ----- consulta -----
+
+    @property
+    def versao(self) -> str:
+        return self._tabela.versao
+
+    def perfil(self, setor) -> PerfilSetor:
+        """Perfil do setor (SetorEnum ou valor; desconhecido = perfil padrão)"""
+        tabela = self._tabela
+        perfil = tabela.perfis.get(setor)
+        if perfil is None and isinstance(setor, str):
+            perfil = tabela.perfis.get(setor.lower())
+        return perfil or tabela.padrao
+
+    # ----- recarga -----
+
+    def recarregar(self, forcar: bool = False) -> bool:
+        """
+        Recompila a tabela se o arquivo mudou (ou sempre, com forcar)
+
+        Returns:
+            True se a tabela foi trocada
+        """
+        try:
+            if not forcar and os.path.getmtime(self.caminho) == self._tabela.mtime:
+                return False
+            nova = self._ler()
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Perfis de setor não recarregados (mantida versão {self.versao}): {e}")
+            return False
+
+        self._tabela = nova  # Troca atômica: uma única atribuição
+        self.recargas += 1
+        print(f"✅ Perfis de setor recarregados (versão {nova.versao})")
+        return True
+
+    async def iniciar(self):
+        """Dispara a verificação periódica do arquivo (startup da API)"""
+        if self._tarefa is None or self._tarefa.done():
+            self._tarefa = asyncio.create_task(self._executar())
+
+    async def encerrar(self):
+        if self._tarefa is not None:
+            self._tarefa.cancel()
+            self._tarefa = None
+
+    async def _executar(self):
+        while True:
+            await asyncio.sleep(self.intervalo)
+            self.recarregar()
+
+    def estatisticas(self) -> Dict:
+        return {
+            "versao": self.versao,
+            "setores": len(self._tabela.perfis),
+            "recargas": self.recargas,
+            "arquivo": self.caminho
+        }
+
+
+# Instância única (por worker)
+perfis_setor = RegistroPerfis()
@@ -1,19 +1,265 @@
 # backend/app/services/plano_acao_generator.py
+"""
+Plano de ação 30-60-90 com IA
+
+- gerar_plano: síncrono, via SDK (cliente compartilhado, com timeout).
+  Bloqueia a thread: não chame de dentro de uma rota async.
+- gerar_plano_async: para rotas async. Chama a API de mensagens por um
+  pool de conexões HTTP (httpx), com:
+  - orçamento de tempo por plano (LLM_ORCAMENTO_S: espera de vaga + chamada)
+  - limite global de chamadas simultâneas (LLM_MAX_CONCORRENTES); quem
+    não consegue vaga dentro do orçamento recebe o fallback
+  - disjuntor: depois de LLM_DISJUNTOR_FALHAS falhas ou lentidões
+    seguidas, vai direto para o fallback por LLM_DISJUNTOR_ABERTO_S e
+    então deixa passar uma chamada de teste
+  Qualquer falha cai em _gerar_plano_fallback; nunca levanta.
 
-from typing import List, Dict
-import anthropic  # ou openai
+LLM_API_URL pode apontar para um stub local
+(benchmarks/simulador_llm.py simula respostas lentas e com erro).
+"""
+from typing import List, Dict, Optional, Tuple
+import asyncio
 import os
 import json
+import time
+
+from app.core.config import settings
+
+
+VERSAO_API = "2023-06-01"
+
+
+class Disjuntor:
+    """
+    Disjuntor (circuit breaker) das chamadas à IA
+
+    fechado: chamadas passam; falhas seguidas abrem
+    aberto: nenhuma chamada (fallback direto) até passar o tempo de espera
+    meio_aberto: uma chamada de teste; sucesso fecha, falha abre de novo
+    """
+
+    def __init__(
+        self,
+        limite_falhas: int = settings.LLM_DISJUNTOR_FALHAS,
+        limite_lento_s: float = settings.LLM_DISJUNTOR_LENTO_S,
+        aberto_s: float = settings.LLM_DISJUNTOR_ABERTO_S
+    ):
+        self.limite_falhas = limite_falhas
+        self.limite_lento = limite_lento_s
+        self.aberto_s = aberto_s
+        self.estado = "fechado"
+        self.falhas_seguidas = 0
+        self.aberto_ate = 0.0
+        self.aberturas = 0
+        self._teste_em_andamento = False
+
+    def permite(self) -> bool:
+        """A chamada pode ir para a API? (no meio_aberto, só uma por vez)"""
+        if self.estado == "fechado":
+            return True
+        if self.estado == "aberto":
+            if time.monotonic() < self.aberto_ate:
+                return False
+            self.estado = "meio_aberto"
+        if self._teste_em_andamento:
+            return False
+        self._teste_em_andamento = True
+        return True
+
+    def liberar(self, abertura: Optional[int] = None):
+        """Chamada liberada sem resultado (sem vaga no limite ou cancelada): não conta nem como sucesso nem como falha"""
+        if abertura is not None and abertura != self.aberturas:
+            return
+        self._teste_em_andamento = False
+
+    def registrar(self, sucesso: bool, duracao_s: float, abertura: Optional[int] = None):
+        """
+        Resultado de uma chamada liberada por permite(); resposta lenta conta como falha
+
+        abertura: valor de `aberturas` quando a chamada foi liberada. Chamada
+        liberada antes da última abertura (lenta, terminou com o disjuntor já
+        aberto) é ignorada: não fecha o disjuntor nem conta falha nova.
+        """
+        if abertura is not None and abertura != self.aberturas:
+            return
+        self._teste_em_andamento = False
+        if sucesso and duracao_s <= self.limite_lento:
+            self.estado = "fechado"
+            self.falhas_seguidas = 0
+            return
+
+        self.falhas_seguidas += 1
+        if self.estado == "meio_aberto" or self.falhas_seguidas >= self.limite_falhas:
+            if self.estado != "aberto":
+                self.aberturas += 1
+                print(f"⚠️ Disjuntor da IA aberto por {self.aberto_s:.0f}s ({self.falhas_seguidas} falhas seguidas)")
+            self.estado = "aberto"
+            self.aberto_ate = time.monotonic() + self.aberto_s
+
+
+class ClienteLLM:
+    """
+    Chamadas assíncronas à API de mensagens com pool de conexões e limite de concorrência
+
+    O pool e o semáforo são criados na primeira chamada, dentro do event
+    loop que vai usá-los; encerrar() fecha o pool (shutdown da API).
+    """
+
+    def __init__(
+        self,
+        url: str = settings.LLM_API_URL,
+        orcamento_s: float = settings.LLM_ORCAMENTO_S,
+        max_concorrentes: int = settings.LLM_MAX_CONCORRENTES,
+        disjuntor: Optional[Disjuntor] = None,
+        transport=None
+    ):
+        self.url = url
+        self.orcamento = orcamento_s
+        self.max_concorrentes = max_concorrentes
+        self.disjuntor = disjuntor or Disjuntor()
+        self.transport = transport  # httpx.AsyncBaseTransport falso nos testes; None = rede
+        self._http = None
+        self._vagas = None
+
+        self.chamadas = 0
+        self.falhas = 0
+        self.estouros = 0
+        self.sem_vaga = 0
+        self.recusadas = 0
+        self.em_andamento = 0
+
+    def _abrir(self):
+        # Import tardio: httpx só é carregado quando a IA é usada
+        import httpx
+
+        self._http = httpx.AsyncClient(
+            base_url=self.url,
+            headers={
+                "x-api-key": os.getenv("ANTHROPIC_API_KEY", ""),
+                "anthropic-version": VERSAO_API,
+                "content-type": "application/json"
+            },
+            timeout=httpx.Timeout(self.orcamento, connect=settings.LLM_CONEXAO_TIMEOUT_S),
+            limits=httpx.Limits(
+                max_connections=self.max_concorrentes,
+                max_keepalive_connections=self.max_concorrentes
+            ),
+            transport=self.transport
+        )
+        self._vagas = asyncio.Semaphore(self.max_concorrentes)
+
+    async def encerrar(self):
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+            self._vagas = None
+
+    async def gerar_texto(self, prompt: str) -> Optional[str]:
+        """
+        Texto da resposta da IA, ou None (disjuntor aberto, erro ou orçamento estourado)
+        """
+        if not self.disjuntor.permite():
+            self.recusadas += 1
+            return None
+        abertura = self.disjuntor.aberturas  # Resultado só vale se o disjuntor não abrir no meio
+        if self._http is None:
+            self._abrir()
+
+        self.chamadas += 1
+        na_api = []  # Preenchido quando a chamada consegue vaga e sai para a API
+        try:
+            texto, duracao = await asyncio.wait_for(self._chamar(prompt, na_api), timeout=self.orcamento)
+        except asyncio.TimeoutError:
+            if not na_api:
+                # Orçamento gasto na fila do limite de concorrência: sobrecarga local, não da API
+                self.sem_vaga += 1
+                self.disjuntor.liberar(abertura)
+                return None
+            self.estouros += 1
+            self.disjuntor.registrar(False, self.orcamento, abertura)
+            print(f"⚠️ IA não respondeu em {self.orcamento:.0f}s, usando fallback")
+            return None
+        except asyncio.CancelledError:
+            # Requisição cancelada (cliente desconectou): não diz nada sobre a API, mesmo
+            # que a chamada já tenha saído; só devolve a vaga de teste do disjuntor
+            self.disjuntor.liberar(abertura)
+            raise
+        except Exception as e:
+            self.falhas += 1
+            self.disjuntor.registrar(False, 0.0, abertura)
+            print(f"Erro ao gerar plano com IA: {e}")
+            return None
+
+        self.disjuntor.registrar(True, duracao, abertura)
+        return texto
+
+    async def _chamar(self, prompt: str, na_api: list) -> Tuple[str, float]:
+        """(texto, duração da chamada HTTP); a espera por vaga não conta como lentidão da API"""
+        async with self._vagas:
+            na_api.append(True)
+            self.em_andamento += 1
+            inicio = time.monotonic()
+            try:
+                resposta = await self._http.post("/v1/messages", json={
+                    "model": settings.LLM_MODELO,
+                    "max_tokens": 2000,
+                    "temperature": 0.7,
+                    "messages": [{"role": "user", "content": prompt}]
+                })
+            finally:
+                self.em_andamento -= 1
+            duracao = time.monotonic() - inicio
+        resposta.raise_for_status()
+        return resposta.json()["content"][0]["text"], duracao
+
+    def estatisticas(self) -> Dict:
+        return {
+            "disjuntor": self.disjuntor.estado,
+            "aberturas": self.disjuntor.aberturas,
+            "chamadas": self.chamadas,
+            "falhas": self.falhas,
+            "estouros_orcamento": self.estouros,
+            "sem_vaga": self.sem_vaga,
+            "recusadas_disjuntor": self.recusadas,
+            "em_andamento": self.em_andamento
+        }
+
+
+# Instância única (por worker): pool, limite de concorrência e disjuntor compartilhados
+cliente_llm = ClienteLLM()
+
+# Cliente do SDK compartilhado pelo caminho síncrono (reaproveita as conexões)
+_cliente_sdk = None
+
+
+def obter_cliente_sdk():
+    global _cliente_sdk
+    if _cliente_sdk is None:
+        # Import tardio: o SDK só é carregado quando um plano com IA é pedido
+        import anthropic  # ou openai
+
+        # Use Anthropic (Claude) ou OpenAI (GPT)
+        _cliente_sdk = anthropic.Anthropic(
+            api_key=os.getenv("ANTHROPIC_API_KEY"),
+            base_url=settings.LLM_API_URL,
+            timeout=settings.LLM_ORCAMENTO_S,
+            max_retries=0  # Sem novas tentativas: o orçamento vale para o plano inteiro
+        )
+        # ou: openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"), timeout=settings.LLM_ORCAMENTO_S)
+    return _cliente_sdk
+
 
 class PlanoAcaoGenerator:
     """
     Gera plano de ação 30-60-90 dias baseado nos indicadores financeiros
     """
     
-    def __init__(self):
-        # Use Anthropic (Claude) ou OpenAI (GPT)
-        self.client = anthropic.Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
-        # ou: self.client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    def __init__(self, cliente: Optional[ClienteLLM] = None):
+        self.cliente = cliente or cliente_llm
+    
+    @property
+    def client(self):
+        return obter_cliente_sdk()
     
     def gerar_plano(
         self, 
@@ -22,14 +268,78 @@ class PlanoAcaoGenerator:
         oportunidades: List[Dict]
     ) -> Dict[str, List[Dict]]:
         """
-        Gera plano de ação personalizado baseado nos indicadores
+        Gera plano de ação personalizado baseado nos indicadores (bloqueante)
         """
-        
+        prompt = self._montar_prompt(indicadores, diagnostico, oportunidades)
+
+        try:
+            # SDK e chave só são exigidos aqui: sem eles, cai no fallback
+            client = self.client
+            
+            # Chamar API (Claude ou GPT)
+            response = client.messages.create(
+                model=settings.LLM_MODELO,
+                max_tokens=2000,
+                temperature=0.7,
+                messages=[
+                    {"role": "user", "content": prompt}
+                ]
+            )
+            
+            return self._interpretar_resposta(response.content[0].text)
+            
+        except Exception as e:
+            print(f"Erro ao gerar plano com IA: {e}")
+            # Fallback para plano padrão
+            return self._gerar_plano_fallback(indicadores)
+    
+    async def gerar_plano_async(
+        self,
+        indicadores: Dict,
+        diagnostico: List[str],
+        oportunidades: List[Dict]
+    ) -> Dict[str, List[Dict]]:
+        """
+        Gera plano de ação personalizado sem bloquear o event loop
+
+        Respeita o orçamento de tempo, o limite de concorrência e o
+        disjuntor do cliente; em qualquer falha devolve o plano padrão.
+        """
+        plano = await self.gerar_plano_ia_async(indicadores, diagnostico, oportunidades)
+        return plano if plano is not None else self._gerar_plano_fallback(indicadores)
+    
+    async def gerar_plano_ia_async(
+        self,
+        indicadores: Dict,
+        diagnostico: List[str],
+        oportunidades: List[Dict]
+    ) -> Optional[Dict[str, List[Dict]]]:
+        """
+        Plano gerado pela IA, ou None (disjuntor aberto, erro, orçamento
+        estourado ou resposta inválida): quem chama escolhe o fallback
+        """
+        prompt = self._montar_prompt(indicadores, diagnostico, oportunidades)
+        texto = await self.cliente.gerar_texto(prompt)
+        if texto is None:
+            return None
+        try:
+            return self._interpretar_resposta(texto)
+        except Exception as e:
+            print(f"Resposta da IA inválida: {e}")
+            return None
+    
+    def _montar_prompt(
+        self,
+        indicadores: Dict,
+        diagnostico: List[str],
+        oportunidades: List[Dict]
+    ) -> str:
+        """Prompt completo (contexto + instruções de formato)"""
         # Montar contexto com os dados financeiros
         contexto = self._montar_contexto(indicadores, diagnostico, oportunidades)
         
         # Prompt estruturado
-        prompt = f"""Você é um consultor financeiro especializado em PMEs brasileiras.
+        return f"""Você é um consultor financeiro especializado em PMEs brasileiras.
 
 Baseado nos dados financeiros abaixo, gere um plano de ação 30-60-90 dias PERSONALIZADO:
 
@@ -64,31 +374,12 @@ FOCO POR PERÍODO:
 - 90 dias: Crescimento, estratégia, investimentos
 
 RETORNE APENAS O JSON, sem explicações adicionais."""
-
-        try:
-            # Chamar API (Claude ou GPT)
-            response = self.client.messages.create(
-                model="claude-3-5-sonnet-20241022",
-                max_tokens=2000,
-                temperature=0.7,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ]
-            )
-            
-            # Extrair JSON da resposta
-            texto_resposta = response.content[0].text
-            plano = json.loads(texto_resposta)
-            
-            # Validar estrutura
-            self._validar_plano(plano)
-            
-            return plano
-            
-        except Exception as e:
-            print(f"Erro ao gerar plano com IA: {e}")
-            # Fallback para plano padrão
-            return self._gerar_plano_fallback(indicadores)
+    
+    def _interpretar_resposta(self, texto_resposta: str) -> Dict[str, List[Dict]]:
+        """JSON da resposta, validado (levanta ValueError se inválido)"""
+        plano = json.loads(texto_resposta)
+        self._validar_plano(plano)
+        return plano
     
     def _montar_contexto(
         self, 
@@ -255,4 +546,16 @@ def gerar_plano_acao_inteligente(
     Wrapper para facilitar uso no endpoint
     """
     generator = PlanoAcaoGenerator()
-    return generator.gerar_plano(indicadores, diagnostico, oportunidades)
\ No newline at end of file
+    return generator.gerar_plano(indicadores, diagnostico, oportunidades)
+
+
+async def gerar_plano_acao_inteligente_async(
+    indicadores: Dict,
+    diagnostico: List[str],
+    oportunidades: List[Dict]
+) -> Dict[str, List[Dict]]:
+    """
+    Versão para rotas async (não bloqueia; orçamento, limite e disjuntor do cliente_llm)
+    """
+    generator = PlanoAcaoGenerator()
+    return await generator.gerar_plano_async(indicadores, diagnostico, oportunidades)
\ No newline at end of file
@@ -4,6 +4,46 @@ Analisa indicadores reais e gera recomendações específicas SEM usar IA
 """
 from typing import Dict, List
 from app.services.formatadores import formatar_moeda_br, formatar_numero_br
+from app.services.benchmarks_populacao import benchmarks_populacao
+from app.services.perfis_setor import perfis_setor
+
+
+# Benchmarks por setor já montados, válidos enquanto as versões (perfis, população) não mudam
+_benchmarks_por_setor: Dict = {}
+_versao_benchmarks = None
+
+
+def benchmarks_do_plano(setor) -> Dict:
+    """Benchmarks médios do setor usados pelo plano (dict compartilhado: não alterar)"""
+    global _versao_benchmarks
+    versao = (perfis_setor.versao, benchmarks_populacao.versao)
+    if versao != _versao_benchmarks:
+        _benchmarks_por_setor.clear()
+        _versao_benchmarks = versao
+    benchmarks = _benchmarks_por_setor.get(setor)
+    if benchmarks is None:
+        benchmarks = _benchmarks_por_setor[setor] = _montar_benchmarks(setor)
+    return benchmarks
+
+
+def _montar_benchmarks(setor) -> Dict:
+    # Referências do perfil do setor (estimativas de mercado)
+    benchmarks_padrao = dict(perfis_setor.perfil(setor).referencias_plano)
+
+    # Medianas reais do setor substituem as estimativas (quando publicadas)
+    populacao = {
+        "margem_bruta": "margem_bruta",
+        "pmr": "dso",
+        "pmp": "dpo",
+        "ciclo_financeiro": "ciclo_financeiro",
+        "liquidez": "liquidez_imediata"
+    }
+    for chave, indicador in populacao.items():
+        mediana = benchmarks_populacao.mediana(setor, indicador)
+        if mediana is not None:
+            benchmarks_padrao[chave] = mediana
+
+    return benchmarks_padrao
 
 
 class GeradorPlanoPersonalizado:
@@ -43,39 +83,8 @@ class GeradorPlanoPersonalizado:
         self.benchmarks = self._get_benchmarks_setor()
     
     def _get_benchmarks_setor(self) -> Dict:
-        """Retorna benchmarks médios do setor"""
-        benchmarks_padrao = {
-            "margem_bruta": 35.0,
-            "pmr": 35,
-            "pmp": 45,
-            "ciclo_financeiro": 25,
-            "liquidez": 1.5
-        }
-        
-        # Ajustes por setor
-        if "comercio" in self.setor or "varejo" in self.setor:
-            benchmarks_padrao.update({
-                "margem_bruta": 30.0,
-                "pmr": 30,
-                "pmp": 45,
-                "ciclo_financeiro": 15
-            })
-        elif "transformacao" in self.setor or "industria" in self.setor:
-            benchmarks_padrao.update({
-                "margem_bruta": 40.0,
-                "pmr": 45,
-                "pmp": 60,
-                "ciclo_financeiro": 30
-            })
-        elif "servicos" in self.setor:
-            benchmarks_padrao.update({
-                "margem_bruta": 50.0,
-                "pmr": 30,
-                "pmp": 30,
-                "ciclo_financeiro": 10
-            })
-        
-        return benchmarks_padrao
+        """Retorna benchmarks médios do setor (montados uma vez por setor e versão)"""
+        return benchmarks_do_plano(self.setor)
     
     def gerar_plano_completo(self) -> Dict[str, List[Dict]]:
         """Gera plano completo 30-60-90 dias personalizado"""
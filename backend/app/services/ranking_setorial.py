@@ -0,0 +1,308 @@
+"""
+Ranking Setorial - Percentil de cada KPI entre empresas do mesmo setor
+
+Para cada setor × KPI mantém um esboço de quantis (histograma em escala
+logarítmica, no estilo DDSketch): erro relativo de ~1% no valor, memória
+fixa qualquer que seja o número de análises, e dois esboços se juntam
+somando as contagens (mesclável entre workers).
+
+- As análises gravadas pela fila de gravação entram no esboço na hora.
+- De RANKING_SNAPSHOT_INTERVALO_S em RANKING_SNAPSHOT_INTERVALO_S, cada
+  worker soma no banco (tabela esbocos_setor) o que recebeu desde o último
+  snapshot e recarrega o total, que inclui o dos outros workers.
+- No startup o snapshot é carregado: o worker já sobe com o ranking.
+
+A consulta do percentil é O(1): índice do bucket por fórmula + soma
+acumulada (recalculada só quando o esboço muda).
+"""
+import asyncio
+import math
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.models.database import AsyncSessionLocal
+from app.models.esboco_setor import EsbocoSetor
+
+
+# KPIs ranqueados (colunas de ResumoAnalise / chaves de calcular_resumo)
+KPIS_RANKING = (
+    "margem_bruta",
+    "resultado_operacional",
+    "folego_caixa",
+    "liquidez_imediata",
+    "ciclo_financeiro",
+    "alavancagem",
+    "roa",
+    "roe",
+)
+
+# Grade de buckets: mudar estes valores invalida os snapshots gravados
+PRECISAO_RELATIVA = 0.01
+VALOR_MINIMO = 1e-4  # |valor| menor que isto cai no bucket do zero
+VALOR_MAXIMO = 1e10  # |valor| maior satura no último bucket
+
+_GAMMA = (1 + PRECISAO_RELATIVA) / (1 - PRECISAO_RELATIVA)
+_LOG_GAMMA = math.log(_GAMMA)
+_BUCKETS_POR_SINAL = math.ceil(math.log(VALOR_MAXIMO / VALOR_MINIMO) / _LOG_GAMMA)
+_CENTRO = _BUCKETS_POR_SINAL  # Bucket do zero; negativos à esquerda, positivos à direita
+NUM_BUCKETS = 2 * _BUCKETS_POR_SINAL + 1
+
+
+def indice_bucket(valor: float) -> int:
+    """Bucket do valor (ordem dos buckets = ordem dos valores)"""
+    modulo = abs(valor)
+    if modulo < VALOR_MINIMO:
+        return _CENTRO
+    passo = min(_BUCKETS_POR_SINAL, max(1, math.ceil(math.log(modulo / VALOR_MINIMO) / _LOG_GAMMA)))
+    return _CENTRO + passo if valor > 0 else _CENTRO - passo
+
+
+def valor_bucket(indice: int) -> float:
+    """Valor representativo do bucket (meio do intervalo, em escala log)"""
+    passo = indice - _CENTRO
+    if passo == 0:
+        return 0.0
+    modulo = VALOR_MINIMO * _GAMMA ** (abs(passo) - 0.5)
+    return modulo if passo > 0 else -modulo
+
+
+class EsbocoQuantis:
+    """Histograma de buckets logarítmicos de um KPI (mesclável, memória fixa)"""
+
+    def __init__(self):
+        self.contagens = np.zeros(NUM_BUCKETS, dtype=np.int64)
+        self.total = 0
+        self._acumulado = None  # Soma acumulada, refeita na próxima consulta após mudança
+
+    def adicionar(self, valor: float):
+        self.contagens[indice_bucket(valor)] += 1
+        self.total += 1
+        self._acumulado = None
+
+    def mesclar(self, outro: "EsbocoQuantis"):
+        self.contagens += outro.contagens
+        self.total += outro.total
+        self._acumulado = None
+
+    def percentil(self, valor: float) -> Optional[float]:
+        """Percentual (0-100) das amostras com valor menor (empates contam pela metade)"""
+        if self.total == 0:
+            return None
+        if self._acumulado is None:
+            self._acumulado = np.cumsum(self.contagens)
+        indice = indice_bucket(valor)
+        abaixo = self._acumulado[indice] - self.contagens[indice] / 2
+        return float(abaixo / self.total * 100)
+
+    def quantil(self, q: float) -> Optional[float]:
+        """Valor aproximado do quantil q (0 a 1)"""
+        if self.total == 0:
+            return None
+        if self._acumulado is None:
+            self._acumulado = np.cumsum(self.contagens)
+        indice = int(np.searchsorted(self._acumulado, q * self.total, side="left"))
+        return valor_bucket(min(indice, NUM_BUCKETS - 1))
+
+    def para_dict(self) -> Dict[str, int]:
+        """Contagens esparsas (só buckets não vazios), para o snapshot"""
+        indices = np.flatnonzero(self.contagens)
+        return {str(i): int(self.contagens[i]) for i in indices}
+
+    @classmethod
+    def de_dict(cls, contagens: Dict[str, int]) -> "EsbocoQuantis":
+        esboco = cls()
+        for indice, contagem in contagens.items():
+            esboco.contagens[int(indice)] = contagem
+        esboco.total = int(esboco.contagens.sum())
+        return esboco
+
+
+def chave_setor(setor) -> str:
+    """Setor como texto (aceita o SetorEnum)"""
+    return getattr(setor, "value", setor)
+
+
+def _insert_do_dialeto(dialeto: str):
+    """insert com on_conflict_do_nothing (PostgreSQL em produção, SQLite local)"""
+    if dialeto == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+
+class RankingSetorial:
+    """Esboços por setor × KPI: consulta, atualização e snapshot no banco"""
+
+    def __init__(self, session_factory=AsyncSessionLocal, intervalo_s: float = settings.RANKING_SNAPSHOT_INTERVALO_S):
+        self.session_factory = session_factory
+        self.intervalo = intervalo_s
+        self._lock = threading.Lock()  # Consultas também rodam no threadpool (lote/NDJSON)
+        self._esbocos: Dict[Tuple[str, str], EsbocoQuantis] = {}  # Snapshot + recebidos
+        self._pendentes: Dict[Tuple[str, str], EsbocoQuantis] = {}  # Recebidos desde o snapshot
+        self._tarefa = None
+        self.snapshots = 0
+
+    # ----- consulta -----
+
+    def posicoes(self, setor, resumo: Dict[str, Optional[float]]) -> Dict[str, Dict]:
+        """
+        Posição de cada KPI do resumo entre as empresas do setor
+
+        Returns:
+            {kpi: {"valor", "percentil", "amostras"}} - percentil None com
+            menos de RANKING_MINIMO_AMOSTRAS empresas no setor
+        """
+        setor = chave_setor(setor)
+        posicoes = {}
+        with self._lock:
+            for kpi in KPIS_RANKING:
+                valor = resumo.get(kpi)
+                if valor is None:
+                    continue
+                esboco = self._esbocos.get((setor, kpi))
+                amostras = esboco.total if esboco else 0
+                percentil = esboco.percentil(valor) if amostras >= settings.RANKING_MINIMO_AMOSTRAS else None
+                posicoes[kpi] = {
+                    "valor": valor,
+                    "percentil": round(percentil, 1) if percentil is not None else None,
+                    "amostras": amostras
+                }
+        return posicoes
+
+    def quantis(self, setor, quantis: Iterable[float] = (0.1, 0.25, 0.5, 0.75, 0.9)) -> Dict[str, Dict]:
+        """Quantis de cada KPI do setor (ex: mediana do setor)"""
+        setor = chave_setor(setor)
+        quantis = tuple(quantis)
+        resultado = {}
+        with self._lock:
+            for kpi in KPIS_RANKING:
+                esboco = self._esbocos.get((setor, kpi))
+                if esboco is None or esboco.total == 0:
+                    continue
+                resultado[kpi] = {
+                    "amostras": esboco.total,
+                    **{f"p{round(q * 100)}": round(esboco.quantil(q), 2) for q in quantis}
+                }
+        return resultado
+
+    # ----- atualização -----
+
+    def adicionar(self, setor, resumo: Dict[str, Optional[float]]):
+        """Inclui os KPIs de uma análise no ranking do setor"""
+        setor = chave_setor(setor)
+        with self._lock:
+            for kpi in KPIS_RANKING:
+                valor = resumo.get(kpi)
+                if valor is None:
+                    continue
+                chave = (setor, kpi)
+                self._esbocos.setdefault(chave, EsbocoQuantis()).adicionar(valor)
+                self._pendentes.setdefault(chave, EsbocoQuantis()).adicionar(valor)
+
+    def adicionar_registros(self, registros: List):
+        """Inclui as análises gravadas (AnalysisRecord com resumo)"""
+        for registro in registros:
+            resumo = registro.resumo
+            if resumo is not None:
+                self.adicionar(registro.setor, {kpi: getattr(resumo, kpi) for kpi in KPIS_RANKING})
+
+    # ----- snapshot -----
+
+    async def carregar(self):
+        """Carrega o snapshot do banco (mantém o que chegou e ainda não foi gravado)"""
+        async with self.session_factory() as db:
+            linhas = (await db.execute(select(EsbocoSetor))).scalars().all()
+            self._substituir(linhas)
+
+    async def gravar_snapshot(self):
+        """Soma no banco o que este worker recebeu e recarrega o total de todos"""
+        with self._lock:
+            enviando, self._pendentes = self._pendentes, {}
+
+        if not enviando:
+            await self.carregar()
+            return
+
+        try:
+            async with self.session_factory() as db:
+                async with db.begin():
+                    # Cria vazias as linhas novas; se outro worker criar a mesma
+                    # ao mesmo tempo, a dele fica e esta inserção é ignorada
+                    insert = _insert_do_dialeto(db.get_bind().dialect.name)
+                    await db.execute(
+                        insert(EsbocoSetor)
+                        .values([
+                            {"setor": setor, "kpi": kpi, "total": 0, "contagens": {}}
+                            for setor, kpi in enviando
+                        ])
+                        .on_conflict_do_nothing(index_elements=["setor", "kpi"])
+                    )
+                    # Trava as linhas: dois workers não somam ao mesmo tempo
+                    linhas = {
+                        (linha.setor, linha.kpi): linha
+                        for linha in (await db.execute(select(EsbocoSetor).with_for_update())).scalars().all()
+                    }
+                    for chave, esboco in enviando.items():
+                        linha = linhas[chave]
+                        somado = EsbocoQuantis.de_dict(linha.contagens)
+                        somado.mesclar(esboco)
+                        linha.contagens = somado.para_dict()
+                        linha.total = somado.total
+                self._substituir(linhas.values())
+        except Exception:
+            # Devolve para a próxima tentativa (nada se perde)
+            with self._lock:
+                for chave, esboco in enviando.items():
+                    self._pendentes.setdefault(chave, EsbocoQuantis()).mesclar(esboco)
+            raise
+
+        self.snapshots += 1
+
+    def _substituir(self, linhas: Iterable[EsbocoSetor]):
+        """Esboços = snapshot do banco + o que ainda não foi gravado"""
+        esbocos = {(linha.setor, linha.kpi): EsbocoQuantis.de_dict(linha.contagens) for linha in linhas}
+        with self._lock:
+            for chave, esboco in self._pendentes.items():
+                esbocos.setdefault(chave, EsbocoQuantis()).mesclar(esboco)
+            self._esbocos = esbocos
+
+    async def iniciar(self):
+        """Dispara a gravação periódica do snapshot (startup da API)"""
+        if self._tarefa is None or self._tarefa.done():
+            self._tarefa = asyncio.create_task(self._executar())
+
+    async def encerrar(self):
+        """Para a tarefa periódica e grava o que faltar (shutdown da API)"""
+        if self._tarefa is not None:
+            self._tarefa.cancel()
+            self._tarefa = None
+        try:
+            await self.gravar_snapshot()
+        except Exception as e:
+            print(f"⚠️ Erro ao gravar snapshot do ranking setorial: {e}")
+
+    async def _executar(self):
+        while True:
+            await asyncio.sleep(self.intervalo)
+            try:
+                await self.gravar_snapshot()
+            except Exception as e:
+                print(f"⚠️ Erro ao gravar snapshot do ranking setorial: {e}")
+
+    def estatisticas(self) -> Dict:
+        with self._lock:
+            return {
+                "esbocos": len(self._esbocos),
+                "pendentes": sum(e.total for e in self._pendentes.values()),
+                "snapshots": self.snapshots,
+                "memoria_bytes": len(self._esbocos) * NUM_BUCKETS * 8
+            }
+
+
+# Instância única (por worker)
+ranking_setorial = RankingSetorial()
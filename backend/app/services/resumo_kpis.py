@@ -0,0 +1,90 @@
+"""
+Resumo de KPIs - Linha de ResumoAnalise a partir dos dados de uma análise
+
+Calcula os KPIs principais (margem, resultado, fôlego, liquidez, ciclo,
+alavancagem, ROA e ROE) com as mesmas fórmulas e regras de
+processar_analise, a partir de dados_financeiros (níveis já com defaults).
+Usado ao criar o registro e no backfill (scripts/preencher_resumos.py).
+"""
+from typing import Dict, Optional
+
+from app.models.analysis_record import AnalysisRecord, ResumoAnalise
+from app.services.financial_calc import (
+    VERSAO_CALCULO,
+    calcular_margem_bruta,
+    calcular_resultado_operacional,
+    calcular_liquidez_imediata,
+    calcular_folego_caixa,
+    calcular_dio,
+    calcular_ciclo_operacional,
+    calcular_ciclo_financeiro,
+    calcular_ncg_estimada,
+    calcular_alavancagem,
+    calcular_roa,
+    calcular_roe,
+)
+
+
+def calcular_resumo(dados_financeiros: Dict) -> Dict[str, Optional[float]]:
+    """
+    KPIs principais de uma análise
+
+    Args:
+        dados_financeiros: {"nivel1", "nivel2", "nivel3"} como gravado em AnalysisRecord
+            (nível não processado = None ou {})
+    """
+    n1 = dados_financeiros["nivel1"]
+    n2 = dados_financeiros.get("nivel2") or {}
+    n3 = dados_financeiros.get("nivel3") or {}
+
+    receita = n1["receita_bruta_mensal"]
+    custo = n1["custo_vendas_mensal"]
+    resultado = calcular_resultado_operacional(receita, custo, n1["despesas_fixas_mensais"])
+    disponibilidades = n1["caixa"] + n1["conta_corrente"]
+
+    resumo = {
+        "margem_bruta": calcular_margem_bruta(receita, custo),
+        "resultado_operacional": resultado,
+        "folego_caixa": calcular_folego_caixa(
+            disponibilidades, n1["contas_a_receber_30d"], n1["contas_a_pagar_30d"], n1["despesas_fixas_mensais"]
+        ),
+        "liquidez_imediata": calcular_liquidez_imediata(disponibilidades, n1["contas_a_pagar_30d"]),
+        "ciclo_financeiro": None,
+        "alavancagem": None,
+        "roa": None,
+        "roe": None,
+    }
+
+    ncg = 0
+    if n2:
+        dio = calcular_dio(n2["estoque_custo"], custo)
+        ciclo_op = calcular_ciclo_operacional(dio, n2["prazo_medio_recebimento_dias"])
+        resumo["ciclo_financeiro"] = calcular_ciclo_financeiro(ciclo_op, n2["prazo_medio_pagamento_dias"])
+        resumo["alavancagem"] = calcular_alavancagem(n2["dividas_totais"], receita)
+        ncg = calcular_ncg_estimada(n2["estoque_custo"], n1["contas_a_receber_30d"], n1["contas_a_pagar_30d"])
+
+    if n3:
+        # Mesmas regras do nível 3 em processar_analise
+        ativos_totais = n3["imobilizado"] + ncg
+        if ativos_totais > 0:
+            resumo["roa"] = calcular_roa(resultado, ativos_totais)
+        if n3["patrimonio_liquido"] > 0:
+            resumo["roe"] = calcular_roe(
+                resultado,
+                n2.get("despesas_financeiras_mensais", 0),
+                n2.get("impostos_mensais", 0),
+                n3["patrimonio_liquido"]
+            )
+
+    return resumo
+
+
+def criar_resumo(registro: AnalysisRecord) -> ResumoAnalise:
+    """ResumoAnalise do registro (created_at precisa estar preenchido)"""
+    return ResumoAnalise(
+        email=registro.email,
+        setor=registro.setor,
+        created_at=registro.created_at,
+        versao_calculo=VERSAO_CALCULO,
+        **calcular_resumo(registro.dados_financeiros)
+    )
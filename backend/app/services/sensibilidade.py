@@ -0,0 +1,130 @@
+"""
+Análise de Sensibilidade (tornado)
+
+Mostra quais entradas mais mexem nos KPIs: cada variável dos níveis 1 e 2
+é reduzida e aumentada em X%, uma de cada vez, e os KPIs são recalculados.
+
+Em vez de rodar o pipeline 2 × N vezes, monta uma coluna por cenário
+(base + reduções + aumentos) e calcula tudo em uma única passada com
+as fórmulas de financial_calc_vetorizado.
+"""
+from typing import Dict, Optional
+
+import numpy as np
+
+from app.services.financial_calc_vetorizado import (
+    para_array,
+    calcular_kpis_nivel1,
+    calcular_dio,
+    calcular_ciclo_operacional,
+    calcular_ciclo_financeiro,
+)
+
+
+# Variáveis perturbadas: (chave, nível, campo de entrada, rótulo)
+VARIAVEIS = (
+    ("receita", "nivel1", "receita_bruta_mensal", "Receita"),
+    ("custo", "nivel1", "custo_vendas_mensal", "Custo das vendas"),
+    ("despesas_fixas", "nivel1", "despesas_fixas_mensais", "Despesas fixas"),
+    ("dso", "nivel2", "prazo_medio_recebimento_dias", "Prazo de recebimento (DSO)"),
+    ("dpo", "nivel2", "prazo_medio_pagamento_dias", "Prazo de pagamento (DPO)"),
+    ("estoque", "nivel2", "estoque_custo", "Estoque"),
+)
+
+# KPIs do tornado: (chave em kpis, nome, formato)
+KPIS_TORNADO = (
+    ("resultado_operacional", "Resultado Operacional", "moeda"),
+    ("folego_caixa", "Fôlego de Caixa", "dias"),
+    ("ciclo_financeiro", "Ciclo Financeiro", "dias"),
+)
+
+
+# Campos de entrada usados nos KPIs do tornado
+CAMPOS_NIVEL1 = (
+    "receita_bruta_mensal", "custo_vendas_mensal", "despesas_fixas_mensais",
+    "caixa", "conta_corrente", "contas_a_receber_30d", "contas_a_pagar_30d",
+)
+CAMPOS_NIVEL2 = ("prazo_medio_recebimento_dias", "prazo_medio_pagamento_dias", "estoque_custo")
+
+
+def montar_cenarios(dados_n1: Dict, dados_n2: Dict, variacao: float) -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    Colunas de entrada com 1 + 2 × len(VARIAVEIS) cenários
+
+    Ordem: base, depois (redução, aumento) de cada variável em VARIAVEIS.
+    """
+    num_cenarios = 1 + 2 * len(VARIAVEIS)
+    colunas = {
+        "nivel1": {campo: np.full(num_cenarios, float(dados_n1.get(campo) or 0)) for campo in CAMPOS_NIVEL1},
+        "nivel2": {campo: np.full(num_cenarios, float(dados_n2.get(campo) or 0)) for campo in CAMPOS_NIVEL2},
+    }
+
+    for i, (_, nivel, campo, _) in enumerate(VARIAVEIS):
+        colunas[nivel][campo][1 + 2 * i] *= 1 - variacao
+        colunas[nivel][campo][2 + 2 * i] *= 1 + variacao
+
+    return colunas
+
+
+def calcular_kpis_cenarios(colunas: Dict[str, Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+    """KPIs do tornado para todos os cenários de uma vez"""
+    dados_n1, dados_n2 = colunas["nivel1"], colunas["nivel2"]
+    kpis = calcular_kpis_nivel1(dados_n1)
+
+    dio = calcular_dio(dados_n2["estoque_custo"], dados_n1["custo_vendas_mensal"])
+    ciclo_op = calcular_ciclo_operacional(dio, dados_n2["prazo_medio_recebimento_dias"])
+    kpis["ciclo_financeiro"] = calcular_ciclo_financeiro(ciclo_op, dados_n2["prazo_medio_pagamento_dias"])
+
+    return kpis
+
+
+def _valor(numero) -> Optional[float]:
+    """Converte para float do JSON (NaN vira None, como nas funções escalares)"""
+    numero = float(numero)
+    return None if np.isnan(numero) else round(numero, 2)
+
+
+def analisar_sensibilidade(dados_n1: Dict, dados_n2: Dict, variacao_percentual: float = 10) -> Dict:
+    """
+    Dados do gráfico de tornado para cada KPI de KPIS_TORNADO
+
+    Args:
+        dados_n1: Nível 1 com defaults aplicados
+        dados_n2: Nível 2 com defaults aplicados
+        variacao_percentual: perturbação aplicada a cada variável (± X%)
+
+    Returns:
+        {"variacao_percentual", "kpis": [{kpi, nome, formato, valor_base, barras}]},
+        barras ordenadas da maior para a menor amplitude
+    """
+    variacao = variacao_percentual / 100
+    kpis = calcular_kpis_cenarios(montar_cenarios(dados_n1, dados_n2, variacao))
+
+    tornados = []
+    for chave, nome, formato in KPIS_TORNADO:
+        valores = para_array(kpis[chave])
+        base = valores[0]
+        barras = []
+        for i, (variavel, _, _, rotulo) in enumerate(VARIAVEIS):
+            reducao, aumento = valores[1 + 2 * i], valores[2 + 2 * i]
+            amplitude = abs(aumento - reducao)
+            barras.append({
+                "variavel": variavel,
+                "rotulo": rotulo,
+                "valor_reducao": _valor(reducao),
+                "valor_aumento": _valor(aumento),
+                "impacto_reducao": _valor(reducao - base),
+                "impacto_aumento": _valor(aumento - base),
+                "amplitude": 0.0 if np.isnan(amplitude) else round(float(amplitude), 2),
+            })
+        barras.sort(key=lambda barra: barra["amplitude"], reverse=True)
+
+        tornados.append({
+            "kpi": chave,
+            "nome": nome,
+            "formato": formato,
+            "valor_base": _valor(base),
+            "barras": barras,
+        })
+
+    return {"variacao_percentual": variacao_percentual, "kpis": tornados}
@@ -0,0 +1,152 @@
+"""
+Sessão de Análise - Reaproveita os níveis já calculados
+
+O frontend envia o nível 1, depois 1 + 2 e por fim 1 + 2 + 3. A primeira
+resposta traz um token_sessao; nas próximas requisições o cliente devolve
+o token e os níveis cujos dados não mudaram (mesma assinatura) não são
+recalculados: KPIs e ResultadoNivel vêm da sessão.
+
+O armazenamento é trocável: em memória (um processo) ou Redis (vários
+workers do uvicorn). Os dados são guardados como JSON nos dois casos,
+então o comportamento é o mesmo. A interface é async: o Redis usa o
+cliente redis.asyncio e não bloqueia o event loop.
+"""
+from abc import ABC, abstractmethod
+import hashlib
+import json
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.services.cache_resultados import versao_atual
+
+
+class ArmazemSessoes(ABC):
+    """Interface dos armazenamentos de sessão (token -> JSON)"""
+
+    @abstractmethod
+    async def ler(self, token: str) -> Optional[str]:
+        """JSON da sessão ou None (desconhecida ou expirada)"""
+
+    @abstractmethod
+    async def escrever(self, token: str, valor: str):
+        """Grava a sessão, renovando o TTL"""
+
+    async def encerrar(self):
+        """Libera conexões (shutdown da API)"""
+
+
+class ArmazemSessoesMemoria(ArmazemSessoes):
+    """Sessões no próprio processo, com LRU e TTL"""
+
+    def __init__(
+        self,
+        max_sessoes: int = settings.SESSAO_MAX_ITENS,
+        ttl_s: float = settings.SESSAO_TTL_S
+    ):
+        self.max_sessoes = max_sessoes
+        self.ttl = ttl_s
+        # token -> (expira_em, json)
+        self._itens: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def ler(self, token: str) -> Optional[str]:
+        with self._lock:
+            item = self._itens.get(token)
+            if item is None:
+                return None
+
+            expira_em, valor = item
+            if expira_em < time.monotonic():
+                del self._itens[token]
+                return None
+
+            self._itens.move_to_end(token)
+            return valor
+
+    async def escrever(self, token: str, valor: str):
+        with self._lock:
+            self._itens[token] = (time.monotonic() + self.ttl, valor)
+            self._itens.move_to_end(token)
+
+            while len(self._itens) > self.max_sessoes:
+                self._itens.popitem(last=False)
+
+
+class ArmazemSessoesRedis(ArmazemSessoes):
+    """Sessões no Redis, compartilhadas entre workers (expiração pelo próprio Redis)"""
+
+    PREFIXO = "leme:sessao:"
+
+    def __init__(self, url: str = settings.REDIS_URL, ttl_s: float = settings.SESSAO_TTL_S):
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise RuntimeError("SESSAO_ARMAZEM=redis exige o pacote 'redis' instalado")
+
+        self.ttl = int(ttl_s)
+        # Pool de conexões async: as chamadas não bloqueiam o event loop
+        self._cliente = redis.Redis.from_url(url)
+
+    async def ler(self, token: str) -> Optional[str]:
+        valor = await self._cliente.get(self.PREFIXO + token)
+        return valor.decode() if valor is not None else None
+
+    async def escrever(self, token: str, valor: str):
+        await self._cliente.setex(self.PREFIXO + token, self.ttl, valor)
+
+    async def encerrar(self):
+        await self._cliente.aclose()
+
+
+def criar_armazem(tipo: str = settings.SESSAO_ARMAZEM) -> ArmazemSessoes:
+    """Cria o armazenamento configurado ("memoria" ou "redis")"""
+    if tipo == "memoria":
+        return ArmazemSessoesMemoria()
+    if tipo == "redis":
+        return ArmazemSessoesRedis()
+    raise ValueError(f"SESSAO_ARMAZEM inválido: {tipo}")
+
+
+def assinatura_nivel(setor: str, entrada: Dict[str, Any], anterior: str = "") -> str:
+    """
+    Hash dos dados de entrada de um nível, encadeado com o do nível anterior
+
+    Se a assinatura bate com a da sessão, o nível pode ser reaproveitado.
+    Inclui a mesma versão da chave do cache (cálculos, perfis de setor e
+    benchmarks): se ela muda, os níveis da sessão são recalculados.
+    """
+    canonico = json.dumps([versao_atual(), setor, anterior, entrada], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonico.encode()).hexdigest()
+
+
+class SessoesAnalise:
+    """Sessões de análise progressiva sobre um ArmazemSessoes"""
+
+    def __init__(self, armazem: ArmazemSessoes):
+        self.armazem = armazem
+
+    @staticmethod
+    def novo_token() -> str:
+        return secrets.token_urlsafe(24)
+
+    async def obter(self, token: Optional[str]) -> Optional[Dict]:
+        """Dados da sessão ou None (token ausente, desconhecido ou expirado)"""
+        if not token:
+            return None
+
+        valor = await self.armazem.ler(token)
+        return json.loads(valor) if valor is not None else None
+
+    async def guardar(self, token: str, sessao: Dict):
+        await self.armazem.escrever(token, json.dumps(sessao))
+
+    async def encerrar(self):
+        await self.armazem.encerrar()
+
+
+# Instância única usada pelas rotas
+sessoes_analise = SessoesAnalise(criar_armazem())
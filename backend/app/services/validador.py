@@ -3,31 +3,8 @@ Validador - Aplica defaults e valida dados
 """
 from typing import Dict, List, Tuple
 
-
-# Defaults de prazo por setor (DSO, DPO em dias)
-DEFAULTS_PRAZOS = {
-    "agricultura": {"dso": 45, "dpo": 30},
-    "pecuaria": {"dso": 45, "dpo": 30},
-    "extrativas": {"dso": 60, "dpo": 45},
-    "transformacao": {"dso": 45, "dpo": 35},
-    "eletricidade_gas": {"dso": 30, "dpo": 30},
-    "agua_residuos": {"dso": 30, "dpo": 30},
-    "construcao": {"dso": 60, "dpo": 45},
-    "comercio_veiculos": {"dso": 30, "dpo": 30},
-    "transporte": {"dso": 30, "dpo": 20},
-    "alojamento_alimentacao": {"dso": 15, "dpo": 20},
-    "informacao_comunicacao": {"dso": 20, "dpo": 15},
-    "financeiras": {"dso": 30, "dpo": 15},
-    "imobiliarias": {"dso": 45, "dpo": 30},
-    "profissionais": {"dso": 20, "dpo": 15},
-    "administrativas": {"dso": 30, "dpo": 20},
-    "administracao_publica": {"dso": 60, "dpo": 30},
-    "educacao": {"dso": 30, "dpo": 20},
-    "saude": {"dso": 30, "dpo": 20},
-    "artes_cultura": {"dso": 30, "dpo": 20},
-    "outras_atividades": {"dso": 30, "dpo": 20},
-    "servicos_domesticos": {"dso": 15, "dpo": 10},
-}
+from app.services.benchmarks_populacao import benchmarks_populacao
+from app.services.perfis_setor import perfis_setor
 
 
 def aplicar_defaults_nivel1(dados: dict, setor: str) -> Tuple[dict, List[str]]:
@@ -72,17 +49,21 @@ def aplicar_defaults_nivel2(dados: dict, setor: str) -> Tuple[dict, List[str]]:
     """
     assumptions = []
     
-    # Busca defaults específicos do setor (já está em lowercase)
-    default_setor = DEFAULTS_PRAZOS.get(setor, {"dso": 30, "dpo": 30})
+    # Mediana das empresas do setor, se publicada; senão o perfil do setor
+    default_setor = benchmarks_populacao.prazos(setor)
+    origem = "mediana das empresas do setor"
+    if default_setor is None:
+        default_setor = perfis_setor.perfil(setor).prazos
+        origem = "padrão para o setor"
     
     # Prazos médios por setor
     if dados.get("prazo_medio_recebimento_dias") is None:
         dados["prazo_medio_recebimento_dias"] = default_setor["dso"]
-        assumptions.append(f"DSO estimado em {default_setor['dso']} dias (padrão para o setor)")
+        assumptions.append(f"DSO estimado em {default_setor['dso']} dias ({origem})")
     
     if dados.get("prazo_medio_pagamento_dias") is None:
         dados["prazo_medio_pagamento_dias"] = default_setor["dpo"]
-        assumptions.append(f"DPO estimado em {default_setor['dpo']} dias (padrão para o setor)")
+        assumptions.append(f"DPO estimado em {default_setor['dpo']} dias ({origem})")
     
     # Outros campos opcionais
     if dados.get("estoque_custo") is None:
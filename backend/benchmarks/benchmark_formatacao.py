@@ -0,0 +1,57 @@
+"""
+Benchmark - Formatação de números no padrão brasileiro
+
+Mede ns por valor dos formatadores de app.services.formatadores contra a
+implementação anterior (milhares montados dígito a dígito): referência,
+escalar novo e lote (coluna inteira). A saída idêntica, byte a byte, é
+conferida em tests/test_formatadores.py, de onde vem a referência.
+
+Uso (dentro de backend/):
+    python -m benchmarks.benchmark_formatacao [--valores 200000] [--rodadas 5]
+"""
+import argparse
+import math
+import time
+
+from app.services.formatadores import (
+    formatar_moeda_br,
+    formatar_numero_br,
+    formatar_moedas_br,
+    formatar_numeros_br,
+)
+from tests.test_formatadores import gerar_valores, referencia_moeda_br, referencia_numero_br
+
+
+def medir(funcao, rodadas: int, quantidade: int) -> float:
+    """Melhor tempo entre as rodadas, em ns por valor"""
+    melhor = math.inf
+    for _ in range(rodadas):
+        inicio = time.perf_counter()
+        funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor / quantidade * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--valores", type=int, default=200_000)
+    parser.add_argument("--rodadas", type=int, default=5)
+    args = parser.parse_args()
+
+    valores = gerar_valores(args.valores)
+
+    casos = (
+        ("moeda", referencia_moeda_br, formatar_moeda_br, formatar_moedas_br),
+        ("número", referencia_numero_br, formatar_numero_br, formatar_numeros_br),
+    )
+    print(f"\n{'':<8} {'anterior':>12} {'escalar':>12} {'lote':>12}   (ns por valor, {args.valores} valores)")
+    for nome, referencia, escalar, lote in casos:
+        tempo_referencia = medir(lambda: [referencia(v) for v in valores], args.rodadas, len(valores))
+        tempo_escalar = medir(lambda: [escalar(v) for v in valores], args.rodadas, len(valores))
+        tempo_lote = medir(lambda: lote(valores), args.rodadas, len(valores))
+        print(f"{nome:<8} {tempo_referencia:>12.0f} {tempo_escalar:>12.0f} {tempo_lote:>12.0f}   "
+              f"({tempo_referencia / tempo_escalar:.1f}x escalar, {tempo_referencia / tempo_lote:.1f}x lote)")
+
+
+if __name__ == "__main__":
+    main()
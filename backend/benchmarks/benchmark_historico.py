@@ -0,0 +1,122 @@
+"""
+Benchmark - Leitura do histórico com e sem projeção de colunas
+
+Cria um banco SQLite temporário com N análises de um mesmo email (com
+dados_financeiros reais, gerados pelo pipeline) e mede tempo e pico de
+memória para buscar as linhas:
+- antes: entidades completas, incluindo o JSON dados_financeiros
+- depois: só as colunas da listagem (COLUNAS_LISTAGEM)
+- depois, uma página: colunas da listagem com LIMIT (keyset)
+
+Uso (dentro de backend/):
+    python -m benchmarks.benchmark_historico [--registros 10000] [--rodadas 5]
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker, undefer
+
+from app.core.config import settings
+from app.models.analysis_record import AnalysisRecord
+from app.models.database import Base, OPCOES_JSON
+from app.routes.analise import COLUNAS_LISTAGEM, executar_analise
+from benchmarks.benchmark_serializacao import gerar_requisicoes
+
+EMAIL = "contador@exemplo.com.br"
+
+
+def popular_banco(session_factory, quantidade: int):
+    """Grava `quantidade` análises do mesmo email (dados de 200 análises distintas)"""
+    documentos = []
+    for request in gerar_requisicoes(200):
+        _, dados_niveis = executar_analise(request)
+        documentos.append({**dados_niveis, "meta": request.meta.model_dump(mode="json")})
+
+    inicio = datetime(2024, 1, 1)
+    with session_factory() as db:
+        db.add_all([
+            AnalysisRecord(
+                email=EMAIL,
+                empresa=f"Empresa {i}",
+                dados_financeiros=documentos[i % len(documentos)],
+                setor=documentos[i % len(documentos)]["meta"]["setor"],
+                periodo_referencia="2024-01",
+                created_at=inicio + timedelta(minutes=i)
+            )
+            for i in range(quantidade)
+        ])
+        db.commit()
+
+
+def medir(session_factory, consulta, rodadas: int, entidades: bool) -> dict:
+    """Melhor tempo (ms) e pico de memória (MiB) para buscar todas as linhas da consulta"""
+    def buscar():
+        with session_factory() as db:
+            resultado = db.execute(consulta)
+            linhas = resultado.scalars().all() if entidades else resultado.all()
+            return len(linhas)
+
+    tempos = []
+    for _ in range(rodadas):
+        inicio = time.perf_counter()
+        quantidade = buscar()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+
+    tracemalloc.start()
+    buscar()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"linhas": quantidade, "ms": min(tempos), "mib": pico / 1024 / 1024}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--registros", type=int, default=10_000)
+    parser.add_argument("--rodadas", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        engine = create_engine(f"sqlite:///{os.path.join(pasta, 'historico.db')}", **OPCOES_JSON)
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(bind=engine)
+
+        popular_banco(session_factory, args.registros)
+
+        ordem = (AnalysisRecord.created_at.desc(), AnalysisRecord.id.desc())
+        cenarios = [
+            (
+                "antes: entidades completas",
+                select(AnalysisRecord)
+                .options(undefer(AnalysisRecord.dados_financeiros))
+                .where(AnalysisRecord.email == EMAIL).order_by(*ordem),
+                True
+            ),
+            (
+                "depois: colunas da listagem",
+                select(*COLUNAS_LISTAGEM).where(AnalysisRecord.email == EMAIL).order_by(*ordem),
+                False
+            ),
+            (
+                f"depois: uma página ({settings.HISTORICO_LIMITE_PADRAO})",
+                select(*COLUNAS_LISTAGEM).where(AnalysisRecord.email == EMAIL).order_by(*ordem)
+                .limit(settings.HISTORICO_LIMITE_PADRAO + 1),
+                False
+            ),
+        ]
+
+        print(f"Histórico de um email com {args.registros} análises:")
+        for nome, consulta, entidades in cenarios:
+            medida = medir(session_factory, consulta, args.rodadas, entidades)
+            print(f"  {nome:<32} {medida['linhas']:>6} linhas  {medida['ms']:>9.2f} ms  {medida['mib']:>8.2f} MiB")
+
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
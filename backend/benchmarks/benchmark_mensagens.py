@@ -0,0 +1,108 @@
+"""
+Benchmark - Mensagens automáticas
+
+Gera KPIs sintéticos variados (todas as faixas de cada indicador) e mede,
+por análise, o tempo das mensagens dos níveis 1 a 3 e do diagnóstico
+final, e o de cada mensagem separadamente.
+
+Uso (dentro de backend/):
+    python -m benchmarks.benchmark_mensagens [--analises 20000] [--rodadas 5]
+"""
+import argparse
+import math
+import random
+import time
+
+from app.services.mensagens import (
+    gerar_mensagem_nivel1,
+    gerar_mensagem_nivel2,
+    gerar_mensagem_nivel3,
+    gerar_diagnostico_final,
+)
+
+
+def gerar_kpis(quantidade: int, semente: int = 42) -> list:
+    """(kpis_n1, kpis_n2, kpis_n3, tendencia, todos_kpis) por análise"""
+    aleatorio = random.Random(semente)
+    analises = []
+    for _ in range(quantidade):
+        n1 = {
+            "margem_bruta": aleatorio.uniform(-10, 70),
+            "resultado_operacional": aleatorio.uniform(-200_000, 500_000),
+            "ponto_equilibrio": aleatorio.choice((None, aleatorio.uniform(10_000, 900_000))),
+            "liquidez_imediata": aleatorio.uniform(0, 2.5),
+            "folego_caixa": aleatorio.uniform(-20, 120),
+            "receita_bruta": aleatorio.uniform(10_000, 1_000_000),
+            "despesas_fixas": aleatorio.uniform(5_000, 300_000),
+        }
+        n2 = {
+            "ciclo_financeiro": aleatorio.uniform(-30, 120),
+            "dso": aleatorio.uniform(0, 90),
+            "dio": aleatorio.choice((0, aleatorio.uniform(0, 90))),
+            "dpo": aleatorio.uniform(0, 90),
+            "ncg_estimada": aleatorio.uniform(-50_000, 800_000),
+            "cobertura_juros": aleatorio.choice((None, aleatorio.uniform(-2, 8))),
+            "simulacao_reducao_dso": aleatorio.uniform(-5_000, 100_000),
+            "simulacao_aumento_dpo": aleatorio.uniform(-5_000, 100_000),
+        }
+        n3 = {
+            "roa": aleatorio.choice((None, aleatorio.uniform(-10, 30))),
+            "roe": aleatorio.choice((None, aleatorio.uniform(-10, 30))),
+            "payback_capex": aleatorio.choice((None, aleatorio.uniform(0, 8))),
+        }
+        tendencia = {
+            "tendencia": aleatorio.choice(("crescimento", "queda", "estabilidade")),
+            "variacao_percentual_media": aleatorio.uniform(-20, 20),
+        }
+        todos = {"nivel1": n1, "nivel2": n2, "nivel3": {**n3, **tendencia}}
+        analises.append((n1, n2, n3, tendencia, todos))
+    return analises
+
+
+def uma_a_uma(analises: list) -> list:
+    return [
+        (
+            gerar_mensagem_nivel1(n1),
+            gerar_mensagem_nivel2(n2),
+            gerar_mensagem_nivel3(n3, tendencia),
+            gerar_diagnostico_final(todos),
+        )
+        for n1, n2, n3, tendencia, todos in analises
+    ]
+
+
+# Nome -> função de uma análise
+MENSAGENS = {
+    "nível 1": lambda a: gerar_mensagem_nivel1(a[0]),
+    "nível 2": lambda a: gerar_mensagem_nivel2(a[1]),
+    "nível 3": lambda a: gerar_mensagem_nivel3(a[2], a[3]),
+    "diagnóstico": lambda a: gerar_diagnostico_final(a[4]),
+}
+
+
+def medir(funcao, analises: list, rodadas: int) -> float:
+    """Melhor tempo entre as rodadas, em µs por análise"""
+    melhor = math.inf
+    for _ in range(rodadas):
+        inicio = time.perf_counter()
+        funcao(analises)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor / len(analises) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--analises", type=int, default=20_000)
+    parser.add_argument("--rodadas", type=int, default=5)
+    args = parser.parse_args()
+
+    analises = gerar_kpis(args.analises)
+    print(f"{args.analises} análises, melhor de {args.rodadas} rodadas")
+    print(f"   todas:       {medir(uma_a_uma, analises, args.rodadas):8.1f} µs por análise (4 mensagens)")
+    for nome, gerar in MENSAGENS.items():
+        tempo = medir(lambda lista: [gerar(a) for a in lista], analises, args.rodadas)
+        print(f"   {nome + ':':<12} {tempo:8.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark - Plano de ação 30-60-90 personalizado
+
+Gera KPIs sintéticos que passam por todas as regras (com e sem níveis 2
+e 3, todos os setores), confere que cada tipo de problema é detectado
+em alguma análise e mede, por análise, o plano gerado
+(gerar_plano_personalizado).
+
+Uso (dentro de backend/):
+    python -m benchmarks.benchmark_plano [--analises 20000] [--rodadas 5]
+"""
+import argparse
+import math
+import random
+import time
+
+from app.models.schemas import SetorEnum
+from app.services.plano_acao_personalizado import GeradorPlanoPersonalizado, gerar_plano_personalizado
+
+
+# Chaves que _identificar_problemas pode devolver
+PROBLEMAS = {
+    "liquidez_critica", "liquidez_baixa", "margem_critica", "margem_baixa", "pmr_alto", "pmr_elevado",
+    "pmp_baixo", "ciclo_longo", "folego_critico", "folego_baixo", "endividamento_alto",
+    "cobertura_juros_baixa", "resultado_negativo",
+}
+
+
+def gerar_analises(quantidade: int, semente: int = 42) -> list:
+    """(kpis, meta) por análise"""
+    aleatorio = random.Random(semente)
+    setores = list(SetorEnum)
+    analises = []
+    for _ in range(quantidade):
+        nivel1 = {
+            "margem_bruta": aleatorio.uniform(-10, 70),
+            "liquidez_imediata": aleatorio.uniform(0, 2.5),
+            "folego_caixa": aleatorio.uniform(-10, 90),
+            "resultado_operacional": aleatorio.uniform(-200_000, 500_000),
+            "receita_bruta": aleatorio.uniform(10_000, 1_000_000),
+            "despesas_fixas": aleatorio.uniform(5_000, 300_000),
+        }
+        nivel2 = aleatorio.choice((None, {
+            "dso": aleatorio.uniform(0, 120),
+            "dpo": aleatorio.uniform(0, 90),
+            "ciclo_financeiro": aleatorio.uniform(-30, 150),
+            "alavancagem": aleatorio.uniform(0, 4),
+            "cobertura_juros": aleatorio.choice((None, aleatorio.uniform(-2, 6))),
+        }))
+        nivel3 = aleatorio.choice((None, {"payback_capex": aleatorio.choice((None, aleatorio.uniform(0, 40)))}))
+        kpis = {"nivel1": nivel1, "nivel2": nivel2, "nivel3": nivel3}
+        analises.append((kpis, {"setor": aleatorio.choice(setores)}))
+    return analises
+
+
+def uma_a_uma(analises: list) -> list:
+    return [gerar_plano_personalizado(kpis, meta) for kpis, meta in analises]
+
+
+def medir(funcao, analises: list, rodadas: int) -> float:
+    """Melhor tempo entre as rodadas, em µs por análise"""
+    melhor = math.inf
+    for _ in range(rodadas):
+        inicio = time.perf_counter()
+        funcao(analises)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor / len(analises) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--analises", type=int, default=20_000)
+    parser.add_argument("--rodadas", type=int, default=5)
+    args = parser.parse_args()
+
+    analises = gerar_analises(args.analises)
+    detectados = set()
+    for kpis, meta in analises:
+        detectados.update(GeradorPlanoPersonalizado(kpis, meta)._identificar_problemas())
+    faltando = PROBLEMAS - detectados
+    assert not faltando, f"Problemas nunca detectados: {', '.join(sorted(faltando))}"
+    print(f"✅ Todos os {len(detectados)} tipos de problema detectados")
+
+    print(f"   {medir(uma_a_uma, analises, args.rodadas):8.1f} µs por análise ({args.analises} análises)")
+
+
+if __name__ == "__main__":
+    main()
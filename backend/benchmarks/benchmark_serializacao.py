@@ -0,0 +1,143 @@
+"""
+Benchmark - Montagem e serialização de AnaliseResponse
+
+Mede, para um conjunto fixo de requisições sintéticas (níveis 1 a 3):
+- CPU por requisição de executar_analise + model_dump_json
+- memória alocada (pico do tracemalloc) por requisição
+- serialização da coluna dados_financeiros: json padrão x orjson
+
+Uso (dentro de backend/):
+    python -m benchmarks.benchmark_serializacao [--requisicoes 500] [--rodadas 5]
+
+Para comparar duas versões do código, rode o script em cada uma com os
+mesmos parâmetros (as requisições são geradas com semente fixa).
+"""
+import argparse
+import json
+import random
+import time
+import tracemalloc
+
+from app.core.serializacao import para_json_str
+from app.models.schemas import AnaliseRequest, SetorEnum
+from app.routes.analise import executar_analise
+
+
+def gerar_requisicoes(quantidade: int, semente: int = 42) -> list:
+    """Requisições válidas e variadas (nível máximo entre 1 e 3)"""
+    aleatorio = random.Random(semente)
+    setores = [s.value for s in SetorEnum]
+    requisicoes = []
+
+    for _ in range(quantidade):
+        nivel = aleatorio.randint(1, 3)
+        receita = aleatorio.uniform(10_000, 500_000)
+        dados = {
+            "meta": {
+                "setor": aleatorio.choice(setores),
+                "estado": "SP",
+                "mes": aleatorio.randint(1, 12),
+                "ano": 2025,
+                "nivel_maximo_preenchido": nivel
+            },
+            "nivel1": {
+                "receita_bruta_mensal": receita,
+                "custo_vendas_mensal": receita * aleatorio.uniform(0.3, 0.8),
+                "despesas_fixas_mensais": receita * aleatorio.uniform(0.1, 0.4),
+                "caixa": aleatorio.uniform(0, 50_000),
+                "conta_corrente": aleatorio.uniform(0, 200_000),
+                "contas_a_receber_30d": receita * aleatorio.uniform(0, 0.6),
+                "contas_a_pagar_30d": receita * aleatorio.uniform(0, 0.5)
+            }
+        }
+        if nivel >= 2:
+            dados["nivel2"] = {
+                "prazo_medio_recebimento_dias": aleatorio.uniform(0, 90),
+                "prazo_medio_pagamento_dias": aleatorio.uniform(0, 90),
+                "estoque_custo": receita * aleatorio.uniform(0, 1),
+                "dividas_totais": receita * aleatorio.uniform(0, 3),
+                "despesas_financeiras_mensais": receita * aleatorio.uniform(0, 0.05),
+                "impostos_mensais": receita * aleatorio.uniform(0, 0.15),
+                "numero_funcionarios": aleatorio.randint(1, 80)
+            }
+        if nivel >= 3:
+            dados["nivel3"] = {
+                "receita_ultimos_3_meses": [receita * aleatorio.uniform(0.8, 1.2) for _ in range(3)],
+                "despesas_variaveis_percentual_receita": aleatorio.uniform(0, 20),
+                "capex_planejado_prox_6m": aleatorio.uniform(0, 100_000),
+                "imobilizado": aleatorio.uniform(0, 1_000_000),
+                "patrimonio_liquido": aleatorio.uniform(10_000, 1_000_000),
+                "meta_margem_bruta_percentual": aleatorio.uniform(20, 60)
+            }
+        requisicoes.append(AnaliseRequest(**dados))
+
+    return requisicoes
+
+
+def medir_resposta(requisicoes: list, rodadas: int) -> dict:
+    """CPU (ms) e pico de memória (KiB) por requisição do pipeline + serialização"""
+    # Aquecimento (imports tardios, caches de schema do Pydantic)
+    for request in requisicoes[:20]:
+        executar_analise(request)[0].model_dump_json()
+
+    tempos = []
+    for _ in range(rodadas):
+        inicio = time.process_time()
+        for request in requisicoes:
+            executar_analise(request)[0].model_dump_json()
+        tempos.append((time.process_time() - inicio) / len(requisicoes) * 1000)
+
+    tracemalloc.start()
+    picos = []
+    for request in requisicoes:
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        executar_analise(request)[0].model_dump_json()
+        _, pico = tracemalloc.get_traced_memory()
+        picos.append(pico - base)
+    tracemalloc.stop()
+
+    return {
+        "cpu_ms_por_requisicao": min(tempos),
+        "pico_kib_por_requisicao": sum(picos) / len(picos) / 1024
+    }
+
+
+def medir_coluna_json(requisicoes: list, rodadas: int) -> dict:
+    """Tempo (µs) para serializar dados_financeiros com json padrão e com orjson"""
+    documentos = [executar_analise(request)[1] for request in requisicoes]
+    resultado = {}
+
+    for nome, serializar in (("json", json.dumps), ("orjson", para_json_str)):
+        tempos = []
+        for _ in range(rodadas):
+            inicio = time.perf_counter()
+            for documento in documentos:
+                serializar(documento)
+            tempos.append((time.perf_counter() - inicio) / len(documentos) * 1e6)
+        resultado[nome] = min(tempos)
+
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requisicoes", type=int, default=500)
+    parser.add_argument("--rodadas", type=int, default=5)
+    args = parser.parse_args()
+
+    requisicoes = gerar_requisicoes(args.requisicoes)
+
+    resposta = medir_resposta(requisicoes, args.rodadas)
+    print(f"Resposta (executar_analise + model_dump_json), {args.requisicoes} requisições:")
+    print(f"  CPU por requisição:   {resposta['cpu_ms_por_requisicao']:.3f} ms")
+    print(f"  Pico de memória/req:  {resposta['pico_kib_por_requisicao']:.1f} KiB")
+
+    coluna = medir_coluna_json(requisicoes, args.rodadas)
+    print("Coluna dados_financeiros (por documento):")
+    print(f"  json padrão: {coluna['json']:.1f} µs")
+    print(f"  orjson:      {coluna['orjson']:.1f} µs  ({coluna['json'] / coluna['orjson']:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
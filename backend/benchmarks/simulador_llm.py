@@ -0,0 +1,204 @@
+"""
+Simulador - Plano de ação com IA contra um stub local da API de mensagens
+
+Sobe um servidor HTTP local que imita POST /v1/messages (com atraso e
+taxa de erro configuráveis) e dispara muitos gerar_plano_async
+simultâneos por um ClienteLLM apontado para ele. Cenários:
+- normal: tudo pela IA, concorrência no servidor <= limite, conexões reaproveitadas
+- lento: respostas além do orçamento viram fallback no prazo e abrem o disjuntor
+- falhando: erros 500 abrem o disjuntor; depois disso o servidor para de receber chamadas
+- recuperacao: passado o tempo aberto, uma chamada de teste fecha o disjuntor
+Em todos, mede o atraso máximo do event loop (nada pode bloquear).
+
+Uso (dentro de backend/):
+    python -m benchmarks.simulador_llm [--planos 100] [--concorrentes 8]
+"""
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app.services.plano_acao_generator import ClienteLLM, Disjuntor, PlanoAcaoGenerator
+
+
+ORCAMENTO_S = 1.0
+LENTO_S = 0.3
+LIMITE_FALHAS = 3
+ABERTO_S = 1.0
+
+
+# ============= STUB DA API =============
+
+class EstadoStub:
+    """Comportamento e contadores do stub (compartilhados entre as threads do servidor)"""
+
+    def __init__(self):
+        self.trava = threading.Lock()
+        self.atraso_s = 0.01
+        self.taxa_erro = 0.0
+        self.requisicoes = 0
+        self.conexoes = 0
+        self.simultaneas = 0
+        self.max_simultaneas = 0
+
+    def zerar(self, atraso_s: float, taxa_erro: float):
+        with self.trava:
+            self.atraso_s, self.taxa_erro = atraso_s, taxa_erro
+            self.requisicoes = self.conexoes = self.max_simultaneas = 0
+
+
+def plano_da_ia() -> str:
+    """Plano válido com títulos marcados (para distinguir do fallback)"""
+    plano = PlanoAcaoGenerator._gerar_plano_fallback(None, {})
+    for acoes in plano.values():
+        for acao in acoes:
+            acao["titulo"] = "IA: " + acao["titulo"]
+    return json.dumps(plano, ensure_ascii=False)
+
+
+def criar_stub(estado: EstadoStub) -> ThreadingHTTPServer:
+    corpo_ok = json.dumps({"content": [{"type": "text", "text": plano_da_ia()}]}).encode()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive: o pool do cliente reaproveita as conexões
+
+        def setup(self):
+            super().setup()
+            with estado.trava:
+                estado.conexoes += 1
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("content-length", 0)))
+            with estado.trava:
+                estado.requisicoes += 1
+                estado.simultaneas += 1
+                estado.max_simultaneas = max(estado.max_simultaneas, estado.simultaneas)
+                atraso, falhar = estado.atraso_s, random.random() < estado.taxa_erro
+            try:
+                time.sleep(atraso)
+                corpo, status = (b'{"error": "overloaded"}', 500) if falhar else (corpo_ok, 200)
+                self.send_response(status)
+                self.send_header("content-type", "application/json")
+                self.send_header("content-length", str(len(corpo)))
+                self.end_headers()
+                self.wfile.write(corpo)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # Cliente desistiu (orçamento estourado)
+            finally:
+                with estado.trava:
+                    estado.simultaneas -= 1
+
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    servidor.daemon_threads = True
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
+
+
+# ============= CARGA =============
+
+async def medir_atraso_loop(parar: asyncio.Event, resultado: list):
+    """Maior atraso de um tick de 10 ms (event loop bloqueado = atraso alto)"""
+    pior = 0.0
+    while not parar.is_set():
+        inicio = time.perf_counter()
+        await asyncio.sleep(0.01)
+        pior = max(pior, time.perf_counter() - inicio - 0.01)
+    resultado.append(pior)
+
+
+async def disparar(gerador: PlanoAcaoGenerator, planos: int) -> dict:
+    parar, atraso = asyncio.Event(), []
+    monitor = asyncio.create_task(medir_atraso_loop(parar, atraso))
+
+    async def um_plano():
+        inicio = time.perf_counter()
+        plano = await gerador.gerar_plano_async({"margem_bruta": 25}, ["Margem moderada"], [])
+        return plano["30_dias"][0]["titulo"].startswith("IA: "), time.perf_counter() - inicio
+
+    resultados = await asyncio.gather(*(um_plano() for _ in range(planos)))
+    parar.set()
+    await monitor
+    latencias = sorted(duracao for _, duracao in resultados)
+    return {
+        "ia": sum(ia for ia, _ in resultados),
+        "fallback": sum(not ia for ia, _ in resultados),
+        "p50_ms": latencias[len(latencias) // 2] * 1000,
+        "max_ms": latencias[-1] * 1000,
+        "atraso_loop_ms": atraso[0] * 1000,
+    }
+
+
+async def executar(planos: int, concorrentes: int):
+    estado = EstadoStub()
+    servidor = criar_stub(estado)
+    url = f"http://127.0.0.1:{servidor.server_address[1]}"
+    cliente = ClienteLLM(url=url, orcamento_s=ORCAMENTO_S, max_concorrentes=concorrentes,
+                         disjuntor=Disjuntor(LIMITE_FALHAS, LENTO_S, ABERTO_S))
+    gerador = PlanoAcaoGenerator(cliente)
+    limite_espera_ms = (ORCAMENTO_S + 0.1) * 1000
+
+    def relatorio(nome: str, r: dict):
+        print(f"{nome:<12} ia={r['ia']:>4} fallback={r['fallback']:>4} p50={r['p50_ms']:7.1f}ms "
+              f"max={r['max_ms']:7.1f}ms loop={r['atraso_loop_ms']:5.1f}ms | servidor: "
+              f"{estado.requisicoes} req, {estado.conexoes} conexões, {estado.max_simultaneas} simultâneas "
+              f"| disjuntor {cliente.disjuntor.estado}")
+
+    try:
+        await disparar(gerador, 1)  # Primeira chamada importa o httpx e abre o pool
+
+        # Normal: só IA, limite de concorrência e pool respeitados, loop livre
+        estado.zerar(atraso_s=0.01, taxa_erro=0.0)
+        r = await disparar(gerador, planos)
+        relatorio("normal", r)
+        assert r["ia"] == planos and r["atraso_loop_ms"] < 100
+        assert estado.max_simultaneas <= concorrentes and estado.conexoes <= concorrentes
+
+        # Lento: fallback dentro do orçamento; o disjuntor abre e poupa o servidor
+        estado.zerar(atraso_s=ORCAMENTO_S * 3, taxa_erro=0.0)
+        r = await disparar(gerador, planos)
+        relatorio("lento", r)
+        assert r["fallback"] == planos and r["max_ms"] <= limite_espera_ms
+        assert cliente.disjuntor.estado == "aberto" and estado.requisicoes < planos
+
+        # Falhando: com o disjuntor aberto, nenhuma chamada chega ao servidor
+        estado.zerar(atraso_s=0.01, taxa_erro=1.0)
+        r = await disparar(gerador, planos)
+        relatorio("falhando", r)
+        assert r["fallback"] == planos and estado.requisicoes == 0
+
+        # Recuperação: passado o tempo aberto, a chamada de teste falha e reabre...
+        await asyncio.sleep(ABERTO_S)
+        r = await disparar(gerador, planos)
+        relatorio("falhando+", r)
+        assert estado.requisicoes == 1 and cliente.disjuntor.estado == "aberto"
+
+        # ...e com a API de volta, a chamada de teste fecha o disjuntor
+        estado.zerar(atraso_s=0.01, taxa_erro=0.0)
+        await asyncio.sleep(ABERTO_S)
+        await disparar(gerador, 1)
+        r = await disparar(gerador, planos)
+        relatorio("recuperacao", r)
+        assert cliente.disjuntor.estado == "fechado" and r["ia"] == planos
+
+        print(f"\n✅ Todos os cenários ok ({cliente.estatisticas()})")
+    finally:
+        await cliente.encerrar()
+        servidor.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--planos", type=int, default=100)
+    parser.add_argument("--concorrentes", type=int, default=8)
+    args = parser.parse_args()
+    asyncio.run(executar(args.planos, args.concorrentes))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Tempo de importação - Relatório e orçamento do cold start do worker
+
+Importa app.main em um processo novo com `python -X importtime` e mostra
+quanto tempo cada pacote/módulo levou. Termina com código 1 (falha) se:
+- o import de app.main passar do orçamento (IMPORTACAO_ORCAMENTO_MS), ou
+- alguma dependência pesada e opcional (LLM, PDF, Excel) for carregada
+  no import; elas devem ser importadas só no caminho que as usa.
+
+Verificado no pytest por tests/test_tempo_importacao.py; este script
+mostra o relatório por pacote.
+
+Uso (dentro de backend/):
+    python -m benchmarks.tempo_importacao [--orcamento-ms 2000] [--rodadas 3] [--top 15]
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+from app.core.config import settings
+
+# Dependências opcionais que não podem ser carregadas no startup
+MODULOS_PESADOS = ("anthropic", "pdfplumber", "PyPDF2", "openpyxl")
+
+_LINHA = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def medir_importacao(modulo: str = "app.main") -> list:
+    """
+    Importa `modulo` em um processo novo e devolve as linhas do importtime
+
+    Returns:
+        lista de (nome do módulo, tempo próprio em µs, tempo acumulado em µs)
+    """
+    pasta_backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    processo = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+        cwd=pasta_backend,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+
+    medidas = []
+    for linha in processo.stderr.splitlines():
+        encontrado = _LINHA.match(linha)
+        if encontrado:
+            proprio, acumulado, _, nome = encontrado.groups()
+            medidas.append((nome, int(proprio), int(acumulado)))
+    return medidas
+
+
+def agrupar_por_pacote(medidas: list) -> dict:
+    """Soma o tempo próprio por pacote de topo (módulos do app ficam separados)"""
+    por_pacote = defaultdict(int)
+    for nome, proprio, _ in medidas:
+        chave = nome if nome.startswith("app.") else nome.split(".")[0]
+        por_pacote[chave] += proprio
+    return por_pacote
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orcamento-ms", type=float, default=settings.IMPORTACAO_ORCAMENTO_MS)
+    parser.add_argument("--rodadas", type=int, default=3, help="Usa a rodada mais rápida (menos ruído)")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    rodadas = [medir_importacao() for _ in range(args.rodadas)]
+    medidas = min(rodadas, key=lambda m: next(acumulado for nome, _, acumulado in m if nome == "app.main"))
+    total_ms = next(acumulado for nome, _, acumulado in medidas if nome == "app.main") / 1000
+
+    print(f"Import de app.main: {total_ms:.1f} ms (orçamento {args.orcamento_ms:.0f} ms)")
+    print(f"\nMais lentos por pacote (tempo próprio, top {args.top}):")
+    por_pacote = sorted(agrupar_por_pacote(medidas).items(), key=lambda item: item[1], reverse=True)
+    for nome, proprio in por_pacote[:args.top]:
+        print(f"  {proprio / 1000:>8.1f} ms  {nome}")
+
+    carregados = sorted({
+        nome.split(".")[0] for nome, _, _ in medidas if nome.split(".")[0] in MODULOS_PESADOS
+    })
+
+    falhou = False
+    if total_ms > args.orcamento_ms:
+        print(f"\n❌ Import acima do orçamento: {total_ms:.1f} ms > {args.orcamento_ms:.0f} ms")
+        falhou = True
+    if carregados:
+        print(f"\n❌ Dependências pesadas carregadas no import: {', '.join(carregados)}")
+        falhou = True
+    if not falhou:
+        print("\n✅ Dentro do orçamento")
+
+    sys.exit(1 if falhou else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Gera os benchmarks setoriais a partir das análises gravadas
+
+Percorre a tabela analises com cursor do lado do servidor (yield_per:
+no Postgres as linhas chegam em lotes, sem carregar a tabela inteira),
+acumula margem, DSO, DPO, ciclo financeiro e liquidez por setor em
+esboços de quantis (memória fixa, qualquer que seja o número de linhas)
+e publica uma versão nova da tabela benchmarks_setor. Os workers passam
+a usar a versão nova no próximo startup.
+
+Uso (dentro de backend/):
+    python -m scripts.gerar_benchmarks [--lote 5000] [--minimo 30] [--simular]
+"""
+import argparse
+import time
+
+from sqlalchemy import select
+
+from app.models.analysis_record import AnalysisRecord
+from app.models.database import Base, SessionLocal, engine
+from app.services.benchmarks_populacao import AgregadorBenchmarks, publicar
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lote", type=int, default=5000, help="Linhas lidas por vez")
+    parser.add_argument("--minimo", type=int, default=30, help="Amostras mínimas para publicar um indicador do setor")
+    parser.add_argument("--simular", action="store_true", help="Só mostra as estatísticas, sem publicar")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    inicio = time.perf_counter()
+    agregador = AgregadorBenchmarks()
+
+    with SessionLocal() as db:
+        resultado = db.execute(
+            select(AnalysisRecord.setor, AnalysisRecord.dados_financeiros)
+            .execution_options(stream_results=True, yield_per=args.lote)
+        )
+        for linha in resultado:
+            if linha.setor and linha.dados_financeiros:
+                agregador.adicionar(linha.setor, linha.dados_financeiros)
+
+    estatisticas = agregador.estatisticas(args.minimo)
+    for item in estatisticas:
+        print(f"   {item['setor']:<28} {item['indicador']:<18} n={item['amostras']:<7} "
+              f"p25={item['p25']:<10} mediana={item['mediana']:<10} p75={item['p75']}")
+
+    if args.simular:
+        print(f"ℹ️ Simulação: {len(estatisticas)} indicadores não publicados")
+        return
+
+    with SessionLocal() as db:
+        versao = publicar(db, estatisticas)
+
+    print(f"✅ Benchmarks publicados (versão {versao}): {agregador.analises} análises, "
+          f"{len(estatisticas)} indicadores, em {time.perf_counter() - inicio:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Backfill - Preenche a tabela de resumos (ResumoAnalise) das análises antigas
+
+Percorre as análises em ordem de id, em lotes, e cria o resumo das que
+ainda não têm. Com --recalcular, também refaz os resumos gravados com
+outra VERSAO_CALCULO (rode depois de mudar alguma fórmula).
+Pode ser interrompido e rodado de novo: continua de onde faltar.
+
+Uso (dentro de backend/):
+    python -m scripts.preencher_resumos [--lote 500] [--recalcular]
+"""
+import argparse
+import time
+
+from sqlalchemy import select, or_
+from sqlalchemy.orm import selectinload, undefer
+
+from app.models.analysis_record import AnalysisRecord, ResumoAnalise
+from app.models.database import Base, SessionLocal, engine
+from app.services.financial_calc import VERSAO_CALCULO
+from app.services.resumo_kpis import calcular_resumo, criar_resumo
+
+
+def consulta_pendentes(recalcular: bool, apos_id: int, lote: int):
+    """Próximo lote de análises sem resumo (ou com resumo desatualizado)"""
+    pendente = ResumoAnalise.analise_id.is_(None)
+    if recalcular:
+        pendente = or_(pendente, ResumoAnalise.versao_calculo != VERSAO_CALCULO)
+
+    return (
+        select(AnalysisRecord)
+        .outerjoin(ResumoAnalise, ResumoAnalise.analise_id == AnalysisRecord.id)
+        .options(undefer(AnalysisRecord.dados_financeiros), selectinload(AnalysisRecord.resumo))
+        .where(pendente, AnalysisRecord.id > apos_id)
+        .order_by(AnalysisRecord.id)
+        .limit(lote)
+    )
+
+
+def preencher_lote(registros: list) -> int:
+    """Cria ou atualiza o resumo de cada registro; devolve quantos falharam"""
+    falhas = 0
+    for registro in registros:
+        try:
+            if registro.resumo is None:
+                registro.resumo = criar_resumo(registro)
+            else:
+                for campo, valor in calcular_resumo(registro.dados_financeiros).items():
+                    setattr(registro.resumo, campo, valor)
+                registro.resumo.versao_calculo = VERSAO_CALCULO
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"⚠️ Análise #{registro.id} ignorada (dados incompletos): {e}")
+            falhas += 1
+    return falhas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lote", type=int, default=500)
+    parser.add_argument("--recalcular", action="store_true", help="Refaz resumos de outra VERSAO_CALCULO")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+
+    inicio = time.perf_counter()
+    processados = falhas = 0
+    ultimo_id = 0
+
+    while True:
+        with SessionLocal() as db:
+            registros = db.execute(consulta_pendentes(args.recalcular, ultimo_id, args.lote)).scalars().all()
+            if not registros:
+                break
+
+            ultimo_id = registros[-1].id
+            falhas += preencher_lote(registros)
+            db.commit()
+
+        processados += len(registros)
+        print(f"  {processados} análises processadas (até #{ultimo_id})")
+
+    print(f"✅ Backfill concluído: {processados - falhas} resumos gravados, "
+          f"{falhas} ignorados, em {time.perf_counter() - inicio:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
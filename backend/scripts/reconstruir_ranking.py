@@ -0,0 +1,56 @@
+"""
+Reconstrói o snapshot do ranking setorial a partir da tabela de resumos
+
+Lê todos os resumos (ResumoAnalise) em streaming e regrava a tabela
+esbocos_setor do zero. Útil na primeira implantação (depois de
+preencher_resumos) ou se a grade de buckets mudar. Os workers em
+execução pegam o novo snapshot no próximo ciclo.
+
+Uso (dentro de backend/):
+    python -m scripts.reconstruir_ranking [--lote 5000]
+"""
+import argparse
+import time
+
+from sqlalchemy import delete, select
+
+from app.models.analysis_record import ResumoAnalise
+from app.models.database import Base, SessionLocal, engine
+from app.models.esboco_setor import EsbocoSetor
+from app.services.ranking_setorial import KPIS_RANKING, EsbocoQuantis
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lote", type=int, default=5000, help="Linhas lidas por vez")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    inicio = time.perf_counter()
+    esbocos = {}
+    linhas = 0
+
+    colunas = [getattr(ResumoAnalise, kpi) for kpi in KPIS_RANKING]
+    with SessionLocal() as db:
+        resultado = db.execute(
+            select(ResumoAnalise.setor, *colunas).execution_options(yield_per=args.lote)
+        )
+        for linha in resultado:
+            linhas += 1
+            for kpi, valor in zip(KPIS_RANKING, linha[1:]):
+                if valor is not None and linha.setor:
+                    esbocos.setdefault((linha.setor, kpi), EsbocoQuantis()).adicionar(valor)
+
+        db.execute(delete(EsbocoSetor))
+        db.add_all([
+            EsbocoSetor(setor=setor, kpi=kpi, total=esboco.total, contagens=esboco.para_dict())
+            for (setor, kpi), esboco in esbocos.items()
+        ])
+        db.commit()
+
+    print(f"✅ Ranking reconstruído: {linhas} resumos, {len(esbocos)} esboços (setor × KPI), "
+          f"em {time.perf_counter() - inicio:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
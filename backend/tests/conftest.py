@@ -0,0 +1,45 @@
+"""
+Fixtures compartilhadas: banco SQLite temporário (antes de importar o app)
+e cliente HTTP da API
+"""
+import os
+import tempfile
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/teste.db")
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def cliente():
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app) as cliente:
+        yield cliente
+
+
+def requisicao_nivel3(**extras) -> dict:
+    """Requisição de análise com os três níveis preenchidos"""
+    return {
+        "meta": {
+            "email": "teste@empresa.com.br", "empresa": "Empresa Teste", "setor": "comercio_veiculos",
+            "estado": "SP", "mes": 5, "ano": 2025, "nivel_maximo_preenchido": 3
+        },
+        "nivel1": {
+            "receita_bruta_mensal": 100000, "custo_vendas_mensal": 60000, "despesas_fixas_mensais": 25000,
+            "caixa": 20000, "conta_corrente": 15000, "contas_a_receber_30d": 40000, "contas_a_pagar_30d": 30000
+        },
+        "nivel2": {
+            "prazo_medio_recebimento_dias": 45, "prazo_medio_pagamento_dias": 30, "estoque_custo": 50000,
+            "dividas_totais": 80000, "despesas_financeiras_mensais": 2000, "impostos_mensais": 8000,
+            "numero_funcionarios": 10
+        },
+        "nivel3": {
+            "receita_ultimos_3_meses": [90000, 95000, 100000], "aliquota_impostos_percentual": 8,
+            "despesas_variaveis_percentual_receita": 5, "capex_planejado_prox_6m": 30000,
+            "imobilizado": 120000, "patrimonio_liquido": 150000, "meta_margem_bruta_percentual": 45,
+            "meta_prazo_recebimento_dias": 30
+        },
+        **extras
+    }
@@ -0,0 +1,51 @@
+"""
+/analise/lote: cada item igual ao /analise do mesmo item; erros ficam no
+próprio item
+"""
+import copy
+
+from tests.conftest import requisicao_nivel3
+
+
+def _itens() -> list:
+    nivel3 = requisicao_nivel3()
+    nivel2 = copy.deepcopy(nivel3)
+    nivel2["meta"]["nivel_maximo_preenchido"] = 2
+    del nivel2["nivel3"]
+    nivel1 = copy.deepcopy(nivel2)
+    nivel1["meta"]["nivel_maximo_preenchido"] = 1
+    del nivel1["nivel2"]
+    prejuizo = copy.deepcopy(nivel3)
+    prejuizo["nivel1"].update(custo_vendas_mensal=95000, caixa=500, conta_corrente=0)
+    return [nivel1, nivel2, nivel3, prejuizo]
+
+
+def test_lote_igual_a_analise_item_a_item(cliente, monkeypatch):
+    # Ranking fixo: a fila de gravação atualiza os esboços entre uma chamada e outra
+    monkeypatch.setattr(
+        "app.routes.analise.ranking_setorial.posicoes",
+        lambda setor, resumo: {"margem_bruta": {"valor": resumo["margem_bruta"], "percentil": 50.0, "amostras": 10}}
+    )
+    itens = _itens()
+
+    lote = cliente.post("/api/analise/lote", json=itens).json()
+
+    assert (lote["total"], lote["sucessos"], lote["falhas"]) == (len(itens), len(itens), 0)
+    for indice, item in enumerate(itens):
+        resultado = lote["resultados"][indice]
+        individual = cliente.post("/api/analise", json=item).json()
+        individual.pop("token_sessao")
+        assert resultado["indice"] == indice and resultado["sucesso"]
+        assert resultado["resultado"] == individual
+
+
+def test_item_invalido_nao_derruba_o_lote(cliente):
+    itens = _itens()[:2]
+    itens.insert(1, {"meta": {"setor": "saude"}})
+
+    lote = cliente.post("/api/analise/lote", json=itens).json()
+
+    assert (lote["sucessos"], lote["falhas"]) == (2, 1)
+    invalido = lote["resultados"][1]
+    assert not invalido["sucesso"] and invalido["erro"].startswith("Dados inválidos - ")
+    assert "nivel1" in invalido["erro"]
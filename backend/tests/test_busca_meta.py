@@ -0,0 +1,122 @@
+"""
+Busca de meta: ida e volta (o valor encontrado, aplicado no cálculo
+escalar da análise, leva o KPI ao alvo), inversas iguais à bisseção e
+metas inalcançáveis
+"""
+import copy
+
+import numpy as np
+import pytest
+
+from app.routes.analise import calcular_kpis_nivel1, calcular_kpis_nivel2
+from app.services.busca_meta import (
+    INVERSAS,
+    KPIS_META,
+    VARIAVEIS_META,
+    aplicar_variavel,
+    calcular_kpis,
+    montar_colunas,
+    resolver_bissecao,
+    resolver_meta,
+)
+from tests.conftest import requisicao_nivel3
+
+
+def _empresas() -> list:
+    base = requisicao_nivel3()
+    sem_estoque = copy.deepcopy(base)
+    sem_estoque["nivel2"]["estoque_custo"] = 0
+    apertada = copy.deepcopy(base)
+    apertada["nivel1"].update(custo_vendas_mensal=80000, despesas_fixas_mensais=30000, caixa=2000)
+    return [
+        {"nivel1": {k: float(v) for k, v in e["nivel1"].items()}, "nivel2": e["nivel2"]}
+        for e in (base, sem_estoque, apertada)
+    ]
+
+
+def _kpis_escalares(empresa: dict, variavel: str, valor: float) -> dict:
+    """KPIs pelo caminho da análise (financial_calc escalar) com a variável trocada"""
+    n1, n2 = dict(empresa["nivel1"]), dict(empresa["nivel2"])
+    campo = VARIAVEIS_META[variavel][0]
+    if variavel == "receita":
+        n1["custo_vendas_mensal"] = valor * n1["custo_vendas_mensal"] / n1["receita_bruta_mensal"]
+    if variavel == "disponibilidades":
+        n1["caixa"], n1["conta_corrente"] = valor, 0.0
+    elif campo in n1:
+        n1[campo] = valor
+    else:
+        n2[campo] = valor
+    kpis_n1 = calcular_kpis_nivel1(n1)
+    return calcular_kpis_nivel2(n1, n2, kpis_n1)
+
+
+PARES = [(kpi, variavel) for kpi in KPIS_META for variavel in VARIAVEIS_META]
+
+
+@pytest.mark.parametrize("kpi, variavel", PARES)
+def test_ida_e_volta(kpi, variavel):
+    empresas = _empresas()
+    colunas = montar_colunas(empresas)
+    campo = VARIAVEIS_META[variavel][0]
+
+    # Alvo alcançável por construção: o KPI com a variável 30% maior
+    alvos = calcular_kpis(aplicar_variavel(colunas, variavel, colunas[campo] * 1.3))[kpi]
+    atuais = calcular_kpis(colunas)[kpi]
+
+    for i, empresa in enumerate(empresas):
+        alvo, atual = float(alvos[i]), float(atuais[i])
+        if not np.isfinite(alvo) or np.isclose(alvo, atual):
+            continue  # KPI não depende da variável para esta empresa
+        resultado = resolver_meta(colunas, kpi, variavel, alvo)[i]
+
+        assert resultado["alcancavel"], (kpi, variavel, i, resultado)
+        obtido = _kpis_escalares(empresa, variavel, resultado["valor_necessario"])[kpi]
+        # valor_necessario vem arredondado em centavos/centésimos de dia
+        assert obtido == pytest.approx(alvo, rel=1e-3, abs=0.05)
+
+
+@pytest.mark.parametrize("kpi, variavel", sorted(INVERSAS))
+def test_inversa_igual_a_bissecao(kpi, variavel):
+    colunas = montar_colunas(_empresas())
+    campo = VARIAVEIS_META[variavel][0]
+    alvos = calcular_kpis(aplicar_variavel(colunas, variavel, colunas[campo] * 0.8))[kpi]
+
+    formula = INVERSAS[(kpi, variavel)](colunas, alvos)
+    bissecao = resolver_bissecao(colunas, kpi, variavel, alvos)
+
+    finitos = np.isfinite(formula) & (formula >= 0)
+    assert finitos.any()
+    np.testing.assert_allclose(bissecao[finitos], formula[finitos], rtol=1e-6, atol=1e-6)
+
+
+def test_meta_inalcancavel_tem_motivo():
+    colunas = montar_colunas(_empresas())
+
+    resultados = resolver_meta(colunas, "margem_bruta", "custo", 120)
+
+    assert not any(r["alcancavel"] for r in resultados)
+    assert all(r["valor_necessario"] is None and "não chega a 120" in r["motivo"] for r in resultados)
+
+
+def test_kpi_ou_variavel_invalidos():
+    colunas = montar_colunas(_empresas())
+    with pytest.raises(ValueError):
+        resolver_meta(colunas, "roe", "receita", 10)
+    with pytest.raises(ValueError):
+        resolver_meta(colunas, "folego_caixa", "imposto", 10)
+
+
+def test_rota_ordena_por_empresa_e_meta(cliente):
+    metas = [
+        {"kpi": "folego_caixa", "alvo": 60, "variavel": "disponibilidades"},
+        {"kpi": "ciclo_financeiro", "alvo": 10, "variavel": "dso"},
+    ]
+    corpo = {"empresas": [requisicao_nivel3(), requisicao_nivel3()], "metas": metas}
+
+    resposta = cliente.post("/api/analise/meta", json=corpo).json()
+
+    assert resposta["total"] == 4
+    assert [(r["indice_empresa"], r["kpi"]) for r in resposta["resultados"]] == [
+        (0, "folego_caixa"), (0, "ciclo_financeiro"), (1, "folego_caixa"), (1, "ciclo_financeiro")
+    ]
+    assert cliente.post("/api/analise/meta", json={**corpo, "metas": [{**metas[0], "kpi": "roe"}]}).status_code == 400
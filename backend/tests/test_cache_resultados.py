@@ -0,0 +1,28 @@
+"""
+Cache de resultados do /analise: o corpo em cache não leva o ranking
+setorial, recalculado a cada resposta
+"""
+from app.services.cache_resultados import cache_resultados
+from tests.conftest import requisicao_nivel3
+
+
+def test_acerto_de_cache_traz_o_ranking_atual(cliente, monkeypatch):
+    amostras = [10]
+
+    def posicoes(setor, resumo):
+        return {"margem_bruta": {"valor": resumo["margem_bruta"], "percentil": 50.0, "amostras": amostras[0]}}
+
+    monkeypatch.setattr("app.routes.analise.ranking_setorial.posicoes", posicoes)
+    requisicao = requisicao_nivel3()
+    requisicao["nivel1"]["caixa"] = 12345  # Números só deste teste: a primeira é falta de cache
+
+    primeira = cliente.post("/api/analise", json=requisicao).json()
+    acertos = cache_resultados.acertos
+    amostras[0] = 11  # Uma análise do setor gravada entre as duas requisições
+    segunda = cliente.post("/api/analise", json=requisicao).json()
+
+    assert cache_resultados.acertos == acertos + 1
+    assert primeira["ranking_setor"]["margem_bruta"]["amostras"] == 10
+    assert segunda["ranking_setor"]["margem_bruta"]["amostras"] == 11
+    assert list(segunda)[-2:] == ["ranking_setor", "token_sessao"]
+    assert {**primeira, "ranking_setor": None, "token_sessao": None} == {**segunda, "ranking_setor": None, "token_sessao": None}
@@ -0,0 +1,98 @@
+"""
+Fila de gravação com um banco falso: backoff com o banco fora do ar,
+gravação um a um só para erro de dados e nenhuma regravação quando o
+ranking setorial falha depois do commit
+"""
+import asyncio
+
+import pytest
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from app.services import fila_gravacao as modulo
+from app.services.fila_gravacao import FilaGravacao
+
+
+class BancoFalso:
+    def __init__(self):
+        self.fora_do_ar = 0  # Quantos commits ainda falham por conexão
+        self.salvos = []
+        self.commits = 0
+
+    def sessao(self):
+        return SessaoFalsa(self)
+
+
+class SessaoFalsa:
+    def __init__(self, banco: BancoFalso):
+        self.banco = banco
+        self.pendentes = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    def add_all(self, registros):
+        self.pendentes = list(registros)
+
+    async def commit(self):
+        self.banco.commits += 1
+        if self.banco.fora_do_ar > 0:
+            self.banco.fora_do_ar -= 1
+            raise OperationalError("INSERT", {}, Exception("conexão recusada"))
+        if "ruim" in self.pendentes:
+            raise IntegrityError("INSERT", {}, Exception("registro inválido"))
+        self.banco.salvos += self.pendentes
+
+    async def rollback(self):
+        pass
+
+
+@pytest.fixture
+def banco(monkeypatch) -> BancoFalso:
+    monkeypatch.setattr(modulo.ranking_setorial, "adicionar_registros", lambda registros: None)
+    return BancoFalso()
+
+
+def _fila(banco: BancoFalso) -> FilaGravacao:
+    return FilaGravacao(session_factory=banco.sessao, tamanho_lote=500, intervalo_ms=5,
+                        espera_inicial_s=0.01, espera_maxima_s=0.05)
+
+
+async def _gravar(fila: FilaGravacao, registros: list, espera_s: float = 0.3):
+    await fila.iniciar()
+    await fila.enfileirar_varios(registros)
+    await asyncio.sleep(espera_s)
+    await fila.encerrar()
+
+
+def test_banco_fora_do_ar_segura_o_lote(banco):
+    banco.fora_do_ar = 4
+    fila = _fila(banco)
+    asyncio.run(_gravar(fila, list(range(300))))
+
+    assert sorted(banco.salvos) == list(range(300))
+    assert fila.banco_indisponivel == 4 and fila.falhas == 0
+    # Sem gravação um a um: só as tentativas do lote (1 ou 2 lotes)
+    assert banco.commits <= 4 + 2
+
+
+def test_erro_de_dados_isola_o_registro(banco):
+    fila = _fila(banco)
+    asyncio.run(_gravar(fila, list(range(10)) + ["ruim"] + list(range(10, 15))))
+
+    assert sorted(banco.salvos) == list(range(15))
+    assert fila.falhas == 1 and fila.banco_indisponivel == 0
+
+
+def test_falha_no_ranking_nao_regrava(banco, monkeypatch):
+    def quebrar(registros):
+        raise RuntimeError("esboço corrompido")
+
+    monkeypatch.setattr(modulo.ranking_setorial, "adicionar_registros", quebrar)
+    fila = _fila(banco)
+    asyncio.run(_gravar(fila, list(range(50))))
+
+    assert sorted(banco.salvos) == list(range(50))
+    assert fila.gravados == 50 and fila.banco_indisponivel == 0
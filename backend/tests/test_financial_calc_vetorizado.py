@@ -0,0 +1,162 @@
+"""
+Equivalência entre financial_calc_vetorizado e as funções escalares de financial_calc
+
+Entradas aleatórias (semente fixa) misturadas com casos de borda: receita,
+custo, estoque e despesas zerados, margem negativa (custo > receita) e
+margem de contribuição nula.
+"""
+import math
+
+import numpy as np
+import pytest
+
+from app.services import financial_calc as escalar
+from app.services import financial_calc_vetorizado as vetorizado
+
+
+N_EMPRESAS = 3000
+
+
+def _coluna(gerador: np.random.Generator, baixo: float, alto: float, zeros: float = 0.1) -> np.ndarray:
+    """Valores uniformes com uma fração de zeros"""
+    valores = gerador.uniform(baixo, alto, N_EMPRESAS)
+    valores[gerador.random(N_EMPRESAS) < zeros] = 0.0
+    return valores
+
+
+@pytest.fixture(scope="module")
+def empresas() -> dict:
+    gerador = np.random.default_rng(20250101)
+    receita = _coluna(gerador, 1_000, 1_000_000)
+    # Custo de 0% a 150% da receita: inclui margem zero e negativa
+    custo = receita * gerador.uniform(0, 1.5, N_EMPRESAS)
+    custo[:50] = receita[:50]  # Margem de contribuição exatamente zero
+    return {
+        "receita": receita,
+        "custo": custo,
+        "despesas_fixas": _coluna(gerador, 500, 300_000),
+        "disponibilidades": _coluna(gerador, 0, 500_000),
+        "a_receber": _coluna(gerador, 0, 400_000),
+        "a_pagar": _coluna(gerador, 0, 400_000),
+        "estoque": _coluna(gerador, 0, 600_000, zeros=0.3),
+        "dso": gerador.uniform(0, 120, N_EMPRESAS),
+        "dpo": gerador.uniform(0, 90, N_EMPRESAS),
+        "dividas": _coluna(gerador, 0, 2_000_000),
+        "despesas_financeiras": _coluna(gerador, 0, 50_000, zeros=0.3),
+        "funcionarios": gerador.integers(0, 50, N_EMPRESAS).astype(float),
+        "ativos": _coluna(gerador, 0, 5_000_000),
+        "patrimonio": gerador.uniform(-1_000_000, 3_000_000, N_EMPRESAS) * (gerador.random(N_EMPRESAS) > 0.1),
+        "impostos": _coluna(gerador, 0, 80_000),
+        "capex": _coluna(gerador, 0, 1_000_000),
+        "incremento_lucro": gerador.uniform(-200_000, 800_000, N_EMPRESAS),
+        "despesas_variaveis_percentual": gerador.uniform(0, 30, N_EMPRESAS),
+        "meta_margem": gerador.uniform(-10, 80, N_EMPRESAS),
+    }
+
+
+def _conferir(vetor: np.ndarray, esperados: list):
+    """Compara a coluna com os resultados escalares (None <-> NaN)"""
+    for i, esperado in enumerate(esperados):
+        if esperado is None:
+            assert math.isnan(vetor[i]), f"empresa {i}: esperado None, obtido {vetor[i]}"
+        else:
+            assert vetor[i] == pytest.approx(esperado, rel=1e-12, abs=1e-9), f"empresa {i}"
+
+
+# Fórmula -> (colunas de entrada)
+FORMULAS = {
+    "calcular_margem_bruta": ("receita", "custo"),
+    "calcular_resultado_operacional": ("receita", "custo", "despesas_fixas"),
+    "calcular_ponto_equilibrio": ("despesas_fixas", "receita", "custo"),
+    "calcular_liquidez_imediata": ("disponibilidades", "a_pagar"),
+    "calcular_folego_caixa": ("disponibilidades", "a_receber", "a_pagar", "despesas_fixas"),
+    "calcular_dio": ("estoque", "custo"),
+    "calcular_ncg_estimada": ("estoque", "a_receber", "a_pagar"),
+    "calcular_alavancagem": ("dividas", "receita"),
+    "calcular_cobertura_juros": ("receita", "despesas_financeiras"),
+    "calcular_produtividade": ("receita", "funcionarios"),
+    "calcular_roa": ("receita", "ativos"),
+    "calcular_roe": ("receita", "despesas_financeiras", "impostos", "patrimonio"),
+    "calcular_payback_capex": ("capex", "incremento_lucro"),
+}
+
+
+@pytest.mark.parametrize("nome", FORMULAS)
+def test_formulas_iguais_as_escalares(empresas, nome):
+    colunas = [empresas[coluna] for coluna in FORMULAS[nome]]
+    esperados = [getattr(escalar, nome)(*map(float, valores)) for valores in zip(*colunas)]
+    _conferir(getattr(vetorizado, nome)(*colunas), esperados)
+
+
+def test_ciclos_com_dio_ausente(empresas):
+    dio = vetorizado.calcular_dio(empresas["estoque"], empresas["custo"])
+    assert np.isnan(dio[empresas["estoque"] == 0]).all()
+
+    ciclo_op = vetorizado.calcular_ciclo_operacional(dio, empresas["dso"])
+    esperados_op = [
+        escalar.calcular_ciclo_operacional(escalar.calcular_dio(e, c), d)
+        for e, c, d in zip(empresas["estoque"], empresas["custo"], empresas["dso"])
+    ]
+    _conferir(ciclo_op, esperados_op)
+    _conferir(
+        vetorizado.calcular_ciclo_financeiro(ciclo_op, empresas["dpo"]),
+        [escalar.calcular_ciclo_financeiro(c, d) for c, d in zip(esperados_op, empresas["dpo"])]
+    )
+
+
+def test_simulacoes_de_prazo(empresas):
+    _conferir(
+        vetorizado.simular_reducao_dso(empresas["receita"], 10),
+        [escalar.simular_reducao_dso(r, 10) for r in empresas["receita"]]
+    )
+    _conferir(
+        vetorizado.simular_aumento_dpo(empresas["custo"], 7),
+        [escalar.simular_aumento_dpo(c, 7) for c in empresas["custo"]]
+    )
+
+
+def test_classificacoes(empresas):
+    liquidez = vetorizado.calcular_liquidez_imediata(empresas["disponibilidades"], empresas["a_pagar"])
+    assert list(vetorizado.classificar_liquidez_imediata(liquidez)) == [
+        escalar.classificar_liquidez_imediata(valor) for valor in liquidez
+    ]
+    ciclo = empresas["dso"] - empresas["dpo"]
+    assert list(vetorizado.classificar_ciclo_financeiro(ciclo)) == [
+        escalar.classificar_ciclo_financeiro(valor) for valor in ciclo
+    ]
+    cobertura = vetorizado.calcular_cobertura_juros(empresas["receita"], empresas["despesas_financeiras"])
+    assert list(vetorizado.classificar_cobertura_juros(cobertura)) == [
+        escalar.classificar_cobertura_juros(None if math.isnan(valor) else valor) for valor in cobertura
+    ]
+
+
+@pytest.mark.parametrize("num_meses", [1, 12])
+def test_projecao_igual_a_escalar(empresas, num_meses):
+    """Mesma projeção de projetar_cenarios, empresa a empresa, mês a mês"""
+    caixa_inicial = empresas["disponibilidades"] - empresas["a_pagar"]
+    projecao = vetorizado.projetar_cenarios(
+        receita_base=empresas["receita"],
+        custo_base=empresas["custo"],
+        despesas_fixas=empresas["despesas_fixas"],
+        despesas_variaveis_percentual=empresas["despesas_variaveis_percentual"],
+        impostos_mensais=empresas["impostos"],
+        despesas_financeiras=empresas["despesas_financeiras"],
+        caixa_inicial=caixa_inicial,
+        meta_margem_bruta=empresas["meta_margem"],
+        num_meses=num_meses,
+    )
+    for i in range(N_EMPRESAS):
+        esperado = escalar.projetar_cenarios(
+            receita_base=float(empresas["receita"][i]),
+            custo_base=float(empresas["custo"][i]),
+            despesas_fixas=float(empresas["despesas_fixas"][i]),
+            despesas_variaveis_percentual=float(empresas["despesas_variaveis_percentual"][i]),
+            impostos_mensais=float(empresas["impostos"][i]),
+            despesas_financeiras=float(empresas["despesas_financeiras"][i]),
+            dso_atual=float(empresas["dso"][i]),
+            dpo_atual=float(empresas["dpo"][i]),
+            caixa_inicial=float(caixa_inicial[i]),
+            meta_margem_bruta=float(empresas["meta_margem"][i]),
+            num_meses=num_meses,
+        )
+        assert vetorizado.cenarios_para_listas(projecao, i) == esperado, f"empresa {i}"
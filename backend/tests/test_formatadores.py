@@ -0,0 +1,137 @@
+"""
+Formatadores: saída idêntica, byte a byte, à implementação anterior
+(milhares montados dígito a dígito, copiada abaixo como referência)
+"""
+import math
+import random
+
+import numpy as np
+import pytest
+
+from app.services.financial_calc import formatar_moeda, formatar_numero
+from app.services.formatadores import (
+    formatar_moeda_br,
+    formatar_numero_br,
+    formatar_percentual_br,
+    formatar_moedas_br,
+    formatar_numeros_br,
+    formatar_percentuais_br,
+)
+
+
+# ============= REFERÊNCIA (IMPLEMENTAÇÃO ANTERIOR) =============
+
+def _agrupar_milhares(inteiro: str) -> str:
+    inteiro_formatado = ""
+    for i, digito in enumerate(reversed(inteiro)):
+        if i > 0 and i % 3 == 0:
+            inteiro_formatado = "." + inteiro_formatado
+        inteiro_formatado = digito + inteiro_formatado
+    return inteiro_formatado
+
+
+def referencia_moeda_br(valor: float) -> str:
+    if valor < 0:
+        sinal = "-"
+        valor = abs(valor)
+    else:
+        sinal = ""
+    partes = f"{valor:.2f}".split('.')
+    inteiro = partes[0]
+    decimal = partes[1]  # inf/nan: IndexError
+    return f"{sinal}R$ {_agrupar_milhares(inteiro)},{decimal}"
+
+
+def referencia_numero_br(valor: float, casas_decimais: int = 2) -> str:
+    if valor < 0:
+        sinal = "-"
+        valor = abs(valor)
+    else:
+        sinal = ""
+    partes = f"{{:.{casas_decimais}f}}".format(valor).split('.')
+    inteiro = partes[0]
+    decimal = partes[1] if len(partes) > 1 else ""
+    if decimal:
+        return f"{sinal}{_agrupar_milhares(inteiro)},{decimal}"
+    return f"{sinal}{_agrupar_milhares(inteiro)}"
+
+
+def referencia_moeda(valor: float) -> str:
+    return f"R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+def referencia_numero(valor: float, casas_decimais: int = 2) -> str:
+    return f"{valor:,.{casas_decimais}f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+# ============= VALORES =============
+
+def gerar_valores(quantidade: int, semente: int = 42) -> list:
+    """Magnitudes de centavos a bilhões, metade negativos"""
+    aleatorio = random.Random(semente)
+    return [
+        aleatorio.choice((-1, 1)) * 10 ** aleatorio.uniform(-3, 10)
+        for _ in range(quantidade)
+    ]
+
+
+CASOS_ESPECIAIS = [
+    0, 0.0, -0.0, 1, -1, 999, 1000, -1000, 999.995, 999999.995, -0.001, -0.005, 0.005,
+    1234567.891, 1e15, -1e15, 123456789012, math.inf, -math.inf, math.nan,
+    np.float64(1234.5), np.float64(-98765.4321), np.int64(1000000),
+]
+NAO_FINITOS = [math.inf, -math.inf, math.nan]
+
+VALORES = CASOS_ESPECIAIS + gerar_valores(20_000)
+FINITOS = [valor for valor in VALORES if math.isfinite(valor)]
+
+
+# ============= ESCALARES =============
+
+def test_moeda_br():
+    assert [formatar_moeda_br(v) for v in FINITOS] == [referencia_moeda_br(v) for v in FINITOS]
+
+
+@pytest.mark.parametrize("casas", [0, 1, 2, 4])
+def test_numero_br(casas):
+    assert [formatar_numero_br(v, casas) for v in VALORES] == [referencia_numero_br(v, casas) for v in VALORES]
+
+
+def test_percentual_br():
+    assert [formatar_percentual_br(v) for v in VALORES] == [referencia_numero_br(v, 1) + "%" for v in VALORES]
+
+
+def test_financial_calc():
+    assert [formatar_moeda(v) for v in VALORES] == [referencia_moeda(v) for v in VALORES]
+    assert [formatar_numero(v, 1) for v in VALORES] == [referencia_numero(v, 1) for v in VALORES]
+
+
+@pytest.mark.parametrize("valor", NAO_FINITOS)
+def test_moeda_br_nao_aceita_inf_nan(valor):
+    # A versão anterior também falhava (IndexError)
+    with pytest.raises(IndexError):
+        referencia_moeda_br(valor)
+    with pytest.raises(ValueError):
+        formatar_moeda_br(valor)
+
+
+# ============= EM LOTE =============
+
+def test_lotes_iguais_aos_escalares():
+    assert formatar_moedas_br(FINITOS) == [referencia_moeda_br(v) for v in FINITOS]
+    assert formatar_percentuais_br(VALORES) == [referencia_numero_br(v, 1) + "%" for v in VALORES]
+    for casas in (0, 2):
+        assert formatar_numeros_br(VALORES, casas) == [referencia_numero_br(v, casas) for v in VALORES]
+
+
+def test_lotes_aceitam_numpy_e_vazio():
+    coluna = np.array(FINITOS)
+    assert formatar_moedas_br(coluna) == [referencia_moeda_br(v) for v in coluna.tolist()]
+    assert formatar_numeros_br(coluna, 1) == [referencia_numero_br(v, 1) for v in coluna.tolist()]
+    assert formatar_numeros_br([]) == formatar_moedas_br(()) == formatar_percentuais_br([]) == []
+
+
+@pytest.mark.parametrize("valor", NAO_FINITOS)
+def test_lote_de_moedas_nao_aceita_inf_nan(valor):
+    with pytest.raises(ValueError):
+        formatar_moedas_br([1.0, valor, 2.0])
@@ -0,0 +1,93 @@
+"""
+Histórico paginado por cursor: codificação do cursor, detecção da próxima
+página (limit + 1), filtros de data, empates em created_at e total_analises
+"""
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.models.analysis_record import AnalysisRecord
+from app.models.database import SessionLocal
+from app.routes.analise import codificar_cursor, decodificar_cursor
+
+
+INICIO = datetime(2025, 1, 1, 12, 0, 0)
+
+
+def _inserir(email: str, datas: list) -> list:
+    with SessionLocal() as db:
+        registros = [
+            AnalysisRecord(email=email, empresa=f"E{i}", setor="saude", periodo_referencia="2025-01",
+                           dados_financeiros={}, created_at=data)
+            for i, data in enumerate(datas)
+        ]
+        db.add_all(registros)
+        db.commit()
+        return [r.id for r in registros]
+
+
+def _todas_as_paginas(cliente, email: str, **parametros) -> list:
+    paginas, cursor = [], None
+    while True:
+        extra = {"after": cursor} if cursor else {}
+        pagina = cliente.get(f"/api/historico/{email}", params={**parametros, **extra}).json()
+        paginas.append(pagina)
+        cursor = pagina["proximo_cursor"]
+        if cursor is None:
+            return paginas
+
+
+def test_cursor_ida_e_volta():
+    analise = SimpleNamespace(created_at=datetime(2025, 3, 4, 5, 6, 7, 890), id=42)
+    cursor = codificar_cursor(analise)
+
+    assert "=" not in cursor
+    assert decodificar_cursor(cursor) == (analise.created_at, 42)
+    with pytest.raises(HTTPException) as erro:
+        decodificar_cursor("nao-e-cursor")
+    assert erro.value.status_code == 400
+
+
+def test_paginas_sem_repetir_nem_pular(cliente):
+    email = "paginas@teste.com"
+    ids = _inserir(email, [INICIO + timedelta(hours=i) for i in range(7)])
+
+    paginas = _todas_as_paginas(cliente, email, limit=3)
+
+    assert [len(p["analises"]) for p in paginas] == [3, 3, 1]
+    assert [a["id"] for p in paginas for a in p["analises"]] == ids[::-1]
+    assert paginas[0]["total_analises"] == 7
+    assert all(p["total_analises"] is None for p in paginas[1:])
+
+
+def test_pagina_exata_nao_tem_proxima(cliente):
+    email = "exata@teste.com"
+    _inserir(email, [INICIO + timedelta(hours=i) for i in range(3)])
+
+    pagina = cliente.get(f"/api/historico/{email}", params={"limit": 3}).json()
+
+    # limit + 1 linhas pedidas: com exatamente limit, não há próxima página
+    assert len(pagina["analises"]) == 3 and pagina["proximo_cursor"] is None
+
+
+def test_empates_em_created_at_desempatados_pelo_id(cliente):
+    email = "empates@teste.com"
+    ids = _inserir(email, [INICIO] * 5 + [INICIO - timedelta(days=1)])
+
+    paginas = _todas_as_paginas(cliente, email, limit=2)
+
+    assert [a["id"] for p in paginas for a in p["analises"]] == sorted(ids[:5], reverse=True) + [ids[5]]
+
+
+def test_filtros_de_data(cliente):
+    email = "periodo@teste.com"
+    ids = _inserir(email, [INICIO + timedelta(days=i) for i in range(10)])
+
+    paginas = _todas_as_paginas(cliente, email, limit=2, data_inicio=(INICIO + timedelta(days=3)).isoformat(),
+                                data_fim=(INICIO + timedelta(days=7)).isoformat())
+
+    # data_inicio inclusivo, data_fim exclusivo
+    assert [a["id"] for p in paginas for a in p["analises"]] == ids[3:7][::-1]
+    assert paginas[0]["total_analises"] == 4
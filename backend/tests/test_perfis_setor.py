@@ -0,0 +1,357 @@
+"""
+Perfis de setor: o registro responde o mesmo que as tabelas anteriores
+(SectorBenchmarks, validador.DEFAULTS_PRAZOS e os ajustes por substring
+do plano personalizado, copiados abaixo como referência) e a recarga a
+quente troca a tabela inteira ou mantém a anterior
+"""
+import json
+import os
+from typing import Dict, List
+
+import pytest
+
+from app.models.schemas import SetorEnum
+from app.services.perfis_setor import RegistroPerfis, ARQUIVO_PADRAO, perfis_setor
+from app.services.sector_benchmarks import SectorBenchmarks
+
+
+# ============= REFERÊNCIA (TABELAS ANTERIORES) =============
+
+class SectorBenchmarksAnterior:
+    BENCHMARKS = {
+        "agricultura": {
+            "nome": "Agricultura, Pecuária, Produção Florestal",
+            "liquidez_corrente": 1.4, "margem_liquida": 8.0, "endividamento_geral": 50.0,
+            "ciclo_caixa": 120, "giro_estoque": 4
+        },
+        "pecuaria": {
+            "nome": "Pecuária",
+            "liquidez_corrente": 1.3, "margem_liquida": 10.0, "endividamento_geral": 55.0,
+            "ciclo_caixa": 180, "giro_estoque": 2
+        },
+        "extrativas": {
+            "nome": "Indústrias Extrativas",
+            "liquidez_corrente": 1.8, "margem_liquida": 12.0, "endividamento_geral": 45.0,
+            "ciclo_caixa": 90, "giro_estoque": 6
+        },
+        "transformacao": {
+            "nome": "Indústrias de Transformação",
+            "liquidez_corrente": 1.5, "margem_liquida": 7.0, "endividamento_geral": 52.0,
+            "ciclo_caixa": 75, "giro_estoque": 8
+        },
+        "eletricidade_gas": {
+            "nome": "Eletricidade e Gás",
+            "liquidez_corrente": 1.2, "margem_liquida": 15.0, "endividamento_geral": 60.0,
+            "ciclo_caixa": 30, "giro_estoque": 12
+        },
+        "agua_residuos": {
+            "nome": "Água, Esgoto e Gestão de Resíduos",
+            "liquidez_corrente": 1.3, "margem_liquida": 10.0, "endividamento_geral": 55.0,
+            "ciclo_caixa": 45, "giro_estoque": 10
+        },
+        "construcao": {
+            "nome": "Construção",
+            "liquidez_corrente": 1.4, "margem_liquida": 5.0, "endividamento_geral": 60.0,
+            "ciclo_caixa": 150, "giro_estoque": 3
+        },
+        "comercio_veiculos": {
+            "nome": "Comércio e Reparação de Veículos",
+            "liquidez_corrente": 1.3, "margem_liquida": 4.0, "endividamento_geral": 55.0,
+            "ciclo_caixa": 60, "giro_estoque": 6
+        },
+        "transporte": {
+            "nome": "Transporte, Armazenagem e Correio",
+            "liquidez_corrente": 1.1, "margem_liquida": 6.0, "endividamento_geral": 58.0,
+            "ciclo_caixa": 40, "giro_estoque": 20
+        },
+        "alojamento_alimentacao": {
+            "nome": "Alojamento e Alimentação",
+            "liquidez_corrente": 1.2, "margem_liquida": 5.0, "endividamento_geral": 50.0,
+            "ciclo_caixa": 15, "giro_estoque": 15
+        },
+        "informacao_comunicacao": {
+            "nome": "Informação e Comunicação",
+            "liquidez_corrente": 2.0, "margem_liquida": 15.0, "endividamento_geral": 35.0,
+            "ciclo_caixa": 45, "giro_estoque": 25
+        },
+        "financeiras": {
+            "nome": "Atividades Financeiras e Seguros",
+            "liquidez_corrente": 2.5, "margem_liquida": 20.0, "endividamento_geral": 70.0,
+            "ciclo_caixa": 20, "giro_estoque": 50
+        },
+        "imobiliarias": {
+            "nome": "Atividades Imobiliárias",
+            "liquidez_corrente": 1.8, "margem_liquida": 18.0, "endividamento_geral": 55.0,
+            "ciclo_caixa": 180, "giro_estoque": 1
+        },
+        "profissionais": {
+            "nome": "Atividades Profissionais, Científicas e Técnicas",
+            "liquidez_corrente": 2.2, "margem_liquida": 12.0, "endividamento_geral": 30.0,
+            "ciclo_caixa": 60, "giro_estoque": 30
+        },
+        "administrativas": {
+            "nome": "Atividades Administrativas e Serviços Complementares",
+            "liquidez_corrente": 1.6, "margem_liquida": 8.0, "endividamento_geral": 45.0,
+            "ciclo_caixa": 50, "giro_estoque": 20
+        },
+        "administracao_publica": {
+            "nome": "Administração Pública, Defesa e Seguridade Social",
+            "liquidez_corrente": 1.5, "margem_liquida": 3.0, "endividamento_geral": 80.0,
+            "ciclo_caixa": 30, "giro_estoque": 15
+        },
+        "educacao": {
+            "nome": "Educação",
+            "liquidez_corrente": 1.8, "margem_liquida": 12.0, "endividamento_geral": 40.0,
+            "ciclo_caixa": 30, "giro_estoque": 30
+        },
+        "saude": {
+            "nome": "Saúde Humana e Serviços Sociais",
+            "liquidez_corrente": 1.7, "margem_liquida": 10.0, "endividamento_geral": 40.0,
+            "ciclo_caixa": 45, "giro_estoque": 12
+        },
+        "artes_cultura": {
+            "nome": "Artes, Cultura, Esporte e Recreação",
+            "liquidez_corrente": 1.3, "margem_liquida": 8.0, "endividamento_geral": 45.0,
+            "ciclo_caixa": 30, "giro_estoque": 20
+        },
+        "outras_atividades": {
+            "nome": "Outras Atividades de Serviços",
+            "liquidez_corrente": 1.5, "margem_liquida": 9.0, "endividamento_geral": 45.0,
+            "ciclo_caixa": 40, "giro_estoque": 18
+        },
+        "servicos_domesticos": {
+            "nome": "Serviços Domésticos",
+            "liquidez_corrente": 2.0, "margem_liquida": 5.0, "endividamento_geral": 20.0,
+            "ciclo_caixa": 15, "giro_estoque": 40
+        }
+    }
+    
+    STRATEGIES = {
+        "agricultura": [
+            "Otimize ciclo de produção para reduzir tempo de caixa",
+            "Diversifique culturas para reduzir riscos climáticos",
+            "Negocie contratos futuros para garantir preços",
+            "Invista em tecnologia para aumentar produtividade",
+            "Busque linhas de crédito rural com juros subsidiados"
+        ],
+        "transformacao": [
+            "Otimize processo produtivo para reduzir custos",
+            "Negocie volumes maiores com fornecedores",
+            "Invista em automação e tecnologia",
+            "Reduza perdas e retrabalho",
+            "Busque certificações de qualidade"
+        ],
+        "informacao_comunicacao": [
+            "Invista em inovação constante",
+            "Busque modelo de receita recorrente (SaaS)",
+            "Controle burn rate rigorosamente",
+            "Invista em captação e retenção de talentos",
+            "Expanda base de clientes com marketing digital"
+        ],
+        "educacao": [
+            "Reduza inadimplência com cobranças automatizadas",
+            "Invista em qualidade do ensino",
+            "Diversifique fontes de receita (cursos, consultorias)",
+            "Otimize ocupação de salas e turnos",
+            "Busque parcerias com empresas para treinamentos"
+        ],
+        "saude": [
+            "Negocie melhores condições com convênios",
+            "Otimize agenda médica para reduzir ociosidade",
+            "Invista em equipamentos modernos",
+            "Implante protocolos de qualidade",
+            "Reduza glosas com documentação adequada"
+        ],
+        "construcao": [
+            "Controle rigoroso de custos por obra",
+            "Negocie prazos estendidos com fornecedores",
+            "Mantenha capital de giro robusto",
+            "Diversifique entre obras públicas e privadas",
+            "Invista em gestão de projetos"
+        ],
+        "comercio_veiculos": [
+            "Negocie melhores condições com montadoras",
+            "Invista em pós-venda e serviços",
+            "Otimize giro de estoque",
+            "Diversifique mix (novos, seminovos, serviços)",
+            "Fortaleça relacionamento com clientes"
+        ],
+        "transporte": [
+            "Otimize rotas para reduzir custos",
+            "Invista em manutenção preventiva",
+            "Negocie contratos de longo prazo",
+            "Diversifique modal de transporte",
+            "Controle consumo de combustível"
+        ],
+        "alojamento_alimentacao": [
+            "Controle perdas e validade de produtos",
+            "Otimize cardápio baseado em margem",
+            "Invista em experiência do cliente",
+            "Negocie compras à vista com desconto",
+            "Busque canais de vendas online"
+        ],
+        "financeiras": [
+            "Diversifique carteira de produtos",
+            "Invista em tecnologia e segurança",
+            "Mantenha índices de inadimplência baixos",
+            "Cumpra regulamentações rigorosamente",
+            "Expanda base de clientes digitalmente"
+        ]
+    }
+    
+    @classmethod
+    def get_benchmarks(cls, setor: str) -> Dict:
+        return cls.BENCHMARKS.get(setor.lower(), cls.BENCHMARKS["outras_atividades"])
+    
+    @classmethod
+    def get_sector_strategies(cls, setor: str) -> List[str]:
+        return cls.STRATEGIES.get(setor.lower(), [
+            "Mantenha controle rigoroso do fluxo de caixa",
+            "Invista em diferenciação competitiva",
+            "Busque eficiência operacional",
+            "Fortaleça relacionamento com clientes",
+            "Monitore indicadores mensalmente"
+        ])
+
+
+DEFAULTS_PRAZOS = {
+    "agricultura": {"dso": 45, "dpo": 30},
+    "pecuaria": {"dso": 45, "dpo": 30},
+    "extrativas": {"dso": 60, "dpo": 45},
+    "transformacao": {"dso": 45, "dpo": 35},
+    "eletricidade_gas": {"dso": 30, "dpo": 30},
+    "agua_residuos": {"dso": 30, "dpo": 30},
+    "construcao": {"dso": 60, "dpo": 45},
+    "comercio_veiculos": {"dso": 30, "dpo": 30},
+    "transporte": {"dso": 30, "dpo": 20},
+    "alojamento_alimentacao": {"dso": 15, "dpo": 20},
+    "informacao_comunicacao": {"dso": 20, "dpo": 15},
+    "financeiras": {"dso": 30, "dpo": 15},
+    "imobiliarias": {"dso": 45, "dpo": 30},
+    "profissionais": {"dso": 20, "dpo": 15},
+    "administrativas": {"dso": 30, "dpo": 20},
+    "administracao_publica": {"dso": 60, "dpo": 30},
+    "educacao": {"dso": 30, "dpo": 20},
+    "saude": {"dso": 30, "dpo": 20},
+    "artes_cultura": {"dso": 30, "dpo": 20},
+    "outras_atividades": {"dso": 30, "dpo": 20},
+    "servicos_domesticos": {"dso": 15, "dpo": 10},
+}
+
+
+def referencias_plano_anteriores(setor: str) -> dict:
+    """GeradorPlanoPersonalizado._get_benchmarks_setor, sem as medianas da população"""
+    benchmarks_padrao = {
+        "margem_bruta": 35.0,
+        "pmr": 35,
+        "pmp": 45,
+        "ciclo_financeiro": 25,
+        "liquidez": 1.5
+    }
+    
+    # Ajustes por setor
+    if "comercio" in setor or "varejo" in setor:
+        benchmarks_padrao.update({
+            "margem_bruta": 30.0,
+            "pmr": 30,
+            "pmp": 45,
+            "ciclo_financeiro": 15
+        })
+    elif "transformacao" in setor or "industria" in setor:
+        benchmarks_padrao.update({
+            "margem_bruta": 40.0,
+            "pmr": 45,
+            "pmp": 60,
+            "ciclo_financeiro": 30
+        })
+    elif "servicos" in setor:
+        benchmarks_padrao.update({
+            "margem_bruta": 50.0,
+            "pmr": 30,
+            "pmp": 30,
+            "ciclo_financeiro": 10
+        })
+    return benchmarks_padrao
+
+
+SETORES = [setor.value for setor in SetorEnum]
+
+
+# ============= MESMOS VALORES =============
+
+@pytest.mark.parametrize("setor", SETORES)
+def test_benchmarks_e_estrategias_iguais_aos_anteriores(setor):
+    assert SectorBenchmarks.get_benchmarks(setor) == SectorBenchmarksAnterior.get_benchmarks(setor)
+    assert SectorBenchmarks.get_sector_strategies(setor) == SectorBenchmarksAnterior.get_sector_strategies(setor)
+
+
+@pytest.mark.parametrize("setor", SETORES)
+def test_prazos_e_referencias_do_plano_iguais_aos_anteriores(setor):
+    perfil = perfis_setor.perfil(setor)
+    assert dict(perfil.prazos) == DEFAULTS_PRAZOS[setor]
+    assert dict(perfil.referencias_plano) == referencias_plano_anteriores(setor)
+
+
+def test_enum_e_maiusculas_dao_o_mesmo_perfil():
+    for setor in SetorEnum:
+        assert perfis_setor.perfil(setor) is perfis_setor.perfil(setor.value)
+        assert perfis_setor.perfil(setor.value.upper()) is perfis_setor.perfil(setor.value)
+
+
+def test_setor_desconhecido_usa_os_mesmos_padroes():
+    perfil = perfis_setor.perfil("setor_inexistente")
+    assert SectorBenchmarks.get_benchmarks("setor_inexistente") == SectorBenchmarksAnterior.get_benchmarks("setor_inexistente")
+    assert SectorBenchmarks.get_sector_strategies("setor_inexistente") == \
+        SectorBenchmarksAnterior.get_sector_strategies("setor_inexistente")
+    assert dict(perfil.prazos) == {"dso": 30, "dpo": 30}
+    assert dict(perfil.referencias_plano) == referencias_plano_anteriores("setor_inexistente")
+
+
+# ============= RECARGA A QUENTE =============
+
+@pytest.fixture
+def registro(tmp_path):
+    caminho = tmp_path / "perfis_setor.json"
+    with open(ARQUIVO_PADRAO, encoding="utf-8") as arquivo:
+        caminho.write_text(arquivo.read(), encoding="utf-8")
+    return RegistroPerfis(str(caminho), intervalo_s=3600)
+
+
+def _regravar(caminho, conteudo):
+    """Grava o arquivo e avança o mtime (o teste roda mais rápido que a resolução do relógio)"""
+    mtime = os.path.getmtime(caminho)
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        arquivo.write(conteudo if isinstance(conteudo, str) else json.dumps(conteudo))
+    os.utime(caminho, (mtime + 1, mtime + 1))
+
+
+def test_recarga_troca_a_tabela_quando_o_arquivo_muda(registro):
+    assert registro.recarregar() is False  # Arquivo não mudou
+
+    with open(registro.caminho, encoding="utf-8") as arquivo:
+        conteudo = json.load(arquivo)
+    conteudo["versao"] = "teste-2"
+    conteudo["setores"]["saude"]["prazos"] = {"dso": 99}
+    _regravar(registro.caminho, conteudo)
+
+    assert registro.recarregar() is True
+    assert registro.versao == "teste-2"
+    assert dict(registro.perfil("saude").prazos) == {"dso": 99, "dpo": 30}  # dpo herdado do "padrao"
+    assert registro.recargas == 1
+
+
+@pytest.mark.parametrize("conteudo", [
+    "{ isto não é json",
+    {"padrao": {}, "setores": {}},  # sem versão
+    {"versao": "x", "padrao": {}, "setores": {"saude": {}}},  # setores faltando
+])
+def test_arquivo_invalido_mantem_a_tabela_anterior(registro, conteudo):
+    versao = registro.versao
+    perfil = registro.perfil("saude")
+
+    _regravar(registro.caminho, conteudo)
+
+    assert registro.recarregar() is False
+    assert registro.versao == versao
+    assert registro.perfil("saude") is perfil
+    assert registro.recargas == 0
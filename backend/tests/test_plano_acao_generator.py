@@ -0,0 +1,213 @@
+"""
+Plano de ação com IA: fallback sem SDK, disjuntor e ClienteLLM contra
+um transporte httpx falso (sem rede)
+"""
+import asyncio
+import json
+import sys
+
+import httpx
+
+from app.services.plano_acao_generator import ClienteLLM, Disjuntor, PlanoAcaoGenerator
+from tests.conftest import requisicao_nivel3
+
+
+PERIODOS = ["30_dias", "60_dias", "90_dias"]
+
+
+def test_sem_sdk_usa_o_plano_padrao(monkeypatch):
+    # None em sys.modules: o import do SDK falha como se o pacote não estivesse instalado
+    monkeypatch.setitem(sys.modules, "anthropic", None)
+    monkeypatch.setattr("app.services.plano_acao_generator._cliente_sdk", None)
+
+    plano = PlanoAcaoGenerator().gerar_plano({"margem_bruta": 10}, ["Margem crítica"], [])
+
+    assert sorted(plano) == PERIODOS
+    assert all(len(plano[periodo]) == 4 for periodo in PERIODOS)
+
+
+# ============= DISJUNTOR =============
+
+def _disjuntor(monkeypatch, agora: list) -> Disjuntor:
+    monkeypatch.setattr("app.services.plano_acao_generator.time.monotonic", lambda: agora[0])
+    return Disjuntor(limite_falhas=2, limite_lento_s=1.0, aberto_s=10.0)
+
+
+def test_disjuntor_abre_testa_e_fecha(monkeypatch):
+    agora = [0.0]
+    disjuntor = _disjuntor(monkeypatch, agora)
+
+    for _ in range(2):
+        assert disjuntor.permite()
+        disjuntor.registrar(False, 0.0, disjuntor.aberturas)
+    assert disjuntor.estado == "aberto" and not disjuntor.permite()
+
+    # Passado o tempo aberto: uma única chamada de teste
+    agora[0] = 11.0
+    assert disjuntor.permite() and disjuntor.estado == "meio_aberto"
+    assert not disjuntor.permite()
+    disjuntor.registrar(True, 0.1, disjuntor.aberturas)
+    assert disjuntor.estado == "fechado" and disjuntor.permite()
+
+
+def test_chamada_de_teste_lenta_reabre(monkeypatch):
+    agora = [0.0]
+    disjuntor = _disjuntor(monkeypatch, agora)
+    for _ in range(2):
+        disjuntor.registrar(False, 0.0, disjuntor.aberturas)
+
+    agora[0] = 11.0
+    assert disjuntor.permite()
+    disjuntor.registrar(True, 5.0, disjuntor.aberturas)  # Sucesso, mas acima do limite de lentidão
+    assert disjuntor.estado == "aberto" and disjuntor.aberturas == 2
+
+
+def test_resultado_anterior_a_abertura_e_ignorado(monkeypatch):
+    agora = [0.0]
+    disjuntor = _disjuntor(monkeypatch, agora)
+
+    assert disjuntor.permite()
+    lenta = disjuntor.aberturas  # Saiu com o disjuntor fechado...
+    for _ in range(2):
+        disjuntor.registrar(False, 0.0, disjuntor.aberturas)
+    assert disjuntor.estado == "aberto"
+
+    # ...e termina bem depois que ele abriu: não fecha
+    disjuntor.registrar(True, 0.1, lenta)
+    assert disjuntor.estado == "aberto" and not disjuntor.permite()
+
+    # Nem libera a vaga da chamada de teste de outra abertura
+    agora[0] = 11.0
+    assert disjuntor.permite()
+    disjuntor.liberar(lenta)
+    assert not disjuntor.permite()
+
+
+# ============= CLIENTE LLM (transporte httpx falso) =============
+
+def _plano_json() -> str:
+    acao = {"titulo": "Cobrar em dia", "descricao": "Régua de cobrança", "resultado_esperado": "DSO menor",
+            "prioridade": "Alta"}
+    return json.dumps({periodo: [acao] * 4 for periodo in PERIODOS})
+
+
+class ApiFalsa:
+    """Responde às chamadas do ClienteLLM; `atraso_s` acima do orçamento simula a API pendurada"""
+
+    def __init__(self, atraso_s: float = 0.0):
+        self.atraso_s = atraso_s
+        self.chamadas = 0
+
+    async def __call__(self, requisicao: httpx.Request) -> httpx.Response:
+        self.chamadas += 1
+        await asyncio.sleep(self.atraso_s)
+        return httpx.Response(200, json={"content": [{"type": "text", "text": _plano_json()}]})
+
+
+def _cliente(api: ApiFalsa) -> ClienteLLM:
+    disjuntor = Disjuntor(limite_falhas=2, limite_lento_s=1.0, aberto_s=0.2)
+    return ClienteLLM(url="http://api.falsa", orcamento_s=0.05, max_concorrentes=2,
+                      disjuntor=disjuntor, transport=httpx.MockTransport(api))
+
+
+async def _gerar(cliente: ClienteLLM) -> list:
+    gerador = PlanoAcaoGenerator(cliente)
+    try:
+        return [await gerador.gerar_plano_ia_async({"margem_bruta": 10}, ["Margem crítica"], [])]
+    finally:
+        await cliente.encerrar()
+
+
+def test_cliente_timeout_abre_o_disjuntor_e_recusa():
+    async def cenario():
+        api = ApiFalsa(atraso_s=1.0)
+        cliente = _cliente(api)
+        planos = [await cliente.gerar_texto("prompt") for _ in range(3)]
+        await cliente.encerrar()
+        return api, cliente, planos
+
+    api, cliente, planos = asyncio.run(cenario())
+
+    assert planos == [None, None, None]
+    assert cliente.estouros == 2 and cliente.recusadas == 1
+    assert cliente.disjuntor.estado == "aberto"
+    assert api.chamadas == 2  # Com o disjuntor aberto, a terceira nem sai para a API
+
+
+def test_cliente_meio_aberto_fecha_com_sucesso():
+    async def cenario():
+        api = ApiFalsa(atraso_s=1.0)
+        cliente = _cliente(api)
+        for _ in range(2):
+            await cliente.gerar_texto("prompt")
+        assert cliente.disjuntor.estado == "aberto"
+
+        await asyncio.sleep(0.25)  # Passa o tempo aberto: a próxima é a chamada de teste
+        api.atraso_s = 0.0
+        plano = await PlanoAcaoGenerator(cliente).gerar_plano_ia_async({"margem_bruta": 10}, [], [])
+        await cliente.encerrar()
+        return api, cliente, plano
+
+    api, cliente, plano = asyncio.run(cenario())
+
+    assert sorted(plano) == PERIODOS
+    assert cliente.disjuntor.estado == "fechado" and cliente.disjuntor.falhas_seguidas == 0
+    assert api.chamadas == 3
+
+
+def test_cliente_meio_aberto_reabre_com_timeout():
+    async def cenario():
+        api = ApiFalsa(atraso_s=1.0)
+        cliente = _cliente(api)
+        for _ in range(2):
+            await cliente.gerar_texto("prompt")
+
+        await asyncio.sleep(0.25)
+        teste = await cliente.gerar_texto("prompt")
+        await cliente.encerrar()
+        return cliente, teste
+
+    cliente, teste = asyncio.run(cenario())
+
+    assert teste is None
+    assert cliente.disjuntor.estado == "aberto" and cliente.disjuntor.aberturas == 2
+
+
+def test_resposta_invalida_volta_none():
+    async def cenario():
+        async def api(requisicao):
+            return httpx.Response(200, json={"content": [{"type": "text", "text": '{"30_dias": []}'}]})
+
+        cliente = ClienteLLM(url="http://api.falsa", orcamento_s=1.0, transport=httpx.MockTransport(api))
+        return await _gerar(cliente)
+
+    assert asyncio.run(cenario()) == [None]
+
+
+# ============= ROTA =============
+
+def test_rota_usa_o_plano_da_ia(cliente, monkeypatch):
+    api = ApiFalsa()
+    llm = ClienteLLM(url="http://api.falsa", orcamento_s=1.0, transport=httpx.MockTransport(api))
+    monkeypatch.setattr("app.services.plano_acao_generator.cliente_llm", llm)
+
+    com_ia = cliente.post("/api/analise", json=requisicao_nivel3(plano_com_ia=True)).json()
+    sem_ia = cliente.post("/api/analise", json=requisicao_nivel3()).json()
+
+    assert api.chamadas == 1
+    assert com_ia["diagnostico_estrategia"]["plano_30_60_90"]["30_dias"][0]["titulo"] == "Cobrar em dia"
+    # O plano da IA não entra no cache: a mesma análise sem a flag traz o plano por regras
+    assert sem_ia["diagnostico_estrategia"]["plano_30_60_90"]["30_dias"][0]["titulo"] != "Cobrar em dia"
+    assert com_ia["diagnostico_estrategia"]["diagnostico"] == sem_ia["diagnostico_estrategia"]["diagnostico"]
+
+
+def test_rota_sem_resposta_da_ia_mantem_plano_por_regras(cliente, monkeypatch):
+    api = ApiFalsa(atraso_s=1.0)
+    llm = _cliente(api)
+    monkeypatch.setattr("app.services.plano_acao_generator.cliente_llm", llm)
+
+    com_ia = cliente.post("/api/analise", json=requisicao_nivel3(plano_com_ia=True)).json()
+    sem_ia = cliente.post("/api/analise", json=requisicao_nivel3()).json()
+
+    assert api.chamadas == 1
+    assert com_ia["diagnostico_estrategia"] == sem_ia["diagnostico_estrategia"]
@@ -0,0 +1,95 @@
+"""
+Plano personalizado: os benchmarks do setor montados uma vez por setor e
+versão (benchmarks_do_plano) dão os mesmos planos que a montagem a cada
+análise (implementação anterior, copiada abaixo como referência), também
+depois de os perfis de setor ou os benchmarks da população mudarem
+"""
+import json
+from typing import Dict
+
+import pytest
+
+from app.services.benchmarks_populacao import benchmarks_populacao
+from app.services.perfis_setor import ARQUIVO_PADRAO, compilar_tabela, perfis_setor
+from app.services.plano_acao_personalizado import GeradorPlanoPersonalizado, gerar_plano_personalizado
+from benchmarks.benchmark_plano import gerar_analises
+
+
+# ============= REFERÊNCIA (IMPLEMENTAÇÃO ANTERIOR) =============
+
+class GeradorPlanoAnterior(GeradorPlanoPersonalizado):
+    """Mesmas regras, benchmarks montados a cada análise"""
+
+    def _get_benchmarks_setor(self) -> Dict:
+        """Retorna benchmarks médios do setor"""
+        # Referências do perfil do setor (estimativas de mercado)
+        benchmarks_padrao = dict(perfis_setor.perfil(self.setor).referencias_plano)
+
+        # Medianas reais do setor substituem as estimativas (quando publicadas)
+        populacao = {
+            "margem_bruta": "margem_bruta",
+            "pmr": "dso",
+            "pmp": "dpo",
+            "ciclo_financeiro": "ciclo_financeiro",
+            "liquidez": "liquidez_imediata"
+        }
+        for chave, indicador in populacao.items():
+            mediana = benchmarks_populacao.mediana(self.setor, indicador)
+            if mediana is not None:
+                benchmarks_padrao[chave] = mediana
+
+        return benchmarks_padrao
+
+
+ANALISES = gerar_analises(2000, semente=7)
+
+
+def conferir_planos():
+    for kpis, meta in ANALISES:
+        assert gerar_plano_personalizado(kpis, meta) == GeradorPlanoAnterior(kpis, meta).gerar_plano_completo()
+
+
+@pytest.fixture(autouse=True)
+def populacao_vazia(monkeypatch):
+    monkeypatch.setattr(benchmarks_populacao, "_tabela", {})
+    monkeypatch.setattr(benchmarks_populacao, "versao", None)
+
+
+def publicar_populacao(monkeypatch, versao: int, dso: float, margem_bruta: float):
+    """Medianas de comércio e construção como se uma nova versão tivesse sido carregada"""
+    estatistica = lambda mediana: {"amostras": 100, "p25": mediana * 0.8, "mediana": mediana, "p75": mediana * 1.2}
+    tabela = {
+        setor: {"dso": estatistica(dso), "margem_bruta": estatistica(margem_bruta)}
+        for setor in ("comercio_veiculos", "construcao")
+    }
+    monkeypatch.setattr(benchmarks_populacao, "_tabela", tabela)
+    monkeypatch.setattr(benchmarks_populacao, "versao", versao)
+
+
+# ============= MESMOS PLANOS =============
+
+def test_mesmos_planos_sem_populacao():
+    conferir_planos()
+
+
+def test_mesmos_planos_quando_a_populacao_muda(monkeypatch):
+    conferir_planos()  # Preenche os benchmarks com a versão atual
+
+    publicar_populacao(monkeypatch, versao=1, dso=20, margem_bruta=45)
+    conferir_planos()
+
+    publicar_populacao(monkeypatch, versao=2, dso=80, margem_bruta=12)
+    conferir_planos()
+
+
+def test_mesmos_planos_quando_os_perfis_mudam(monkeypatch):
+    conferir_planos()
+
+    with open(ARQUIVO_PADRAO, encoding="utf-8") as arquivo:
+        conteudo = json.load(arquivo)
+    conteudo["versao"] = "teste-plano"
+    for perfil in conteudo["setores"].values():
+        perfil["referencias_plano"] = {"margem_bruta": 60.0, "pmr": 10, "pmp": 90, "ciclo_financeiro": 5}
+    monkeypatch.setattr(perfis_setor, "_tabela", compilar_tabela(conteudo))
+
+    conferir_planos()
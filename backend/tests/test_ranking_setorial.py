@@ -0,0 +1,113 @@
+"""
+Ranking setorial: erro do esboço de quantis, ida e volta do snapshot
+(para_dict/de_dict/mesclar) e snapshot de workers concorrentes
+"""
+import asyncio
+
+import numpy as np
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.models.database import Base
+from app.models.esboco_setor import EsbocoSetor
+from app.models.schemas import SetorEnum
+from app.services.ranking_setorial import PRECISAO_RELATIVA, EsbocoQuantis, RankingSetorial, chave_setor
+
+
+def _amostras(semente: int = 7, n: int = 20_000) -> np.ndarray:
+    aleatorio = np.random.default_rng(semente)
+    # Positivos, negativos e zeros, em escalas bem diferentes (margem, resultado em R$, ...)
+    return np.concatenate([
+        aleatorio.lognormal(3, 1.5, n),
+        -aleatorio.lognormal(8, 2, n // 4),
+        np.zeros(n // 10)
+    ])
+
+
+def _esboco(valores) -> EsbocoQuantis:
+    esboco = EsbocoQuantis()
+    for valor in valores:
+        esboco.adicionar(float(valor))
+    return esboco
+
+
+@pytest.mark.parametrize("q", [0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99])
+def test_quantil_com_erro_relativo_limitado(q):
+    valores = _amostras()
+    esboco = _esboco(valores)
+
+    exato = np.sort(valores)[int(np.ceil(q * len(valores))) - 1]
+    aproximado = esboco.quantil(q)
+
+    assert abs(aproximado - exato) <= PRECISAO_RELATIVA * abs(exato) + 1e-12
+
+
+def test_percentil_proximo_do_exato():
+    valores = _amostras()
+    esboco = _esboco(valores)
+
+    for valor in np.quantile(valores, [0.05, 0.3, 0.5, 0.8, 0.95]):
+        exato = np.mean(valores < valor) * 100
+        # Empates dentro do bucket do valor contam pela metade: erro de no máximo meio bucket
+        assert abs(esboco.percentil(valor) - exato) < 1.0
+
+
+def test_esboco_vazio():
+    assert EsbocoQuantis().percentil(10.0) is None
+    assert EsbocoQuantis().quantil(0.5) is None
+
+
+def test_para_dict_de_dict_ida_e_volta():
+    esboco = _esboco(_amostras(n=2_000))
+
+    copia = EsbocoQuantis.de_dict(esboco.para_dict())
+
+    assert copia.total == esboco.total
+    assert np.array_equal(copia.contagens, esboco.contagens)
+    assert copia.quantil(0.5) == esboco.quantil(0.5)
+    assert EsbocoQuantis.de_dict(EsbocoQuantis().para_dict()).total == 0
+
+
+def test_mesclar_igual_a_esboco_unico():
+    valores = _amostras(n=3_000)
+    metade = len(valores) // 2
+    mesclado = _esboco(valores[:metade])
+    mesclado.percentil(1.0)  # Cache da soma acumulada precisa ser refeito após mesclar
+    mesclado.mesclar(EsbocoQuantis.de_dict(_esboco(valores[metade:]).para_dict()))
+
+    unico = _esboco(valores)
+
+    assert mesclado.total == unico.total
+    assert np.array_equal(mesclado.contagens, unico.contagens)
+    assert mesclado.percentil(1.0) == unico.percentil(1.0)
+
+
+def test_chave_setor_aceita_enum_e_texto():
+    assert chave_setor(SetorEnum.SAUDE) == "saude" == chave_setor("saude")
+
+
+# ============= SNAPSHOT =============
+
+def test_primeiro_snapshot_de_workers_concorrentes(tmp_path):
+    async def cenario():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/ranking.db")
+        async with engine.begin() as conexao:
+            await conexao.run_sync(Base.metadata.create_all, tables=[EsbocoSetor.__table__])
+        fabrica = async_sessionmaker(engine, expire_on_commit=False)
+
+        workers = [RankingSetorial(session_factory=fabrica) for _ in range(4)]
+        for i, worker in enumerate(workers):
+            for _ in range(i + 1):
+                worker.adicionar("saude", {"margem_bruta": 30.0, "roe": 10.0})
+
+        # Todos criam (saude, margem_bruta) e (saude, roe) ao mesmo tempo
+        await asyncio.gather(*(worker.gravar_snapshot() for worker in workers))
+        await workers[0].carregar()
+        await engine.dispose()
+        return workers
+
+    workers = asyncio.run(cenario())
+
+    assert workers[0].quantis("saude")["margem_bruta"]["amostras"] == 1 + 2 + 3 + 4
+    assert workers[0].quantis("saude")["roe"]["amostras"] == 10
+    assert all(worker.snapshots == 1 for worker in workers)
@@ -0,0 +1,83 @@
+"""
+Resumo de KPIs: a linha de ResumoAnalise gravada junto com a análise tem
+os mesmos valores que o /analise devolveu
+"""
+import time
+
+import pytest
+from sqlalchemy import select
+
+from app.models.analysis_record import AnalysisRecord, ResumoAnalise
+from app.models.database import SessionLocal
+from app.services.resumo_kpis import calcular_resumo
+from tests.conftest import requisicao_nivel3
+
+
+# Nome do KPI na resposta -> coluna do resumo
+NOMES = {
+    "Margem Bruta": "margem_bruta",
+    "Resultado Operacional": "resultado_operacional",
+    "Fôlego de Caixa": "folego_caixa",
+    "Liquidez Imediata": "liquidez_imediata",
+    "Ciclo Financeiro": "ciclo_financeiro",
+    "Alavancagem": "alavancagem",
+    "ROA (Anual)": "roa",
+    "ROE (Anual)": "roe",
+}
+
+
+def _caso(nome: str) -> dict:
+    requisicao = requisicao_nivel3()
+    requisicao["meta"]["email"] = f"resumo-{nome}@teste.com"
+    if nome in ("nivel1", "nivel2"):
+        requisicao["meta"]["nivel_maximo_preenchido"] = int(nome[-1])
+        del requisicao["nivel3"]
+        if nome == "nivel1":
+            del requisicao["nivel2"]
+    elif nome == "prejuizo":
+        requisicao["nivel1"].update(custo_vendas_mensal=90000, despesas_fixas_mensais=40000)
+    elif nome == "pl_negativo":
+        requisicao["nivel3"].update(patrimonio_liquido=-1000, imobilizado=0)
+        requisicao["nivel2"].update(estoque_custo=0)
+    elif nome == "sem_receita":
+        requisicao["nivel1"].update(receita_bruta_mensal=0, custo_vendas_mensal=0)
+    return requisicao
+
+
+def _kpis_da_resposta(resposta: dict) -> dict:
+    kpis = {coluna: None for coluna in NOMES.values()}
+    for nivel in ("nivel1", "nivel2", "nivel3"):
+        for kpi in (resposta.get(nivel) or {}).get("kpis", []):
+            if kpi["nome"] in NOMES:
+                kpis[NOMES[kpi["nome"]]] = kpi["valor"]
+    return kpis
+
+
+def _resumo_gravado(email: str, espera_s: float = 3.0) -> ResumoAnalise:
+    """Espera a fila de gravação (write-behind) gravar a análise"""
+    limite = time.monotonic() + espera_s
+    while True:
+        with SessionLocal() as db:
+            resumo = db.scalar(select(ResumoAnalise).where(ResumoAnalise.email == email))
+            if resumo is not None or time.monotonic() > limite:
+                return resumo
+        time.sleep(0.05)
+
+
+@pytest.mark.parametrize("nome", ["nivel1", "nivel2", "nivel3", "prejuizo", "pl_negativo", "sem_receita"])
+def test_resumo_igual_aos_kpis_da_analise(cliente, nome):
+    requisicao = _caso(nome)
+
+    resposta = cliente.post("/api/analise", json=requisicao)
+    assert resposta.status_code == 200
+    esperado = _kpis_da_resposta(resposta.json())
+
+    resumo = _resumo_gravado(requisicao["meta"]["email"])
+    assert resumo is not None
+    gravado = {coluna: getattr(resumo, coluna) for coluna in NOMES.values()}
+    assert gravado == pytest.approx(esperado)
+
+    # O mesmo vale recalculando de dados_financeiros (backfill)
+    with SessionLocal() as db:
+        registro = db.get(AnalysisRecord, resumo.analise_id)
+        assert calcular_resumo(registro.dados_financeiros) == pytest.approx(esperado)
@@ -0,0 +1,30 @@
+"""
+Assinatura dos níveis da sessão: muda com os dados e com as versões de
+cálculo, perfis de setor e benchmarks (como a chave do cache)
+"""
+from app.services import cache_resultados
+from app.services.benchmarks_populacao import benchmarks_populacao
+from app.services.perfis_setor import perfis_setor
+from app.services.sessao_analise import assinatura_nivel
+
+
+ENTRADA = {"receita_bruta_mensal": 100000, "custo_vendas_mensal": 60000}
+
+
+def test_mesmos_dados_mesma_assinatura():
+    assert assinatura_nivel("comercio_veiculos", ENTRADA) == assinatura_nivel("comercio_veiculos", dict(ENTRADA))
+    assert assinatura_nivel("comercio_veiculos", ENTRADA) != assinatura_nivel("saude", ENTRADA)
+    assert assinatura_nivel("comercio_veiculos", ENTRADA) != assinatura_nivel("comercio_veiculos", ENTRADA, "n1")
+
+
+def test_nova_versao_invalida_a_sessao(monkeypatch):
+    assinaturas = {assinatura_nivel("comercio_veiculos", ENTRADA)}
+
+    monkeypatch.setattr(cache_resultados, "VERSAO_CALCULO", "9.9.9")
+    assinaturas.add(assinatura_nivel("comercio_veiculos", ENTRADA))
+    monkeypatch.setattr(type(perfis_setor), "versao", property(lambda self: "2099-01"))
+    assinaturas.add(assinatura_nivel("comercio_veiculos", ENTRADA))
+    monkeypatch.setattr(benchmarks_populacao, "versao", 999)
+    assinaturas.add(assinatura_nivel("comercio_veiculos", ENTRADA))
+
+    assert len(assinaturas) == 4
@@ -0,0 +1,26 @@
+"""
+Orçamento do cold start: importar app.main em um processo novo deve
+ficar abaixo de IMPORTACAO_ORCAMENTO_MS, sem carregar as dependências
+opcionais pesadas (detalhes por pacote: python -m benchmarks.tempo_importacao)
+"""
+from app.core.config import settings
+from benchmarks.tempo_importacao import MODULOS_PESADOS, medir_importacao
+
+RODADAS = 3  # Vale a mais rápida (menos ruído da máquina)
+
+
+def _tempo_app_main_ms(medidas: list) -> float:
+    return next(acumulado for nome, _, acumulado in medidas if nome == "app.main") / 1000
+
+
+def test_importacao_dentro_do_orcamento():
+    rodadas = [medir_importacao("app.main") for _ in range(RODADAS)]
+    medidas = min(rodadas, key=_tempo_app_main_ms)
+
+    total_ms = _tempo_app_main_ms(medidas)
+    assert total_ms <= settings.IMPORTACAO_ORCAMENTO_MS, (
+        f"Import de app.main: {total_ms:.1f} ms > orçamento de {settings.IMPORTACAO_ORCAMENTO_MS:.0f} ms"
+    )
+
+    carregados = sorted({nome.split(".")[0] for nome, _, _ in medidas} & set(MODULOS_PESADOS))
+    assert not carregados, f"Dependências pesadas carregadas no import: {', '.join(carregados)}"